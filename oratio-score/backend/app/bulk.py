@@ -0,0 +1,555 @@
+"""
+Offline bulk scoring without the HTTP layer.
+
+  python -m app.bulk transcripts.jsonl results.jsonl
+  python -m app.bulk archive.csv results.parquet --text-field body --id-field uid
+  python -m app.bulk transcripts/ results.zon --workers 8 --rubric interview
+
+Input is streamed (never loaded whole):
+  - .jsonl: one JSON object per line (`--text-field`, `--id-field`)
+  - .csv:   one row per transcript, same field options
+  - a directory: every `.txt` file below it, in sorted order (id = relative path)
+
+Transcripts are scored in batches (`score_transcripts`: one embedding pass per
+batch) on a process pool. The parent loads the model and the compiled rubric
+artifact before forking, so workers share them copy-on-write; like
+app.launcher, it never calls the model itself (see warmup.run_prefork_warmup).
+Results are written in input order as `{"id": ..., <score result>}`:
+  - .jsonl: one JSON object per line
+  - .zon:   one ZON document per record, separated by blank lines
+  - .parquet: a directory of part files (needs pyarrow); one row per transcript
+    with id, overall_score, word_count, error and the full result as JSON in
+    `result`
+
+Progress is checkpointed next to the output (`<output>.ckpt`) every
+`--checkpoint-every` records; rerunning the same command resumes from there
+(`--restart` starts over). Throughput and ETA are printed to stderr.
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from app.codec import dumps_json
+from app.zon import zon_serialize
+
+FORMATS = ("jsonl", "zon", "parquet")
+
+Record = Tuple[str, Optional[str]]  # (id, text); text None = unreadable input
+
+
+# ---------------------------
+# Input
+# ---------------------------
+
+
+def _record(obj: Any, n: int, text_field: str, id_field: str) -> Record:
+    if not isinstance(obj, dict):
+        return str(n), None
+    rid = obj.get(id_field)
+    text = obj.get(text_field)
+    return (str(n) if rid in (None, "") else str(rid)), (
+        "" if text is None else str(text)
+    )
+
+
+def iter_jsonl(path: str, text_field: str = "text", id_field: str = "id"):
+    with open(path, "r", encoding="utf-8") as f:
+        for n, line in enumerate(f):
+            if not line.strip():
+                continue
+            try:
+                obj = json.loads(line)
+            except ValueError:
+                obj = None
+            yield _record(obj, n, text_field, id_field)
+
+
+def iter_csv(path: str, text_field: str = "text", id_field: str = "id"):
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        for n, row in enumerate(csv.DictReader(f)):
+            yield _record(row, n, text_field, id_field)
+
+
+def _txt_files(root: str) -> Iterator[str]:
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.lower().endswith(".txt"):
+                yield os.path.join(dirpath, name)
+
+
+def iter_txt_dir(root: str, **_ignored):
+    for path in _txt_files(root):
+        rid = os.path.relpath(path, root).replace(os.sep, "/")
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                yield rid, f.read()
+        except (OSError, UnicodeDecodeError):
+            yield rid, None
+
+
+def iter_input(path: str, text_field: str = "text", id_field: str = "id"):
+    """(id, text) records from a .jsonl/.csv file or a directory of .txt files."""
+    if os.path.isdir(path):
+        return iter_txt_dir(path)
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".jsonl", ".ndjson"):
+        return iter_jsonl(path, text_field, id_field)
+    if ext == ".csv":
+        return iter_csv(path, text_field, id_field)
+    raise ValueError(
+        f"Unsupported input {path!r}: expected .jsonl, .csv or a directory"
+    )
+
+
+def count_input(path: str) -> int:
+    """Number of records in `path` (for ETA; a quick pass without parsing JSON)."""
+    if os.path.isdir(path):
+        return sum(1 for _ in _txt_files(path))
+    if path.lower().endswith(".csv"):
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            return sum(1 for _ in csv.DictReader(f))
+    with open(path, "rb") as f:
+        return sum(1 for line in f if line.strip())
+
+
+# ---------------------------
+# Output
+# ---------------------------
+
+
+class _TextWriter(ABC):
+    """Appends encoded records; the checkpoint offset is the file size."""
+
+    def __init__(self, path: str, offset: int = 0):
+        self.path = path
+        mode = "r+b" if offset and os.path.exists(path) else "wb"
+        self._f = open(path, mode)
+        # drop anything written after the last checkpoint
+        self._f.truncate(offset)
+        self._f.seek(offset)
+
+    @abstractmethod
+    def _encode(self, record: Dict[str, Any]) -> bytes: ...
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        self._f.write(b"".join(self._encode(r) for r in records))
+
+    def commit(self) -> int:
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        return self._f.tell()
+
+    def close(self) -> None:
+        self._f.close()
+
+
+class JsonlWriter(_TextWriter):
+    def _encode(self, record: Dict[str, Any]) -> bytes:
+        return dumps_json(record) + b"\n"
+
+
+class ZonWriter(_TextWriter):
+    def _encode(self, record: Dict[str, Any]) -> bytes:
+        return (zon_serialize(record) + "\n\n").encode("utf-8")
+
+
+class ParquetWriter:
+    """
+    Buffers rows and writes one part file per commit into the `path` directory
+    (readable with pandas.read_parquet(path)). The checkpoint offset is the
+    number of parts.
+    """
+
+    _DTYPES = {
+        "id": "string",
+        "overall_score": "float64",
+        "word_count": "int64",
+        "error": "string",
+        "result": "string",
+    }
+
+    def __init__(self, path: str, offset: int = 0):
+        import pyarrow  # noqa: F401  (optional dependency; fail before scoring)
+
+        self.path = path
+        self.parts = int(offset)
+        self._rows: List[Dict[str, Any]] = []
+        os.makedirs(path, exist_ok=True)
+        for name in os.listdir(path):
+            if name.startswith("part-") and self._part_index(name) >= self.parts:
+                os.remove(os.path.join(path, name))
+
+    @staticmethod
+    def _part_index(name: str) -> int:
+        try:
+            return int(name[5:].split(".", 1)[0])
+        except ValueError:
+            return -1
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        for r in records:
+            self._rows.append(
+                {
+                    "id": r["id"],
+                    "overall_score": r.get("overall_score"),
+                    "word_count": r.get("word_count"),
+                    "error": r.get("error"),
+                    "result": dumps_json(r).decode("utf-8"),
+                }
+            )
+
+    def commit(self) -> int:
+        if self._rows:
+            import pandas as pd
+
+            part = os.path.join(self.path, f"part-{self.parts:05d}.parquet")
+            tmp = part + ".tmp"
+            # fixed column types, so parts where e.g. no row has an error
+            # still share one schema
+            df = pd.DataFrame(self._rows).astype(self._DTYPES)
+            df.to_parquet(tmp, index=False)
+            os.replace(tmp, part)
+            self.parts += 1
+            self._rows = []
+        return self.parts
+
+    def close(self) -> None:
+        pass
+
+
+_WRITERS = {"jsonl": JsonlWriter, "zon": ZonWriter, "parquet": ParquetWriter}
+
+
+def output_format(path: str, fmt: Optional[str] = None) -> str:
+    if fmt:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format {fmt!r}; expected one of {FORMATS}")
+        return fmt
+    ext = os.path.splitext(path)[1].lower().lstrip(".")
+    if ext in ("jsonl", "ndjson"):
+        return "jsonl"
+    if ext in FORMATS:
+        return ext
+    raise ValueError(f"Cannot infer the output format of {path!r}; pass --format")
+
+
+# ---------------------------
+# Checkpoints
+# ---------------------------
+
+
+def input_signature(path: str) -> List[int]:
+    """Size and mtime of the input (summed/latest over a directory's .txt files)."""
+    if not os.path.isdir(path):
+        st = os.stat(path)
+        return [st.st_size, st.st_mtime_ns]
+    files, size, mtime = 0, 0, 0
+    for name in _txt_files(path):
+        st = os.stat(name)
+        files, size, mtime = files + 1, size + st.st_size, max(mtime, st.st_mtime_ns)
+    return [files, size, mtime]
+
+
+def checkpoint_path(output: str) -> str:
+    return output.rstrip("/\\") + ".ckpt"
+
+
+def load_checkpoint(output: str, job: Dict[str, Any]) -> Tuple[int, int]:
+    """(records done, writer offset) for a previous run of the same job."""
+    try:
+        with open(checkpoint_path(output), "r", encoding="utf-8") as f:
+            ckpt = json.load(f)
+    except (OSError, ValueError):
+        return 0, 0
+    if ckpt.get("job") != job:
+        print(
+            "[bulk] checkpoint is for a different job; starting over", file=sys.stderr
+        )
+        return 0, 0
+    return int(ckpt.get("done", 0)), int(ckpt.get("offset", 0))
+
+
+def save_checkpoint(output: str, job: Dict[str, Any], done: int, offset: int) -> None:
+    path = checkpoint_path(output)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"job": job, "done": done, "offset": offset}, f)
+    os.replace(tmp, path)
+
+
+# ---------------------------
+# Scoring
+# ---------------------------
+
+
+def _empty_result(error: str) -> Dict[str, Any]:
+    # same shape as the API's empty/failed result
+    return {
+        "overall_score": 0.0,
+        "word_count": 0,
+        "criteria": [],
+        "evidence": {},
+        "error": error,
+    }
+
+
+def score_batch(
+    records: List[Record], rubric: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Score one batch in the current process; one output record per input."""
+    from app.scoring import score_transcripts
+
+    results: List[Optional[Dict[str, Any]]] = []
+    for _rid, text in records:
+        if text is None:
+            results.append(_empty_result("Invalid input record"))
+        elif not text.strip():
+            results.append(_empty_result("No transcript provided"))
+        else:
+            results.append(None)
+    # only non-empty transcripts go through the pipeline; keep input order
+    idx = [i for i, r in enumerate(results) if r is None]
+    try:
+        scored = score_transcripts([records[i][1] for i in idx], rubric=rubric)
+    except Exception as e:
+        scored = [
+            {
+                **_empty_result("Scoring failed"),
+                "word_count": len(records[i][1].split()),
+                "details": str(e),
+            }
+            for i in idx
+        ]
+    for i, res in zip(idx, scored):
+        results[i] = res
+    return [{"id": rid, **res} for (rid, _text), res in zip(records, results)]
+
+
+def _batches(records: Iterator[Record], size: int) -> Iterator[List[Record]]:
+    batch: List[Record] = []
+    for rec in records:
+        batch.append(rec)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class _InProcess(Executor):
+    """`--workers 0`: score in this process (debugging, tests)."""
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        fut: Future = Future()
+        try:
+            fut.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            fut.set_exception(e)
+        return fut
+
+
+def _make_pool(workers: int) -> Executor:
+    if workers <= 0:
+        return _InProcess()
+    # fork shares the preloaded model; elsewhere each worker loads its own
+    methods = multiprocessing.get_all_start_methods()
+    ctx = multiprocessing.get_context("fork" if "fork" in methods else None)
+    return ProcessPoolExecutor(max_workers=workers, mp_context=ctx)
+
+
+def _fmt_eta(seconds: float) -> str:
+    seconds = int(seconds)
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    return f"{h}h{m:02d}m{s:02d}s" if h else (f"{m}m{s:02d}s" if m else f"{s}s")
+
+
+class Progress:
+    def __init__(self, total: Optional[int], start: int, every_s: float = 5.0):
+        self.total = total
+        self.start = start
+        self.done = start
+        self.every_s = every_s
+        self.t0 = time.perf_counter()
+        self._last = 0.0
+        self._printed = -1
+
+    @property
+    def rate(self) -> float:
+        elapsed = time.perf_counter() - self.t0
+        return (self.done - self.start) / elapsed if elapsed > 0 else 0.0
+
+    def line(self) -> str:
+        rate = self.rate
+        if self.total:
+            pct = 100.0 * self.done / self.total
+            left = max(0, self.total - self.done)
+            eta = _fmt_eta(left / rate) if rate > 0 else "?"
+            return (
+                f"[bulk] {self.done}/{self.total} ({pct:.1f}%) "
+                f"{rate:.1f} transcripts/s ETA {eta}"
+            )
+        return f"[bulk] {self.done} done {rate:.1f} transcripts/s"
+
+    def update(self, done: int, force: bool = False) -> None:
+        self.done = done
+        now = time.perf_counter()
+        if (force and done != self._printed) or now - self._last >= self.every_s:
+            self._last, self._printed = now, done
+            print(self.line(), file=sys.stderr, flush=True)
+
+
+def run(
+    input_path: str,
+    output_path: str,
+    fmt: Optional[str] = None,
+    rubric: Optional[str] = None,
+    workers: int = 0,
+    batch_size: int = 64,
+    checkpoint_every: int = 1000,
+    text_field: str = "text",
+    id_field: str = "id",
+    restart: bool = False,
+    progress_every_s: float = 5.0,
+) -> Dict[str, Any]:
+    """
+    Score every transcript in `input_path` into `output_path`, resuming from
+    the checkpoint of an interrupted run. Returns summary counts.
+    """
+    fmt = output_format(output_path, fmt)
+    job = {
+        "input": os.path.abspath(input_path),
+        # an edited or replaced input must not resume at the old record offset
+        "input_signature": input_signature(input_path),
+        "format": fmt,
+        "rubric": rubric,
+        "text_field": text_field,
+        "id_field": id_field,
+    }
+    done, offset = (0, 0) if restart else load_checkpoint(output_path, job)
+    writer = _WRITERS[fmt](output_path, offset)
+    if done:
+        print(f"[bulk] resuming after {done} records", file=sys.stderr)
+
+    if workers > 0:
+        from app import warmup
+
+        # load the model + rubric once, before forking the pool
+        state = warmup.run_prefork_warmup(rubric)
+        if state.error is not None:
+            raise RuntimeError(f"preload failed: {state.error}")
+
+    records = iter_input(input_path, text_field, id_field)
+    for _ in range(done):
+        next(records, None)
+    progress = Progress(count_input(input_path), done, progress_every_s)
+    errors = 0
+    committed = done
+    pool = _make_pool(workers)
+    inflight: Deque[Future] = deque()
+    batches = _batches(records, max(1, batch_size))
+
+    def drain_one() -> None:
+        nonlocal done, errors, committed
+        results = inflight.popleft().result()
+        writer.write(results)
+        done += len(results)
+        errors += sum(1 for r in results if r.get("error"))
+        if done - committed >= checkpoint_every:
+            save_checkpoint(output_path, job, done, writer.commit())
+            committed = done
+        progress.update(done)
+
+    try:
+        # keep every worker busy with one batch queued behind it; results are
+        # written in input order
+        for batch in batches:
+            inflight.append(pool.submit(score_batch, batch, rubric))
+            while len(inflight) > max(1, 2 * workers):
+                drain_one()
+        while inflight:
+            drain_one()
+        writer.commit()
+    except BaseException:
+        # everything written so far is whole batches in order: keep it
+        save_checkpoint(output_path, job, done, writer.commit())
+        raise
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        writer.close()
+    try:
+        os.remove(checkpoint_path(output_path))
+    except OSError:
+        pass
+    progress.update(done, force=True)
+    return {
+        "done": done,
+        "errors": errors,
+        "seconds": round(time.perf_counter() - progress.t0, 3),
+        "rate": round(progress.rate, 2),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(
+        prog="python -m app.bulk",
+        description="Score transcripts from JSONL/CSV/a .txt directory without HTTP.",
+    )
+    ap.add_argument("input", help=".jsonl, .csv or a directory of .txt files")
+    ap.add_argument("output", help=".jsonl, .zon or .parquet (a directory of parts)")
+    ap.add_argument("--format", choices=FORMATS, default=None)
+    ap.add_argument(
+        "--rubric", default=None, help="rubric id (default rubric if omitted)"
+    )
+    ap.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="scoring processes (0 = score in this process)",
+    )
+    ap.add_argument("--batch-size", type=int, default=64)
+    ap.add_argument("--checkpoint-every", type=int, default=1000)
+    ap.add_argument("--text-field", default="text")
+    ap.add_argument("--id-field", default="id")
+    ap.add_argument("--progress-every", type=float, default=5.0, help="seconds")
+    ap.add_argument(
+        "--restart", action="store_true", help="ignore the checkpoint and start over"
+    )
+    args = ap.parse_args(argv)
+    try:
+        summary = run(
+            args.input,
+            args.output,
+            fmt=args.format,
+            rubric=args.rubric,
+            workers=args.workers,
+            batch_size=args.batch_size,
+            checkpoint_every=args.checkpoint_every,
+            text_field=args.text_field,
+            id_field=args.id_field,
+            restart=args.restart,
+            progress_every_s=args.progress_every,
+        )
+    except (OSError, ValueError, ImportError) as e:
+        print(f"[bulk] {e}", file=sys.stderr)
+        return 2
+    print(
+        f"[bulk] scored {summary['done']} transcripts in {summary['seconds']}s "
+        f"({summary['rate']} transcripts/s, {summary['errors']} with errors)",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+# backend/app/codec.py
+"""Request/response codec shared by the JSON and ZON endpoints.
+
+Request bodies are parsed once: JSON from the raw bytes, ZON incrementally from
+the request stream. Responses are encoded here too and returned as a ready
+`Response`, which skips FastAPI's generic `jsonable_encoder` walk over nested
+score dicts. Uses orjson when it is installed and falls back to the stdlib.
+"""
+
+import json
+from typing import Any
+
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+
+from app.zon import iter_zon, zon_parse_stream, zon_serialize
+
+try:
+    import orjson  # type: ignore
+except Exception:
+    orjson = None
+
+JSON_MEDIA_TYPE = "application/json"
+ZON_MEDIA_TYPE = "application/zon"
+
+_ORJSON_OPTIONS = (
+    orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+)
+
+
+def backend_name() -> str:
+    return "orjson" if orjson is not None else "json"
+
+
+def _default(obj: Any) -> Any:
+    # numpy scalars / arrays that slipped into a result dict
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def loads_json(data: bytes) -> Any:
+    """Parse JSON from raw bytes. Raises ValueError on malformed input."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_json(obj: Any) -> bytes:
+    """Encode to compact UTF-8 JSON (same output shape as Starlette's JSONResponse)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=_ORJSON_OPTIONS)
+    return json.dumps(
+        obj,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+        default=_default,
+    ).encode("utf-8")
+
+
+def wants_zon(request: Request) -> bool:
+    return "zon" in request.headers.get("accept", "").lower()
+
+
+async def read_payload(request: Request) -> Any:
+    """Parse the request body once, picking the codec from Content-Type.
+
+    Raises ZonParseError (a ValueError) or ValueError for malformed bodies.
+    """
+    content_type = request.headers.get("content-type", "").lower()
+    if "zon" in content_type:
+        # parse ZON incrementally as the body arrives
+        return await zon_parse_stream(request.stream())
+    body = await request.body()
+    if not body:
+        raise ValueError("empty request body")
+    return loads_json(body)
+
+
+def render(
+    payload: Any, request: Request, status_code: int = 200, stream: bool = False
+) -> Response:
+    """Encode `payload` as ZON if the client accepts it, JSON otherwise.
+
+    `stream=True` sends ZON as chunks instead of one big string (batch payloads).
+    """
+    if wants_zon(request):
+        if stream:
+            return StreamingResponse(
+                iter_zon(payload), status_code=status_code, media_type=ZON_MEDIA_TYPE
+            )
+        return Response(
+            content=zon_serialize(payload),
+            status_code=status_code,
+            media_type=ZON_MEDIA_TYPE,
+        )
+    return Response(
+        content=dumps_json(payload), status_code=status_code, media_type=JSON_MEDIA_TYPE
+    )
@@ -16,13 +16,88 @@ class Settings:
     )
     LENGTH_PENALTY_OVER_MAX: float = float(os.getenv("LENGTH_PENALTY_OVER_MAX", "-5.0"))
 
+    # rubric registry: RUBRIC_DIR/<id>.xlsx is selectable via /score?rubric=<id>
+    RUBRIC_DIR: Optional[str] = os.getenv("RUBRIC_DIR")
+    RUBRIC_CACHE_SIZE: int = int(os.getenv("RUBRIC_CACHE_SIZE", "16"))
+    # compiled rubric artifacts (<rubric>.compiled.npz) skip Excel parsing
+    RUBRIC_ARTIFACTS: bool = os.getenv("RUBRIC_ARTIFACTS", "1").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+    # where artifacts are written (default: <tempdir>/oratio-rubrics)
+    RUBRIC_ARTIFACT_DIR: Optional[str] = os.getenv("RUBRIC_ARTIFACT_DIR")
+
+    # long-transcript chunking (models truncate at their max sequence length)
+    EMBEDDING_CHUNKING: bool = os.getenv("EMBEDDING_CHUNKING", "0").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+    CHUNK_WORDS: int = int(os.getenv("CHUNK_WORDS", "128"))
+    CHUNK_OVERLAP: int = int(os.getenv("CHUNK_OVERLAP", "32"))
+    CHUNK_POOLING: str = os.getenv("CHUNK_POOLING", "mean")  # mean|max|attention
+    CHUNK_BATCH_SIZE: int = int(os.getenv("CHUNK_BATCH_SIZE", "32"))
+
+    # eager warm-up of model + default rubric at startup (see /ready)
+    WARMUP_ON_STARTUP: bool = os.getenv("WARMUP_ON_STARTUP", "1").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+
+    # scoring executor (keeps CPU-bound scoring off the event loop)
+    SCORING_EXECUTOR: str = os.getenv("SCORING_EXECUTOR", "thread")  # thread|process
+    SCORING_MAX_WORKERS: int = int(os.getenv("SCORING_MAX_WORKERS", "4"))
+    SCORING_MAX_QUEUE: int = int(os.getenv("SCORING_MAX_QUEUE", "32"))
+    SCORING_RETRY_AFTER: int = int(os.getenv("SCORING_RETRY_AFTER", "1"))
+
+    # full /score result cache (app.result_cache); RESULT_CACHE_SIZE=0 disables
+    RESULT_CACHE_SIZE: int = int(os.getenv("RESULT_CACHE_SIZE", "1024"))
+    RESULT_CACHE_TTL_S: float = float(os.getenv("RESULT_CACHE_TTL_S", "3600"))
+    RESULT_CACHE_URL: Optional[str] = os.getenv("RESULT_CACHE_URL")  # redis://...
+
+    # /score?incremental=1 (app.incremental): cached per-sentence work
+    INCREMENTAL_CACHE_SIZE: int = int(os.getenv("INCREMENTAL_CACHE_SIZE", "20000"))
+
+    # on-demand profiling of /score (app.profiling); all off by default
+    PROFILE_TOKEN: Optional[str] = os.getenv("PROFILE_TOKEN")  # X-Profile-Token
+    PROFILE_SAMPLE_RATE: float = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    PROFILE_SLOW_MS: float = float(os.getenv("PROFILE_SLOW_MS", "0"))
+    PROFILE_MODE: str = os.getenv("PROFILE_MODE", "cprofile")  # cprofile|sample
+    PROFILE_DIR: Optional[str] = os.getenv("PROFILE_DIR")
+    PROFILE_MAX_FILES: int = int(os.getenv("PROFILE_MAX_FILES", "50"))
+    PROFILE_MAX_PER_MIN: int = int(os.getenv("PROFILE_MAX_PER_MIN", "10"))
+    PROFILE_INTERVAL_MS: float = float(os.getenv("PROFILE_INTERVAL_MS", "10"))
+
     # LLM config (optional)
     LLM_TEMPERATURE: float = float(os.getenv("LLM_TEMPERATURE", "0.0"))
     LLM_MAX_TOKENS: int = int(os.getenv("LLM_MAX_TOKENS", "300"))
+    # async feedback service (app.feedback_service): OpenAI-compatible chat API
+    LLM_PROVIDER: str = os.getenv("LLM_PROVIDER", "")  # openai|azure ("" -> auto)
+    LLM_MODEL: str = os.getenv("LLM_MODEL", "gpt-4o-mini")
+    LLM_BASE_URL: Optional[str] = os.getenv("LLM_BASE_URL")  # e.g. a local server
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+    LLM_TIMEOUT_S: float = float(os.getenv("LLM_TIMEOUT_S", "20"))
+    LLM_CACHE_SIZE: int = int(os.getenv("LLM_CACHE_SIZE", "1024"))
+    # one LLM request per criterion (in parallel) instead of one for all
+    LLM_PER_CRITERION: bool = os.getenv("LLM_PER_CRITERION", "0").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+
+    # /score?feedback=async jobs (app.feedback_jobs)
+    FEEDBACK_JOBS_MAX: int = int(os.getenv("FEEDBACK_JOBS_MAX", "1000"))
+    FEEDBACK_JOB_TTL_S: float = float(os.getenv("FEEDBACK_JOB_TTL_S", "600"))
+    FEEDBACK_WAIT_MAX_S: float = float(os.getenv("FEEDBACK_WAIT_MAX_S", "30"))
 
     # API keys (optional)
     AZURE_OPENAI_KEY: Optional[str] = os.getenv("AZURE_OPENAI_KEY")
     OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY")
+    AZURE_OPENAI_ENDPOINT: Optional[str] = os.getenv("AZURE_OPENAI_ENDPOINT")
+    AZURE_OPENAI_DEPLOYMENT: Optional[str] = os.getenv("AZURE_OPENAI_DEPLOYMENT")
+    AZURE_OPENAI_API_VERSION: str = os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-01")
 
 
 # single settings object to import elsewhere:
@@ -0,0 +1,292 @@
+"""
+Embedding backends selectable at runtime (EMBEDDING_BACKEND).
+
+  - "sentence-transformers" (default, alias "torch"): PyTorch SentenceTransformer,
+    loaded by app.nlp_utils.load_embedding_model
+  - "onnx": ONNX Runtime session over an exported transformer + mean pooling
+  - "onnx-int8": same, using dynamically int8-quantized weights
+
+ONNX backends only read a local directory (EMBEDDING_MODEL_DIR), never the
+network. The directory holds `model.onnx` (and/or `model_int8.onnx`),
+`tokenizer.json` and, optionally, the sentence-transformers config files:
+`sentence_bert_config.json` (max_seq_length) and `modules.json` (whether the
+model L2-normalizes its output). Build one on a machine with network access:
+
+  python -m app.embedding_backends export sentence-transformers/all-MiniLM-L6-v2 models/minilm
+  python -m app.embedding_backends quantize models/minilm
+
+`export` also saves the PyTorch model into the same directory, so
+EMBEDDING_MODEL=models/minilm loads the identical weights offline.
+
+EMBEDDING_ONNX_THREADS caps ONNX Runtime's intra-op threads (default: runtime's choice).
+"""
+
+import json
+import os
+import sys
+from typing import List, Optional, Sequence, Union
+
+import numpy as np
+
+SENTENCE_TRANSFORMERS = "sentence-transformers"
+ONNX = "onnx"
+ONNX_INT8 = "onnx-int8"
+BACKENDS = (SENTENCE_TRANSFORMERS, ONNX, ONNX_INT8)
+
+_ALIASES = {
+    "": SENTENCE_TRANSFORMERS,
+    "st": SENTENCE_TRANSFORMERS,
+    "torch": SENTENCE_TRANSFORMERS,
+    "pytorch": SENTENCE_TRANSFORMERS,
+    "int8": ONNX_INT8,
+    "onnx_int8": ONNX_INT8,
+}
+
+ONNX_FILE = "model.onnx"
+ONNX_INT8_FILE = "model_int8.onnx"
+_DEFAULT_MAX_SEQ_LENGTH = 256
+
+
+def backend_name(value: Optional[str] = None) -> str:
+    """
+    Canonical backend name from `value` (or EMBEDDING_BACKEND).
+    Raises ValueError for unknown backends.
+    """
+    if value is None:
+        value = os.getenv("EMBEDDING_BACKEND", SENTENCE_TRANSFORMERS)
+    name = value.strip().lower()
+    name = _ALIASES.get(name, name)
+    if name not in BACKENDS:
+        raise ValueError(
+            f"Unknown EMBEDDING_BACKEND {value!r}; expected one of {', '.join(BACKENDS)}"
+        )
+    return name
+
+
+def mean_pool(token_embs: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+    """
+    Average token embeddings over real (non-padding) tokens, like the
+    sentence-transformers Pooling module. (batch, seq, dim) -> (batch, dim).
+    """
+    mask = attention_mask[..., None].astype(token_embs.dtype)
+    summed = (token_embs * mask).sum(axis=1)
+    counts = np.clip(mask.sum(axis=1), 1e-9, None)
+    return summed / counts
+
+
+def _read_json(path: str) -> Optional[dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class OnnxEmbeddingModel:
+    """
+    SentenceTransformer-compatible `encode` on top of ONNX Runtime (CPU).
+
+    Returns float32 numpy arrays: (dim,) for a single string, (n, dim) for a list,
+    the same shapes the PyTorch backend returns.
+    """
+
+    def __init__(
+        self,
+        model_dir: str,
+        quantized: bool = False,
+        max_seq_length: Optional[int] = None,
+        batch_size: int = 32,
+    ):
+        import onnxruntime as ort  # optional dependency
+        from tokenizers import Tokenizer  # optional dependency
+
+        model_file = os.path.join(model_dir, ONNX_INT8_FILE if quantized else ONNX_FILE)
+        if not os.path.isfile(model_file):
+            hint = (
+                " (run `python -m app.embedding_backends quantize` first)"
+                if quantized
+                else ""
+            )
+            raise FileNotFoundError(f"{model_file} not found{hint}")
+
+        opts = ort.SessionOptions()
+        threads = int(os.getenv("EMBEDDING_ONNX_THREADS", "0"))
+        if threads > 0:
+            opts.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(
+            model_file, opts, providers=["CPUExecutionProvider"]
+        )
+        self._inputs = {i.name for i in self.session.get_inputs()}
+        outputs = [o.name for o in self.session.get_outputs()]
+        # some exports already include pooling; use that output if present
+        self._pooled_output = (
+            "sentence_embedding" if "sentence_embedding" in outputs else None
+        )
+
+        st_config = _read_json(os.path.join(model_dir, "sentence_bert_config.json"))
+        if max_seq_length is None:
+            max_seq_length = (st_config or {}).get(
+                "max_seq_length", _DEFAULT_MAX_SEQ_LENGTH
+            )
+        modules = _read_json(os.path.join(model_dir, "modules.json")) or []
+        self.normalize = any(
+            str(m.get("type", "")).endswith("Normalize") for m in modules
+        )
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=int(max_seq_length))
+        pad_token = next(
+            (
+                t
+                for t in ("[PAD]", "<pad>")
+                if self.tokenizer.token_to_id(t) is not None
+            ),
+            "[PAD]",
+        )
+        pad_id = self.tokenizer.token_to_id(pad_token) or 0
+        self.tokenizer.enable_padding(pad_id=pad_id, pad_token=pad_token)
+
+        self.batch_size = batch_size
+        self.quantized = quantized
+        self.name = (
+            f"{ONNX_INT8 if quantized else ONNX}:"
+            f"{os.path.basename(os.path.normpath(model_dir))}"
+        )
+        self.dim = int(self._encode_batch(["dim probe"]).shape[1])
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        enc = self.tokenizer.encode_batch(texts)
+        ids = np.array([e.ids for e in enc], dtype=np.int64)
+        mask = np.array([e.attention_mask for e in enc], dtype=np.int64)
+        feeds = {"input_ids": ids, "attention_mask": mask}
+        if "token_type_ids" in self._inputs:
+            feeds["token_type_ids"] = np.array(
+                [e.type_ids for e in enc], dtype=np.int64
+            )
+        if self._pooled_output is not None:
+            pooled = self.session.run([self._pooled_output], feeds)[0]
+        else:
+            pooled = mean_pool(self.session.run(None, feeds)[0], mask)
+        if self.normalize:
+            norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+            pooled = pooled / np.clip(norms, 1e-12, None)
+        return pooled.astype(np.float32, copy=False)
+
+    def encode(
+        self,
+        texts: Union[str, Sequence[str]],
+        convert_to_numpy: bool = True,
+        show_progress_bar: bool = False,
+    ) -> np.ndarray:
+        single = isinstance(texts, str)
+        items = [texts] if single else list(texts)
+        if not items:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        parts = [
+            self._encode_batch(items[i : i + self.batch_size])
+            for i in range(0, len(items), self.batch_size)
+        ]
+        embs = np.vstack(parts)
+        return embs[0] if single else embs
+
+
+def load_backend_model(backend: str, model_dir: Optional[str]) -> OnnxEmbeddingModel:
+    """
+    Load a non-default backend. Raises if the optional dependencies or the
+    model files are missing (the caller decides whether to fall back).
+    """
+    if not model_dir:
+        raise ValueError(f"EMBEDDING_MODEL_DIR must be set for backend {backend!r}")
+    if backend == ONNX:
+        return OnnxEmbeddingModel(model_dir)
+    if backend == ONNX_INT8:
+        return OnnxEmbeddingModel(model_dir, quantized=True)
+    raise ValueError(f"{backend!r} is not an ONNX backend")
+
+
+# ---------------------------
+# Build-time tools (need network, torch and onnx; never used at serve time)
+# ---------------------------
+
+
+def export_onnx(model_name: str, out_dir: str, opset: int = 14) -> str:
+    """
+    Save `model_name` (a SentenceTransformer) into `out_dir` and export its
+    transformer to `out_dir/model.onnx`. Returns the ONNX file path.
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    st = SentenceTransformer(model_name, device="cpu")
+    st.save(out_dir)
+    transformer = st[0].auto_model.eval()
+    tokenizer = st.tokenizer
+    if not os.path.isfile(os.path.join(out_dir, "tokenizer.json")):
+        tokenizer.backend_tokenizer.save(os.path.join(out_dir, "tokenizer.json"))
+
+    names = [
+        n
+        for n in ("input_ids", "attention_mask", "token_type_ids")
+        if n in tokenizer.model_input_names
+    ]
+
+    class _Wrapper(torch.nn.Module):
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, *args):
+            return self.model(**dict(zip(names, args)))[0]
+
+    sample = tokenizer(["export probe"], return_tensors="pt")
+    path = os.path.join(out_dir, ONNX_FILE)
+    axes = {n: {0: "batch", 1: "seq"} for n in names}
+    axes["last_hidden_state"] = {0: "batch", 1: "seq"}
+    torch.onnx.export(
+        _Wrapper(transformer),
+        tuple(sample[n] for n in names),
+        path,
+        input_names=names,
+        output_names=["last_hidden_state"],
+        dynamic_axes=axes,
+        opset_version=opset,
+    )
+    return path
+
+
+def quantize_onnx(model_dir: str) -> str:
+    """
+    Dynamic int8 quantization of `model_dir/model.onnx` into model_int8.onnx.
+    """
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    src = os.path.join(model_dir, ONNX_FILE)
+    dst = os.path.join(model_dir, ONNX_INT8_FILE)
+    quantize_dynamic(src, dst, weight_type=QuantType.QInt8)
+    return dst
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    ap = argparse.ArgumentParser(
+        prog="python -m app.embedding_backends",
+        description="Build local model directories for the ONNX embedding backends.",
+    )
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    exp = sub.add_parser("export", help="export a SentenceTransformer to ONNX")
+    exp.add_argument("model")
+    exp.add_argument("out_dir")
+    q = sub.add_parser("quantize", help="write model_int8.onnx next to model.onnx")
+    q.add_argument("model_dir")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "export":
+        print(f"[embedding_backends] wrote {export_onnx(args.model, args.out_dir)}")
+    else:
+        print(f"[embedding_backends] wrote {quantize_onnx(args.model_dir)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,231 @@
+"""
+Content-addressed cache for transcript embeddings.
+
+Keys are sha256(model name + normalized text), so the same transcript scored
+again (frontend retries, rubric comparisons, regrading) skips model.encode.
+
+Tiers:
+  - bounded in-memory LRU (EMBEDDING_CACHE_SIZE entries, 0 disables the cache)
+  - optional SQLite file (EMBEDDING_CACHE_PATH) shared across restarts, capped
+    at EMBEDDING_CACHE_DISK_SIZE rows; the least recently used rows go first
+
+The memory tier is cleared when a different model name is seen. Disk rows are
+keyed by model, so processes serving different models can share one file and
+switching back to a model finds its rows again.
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Optional
+
+import numpy as np
+
+
+def cache_key(model_name: str, normalized_text: str) -> str:
+    h = hashlib.sha256()
+    h.update(model_name.encode("utf-8"))
+    h.update(b"\0")
+    h.update(normalized_text.encode("utf-8"))
+    return h.hexdigest()
+
+
+class _SqliteTier:
+    def __init__(self, path: str, max_rows: int = 100_000):
+        d = os.path.dirname(os.path.abspath(path))
+        os.makedirs(d, exist_ok=True)
+        self.max_rows = max(1, int(max_rows))
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, model TEXT NOT NULL, "
+            "dtype TEXT NOT NULL, data BLOB NOT NULL, used REAL NOT NULL DEFAULT 0)"
+        )
+        columns = [r[1] for r in self._conn.execute("PRAGMA table_info(embeddings)")]
+        if "used" not in columns:
+            # files written before rows carried an access time
+            self._conn.execute(
+                "ALTER TABLE embeddings ADD COLUMN used REAL NOT NULL DEFAULT 0"
+            )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS embeddings_used ON embeddings (used)"
+        )
+        self._conn.commit()
+        self._rows = self._count()
+
+    def _count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        row = self._conn.execute(
+            "SELECT dtype, data FROM embeddings WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        self._conn.execute(
+            "UPDATE embeddings SET used = ? WHERE key = ?", (time.time(), key)
+        )
+        self._conn.commit()
+        return np.frombuffer(row[1], dtype=np.dtype(row[0])).copy()
+
+    def put(self, key: str, model_name: str, emb: np.ndarray) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO embeddings (key, model, dtype, data, used) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (key, model_name, emb.dtype.str, emb.tobytes(), time.time()),
+        )
+        # counts replaced keys too; recounted before anything is evicted
+        self._rows += 1
+        if self._rows > self.max_rows:
+            self._evict()
+        self._conn.commit()
+
+    def _evict(self) -> None:
+        self._rows = self._count()
+        excess = self._rows - self.max_rows
+        if excess <= 0:
+            return
+        # drop a little more than needed so eviction doesn't run on every put
+        excess += self.max_rows // 10
+        self._conn.execute(
+            "DELETE FROM embeddings WHERE key IN "
+            "(SELECT key FROM embeddings ORDER BY used LIMIT ?)",
+            (excess,),
+        )
+        self._rows = self._count()
+
+    def clear(self) -> None:
+        self._conn.execute("DELETE FROM embeddings")
+        self._conn.commit()
+        self._rows = 0
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class EmbeddingCache:
+    """
+    Thread-safe two-tier embedding cache with hit/miss counters.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        disk_path: Optional[str] = None,
+        max_disk_entries: int = 100_000,
+    ):
+        self.max_entries = max(0, int(max_entries))
+        self._mem: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._disk = _SqliteTier(disk_path, max_disk_entries) if disk_path else None
+        self._lock = Lock()
+        self._model_name: Optional[str] = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def _check_model(self, model_name: str) -> None:
+        # caller holds the lock
+        if self._model_name == model_name:
+            return
+        self._mem.clear()
+        self._model_name = model_name
+
+    def _remember(self, key: str, emb: np.ndarray) -> None:
+        # caller holds the lock
+        self._mem[key] = emb
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_entries:
+            self._mem.popitem(last=False)
+
+    def get(self, model_name: str, normalized_text: str) -> Optional[np.ndarray]:
+        if not self.enabled:
+            return None
+        key = cache_key(model_name, normalized_text)
+        with self._lock:
+            self._check_model(model_name)
+            emb = self._mem.get(key)
+            if emb is not None:
+                self._mem.move_to_end(key)
+                self.hits += 1
+                return emb.copy()
+            if self._disk is not None:
+                emb = self._disk.get(key)
+                if emb is not None:
+                    self._remember(key, emb)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return emb.copy()
+            self.misses += 1
+            return None
+
+    def put(self, model_name: str, normalized_text: str, emb: np.ndarray) -> None:
+        if not self.enabled:
+            return
+        key = cache_key(model_name, normalized_text)
+        emb = np.array(emb).reshape(-1)
+        with self._lock:
+            self._check_model(model_name)
+            self._remember(key, emb)
+            if self._disk is not None:
+                self._disk.put(key, model_name, emb)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._mem.clear()
+            if self._disk is not None:
+                self._disk.clear()
+            self.hits = self.disk_hits = self.misses = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._mem),
+                "max_entries": self.max_entries,
+                "disk": self._disk is not None,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "model": self._model_name,
+            }
+
+
+_cache: Optional[EmbeddingCache] = None
+_cache_lock = Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """
+    Process-wide cache configured from EMBEDDING_CACHE_SIZE /
+    EMBEDDING_CACHE_PATH / EMBEDDING_CACHE_DISK_SIZE.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = EmbeddingCache(
+                    max_entries=int(os.getenv("EMBEDDING_CACHE_SIZE", "1024")),
+                    disk_path=os.getenv("EMBEDDING_CACHE_PATH") or None,
+                    max_disk_entries=int(
+                        os.getenv("EMBEDDING_CACHE_DISK_SIZE", "100000")
+                    ),
+                )
+    return _cache
+
+
+def _reset_after_fork() -> None:
+    # a SQLite connection must not be shared across fork(); reopen in the child
+    global _cache, _cache_lock
+    _cache, _cache_lock = None, Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,249 @@
+"""
+Bounded executor for CPU-bound scoring work.
+
+FastAPI handlers are async, but the scoring pipeline (embedding + keyword
+matching) is synchronous. Running it directly on the event loop stalls every
+other request, including /health. This module runs it in a worker pool
+instead:
+  - thread pool by default, process pool via SCORING_EXECUTOR=process
+  - at most SCORING_MAX_WORKERS jobs run at once
+  - at most SCORING_MAX_QUEUE jobs wait behind them; further submissions
+    raise QueueFullError so the API can answer 503 + Retry-After
+A job's slot is freed when its work finishes, not when the awaiting request
+goes away: a cancelled request (client disconnect, timeout) cannot stop a
+running thread, so it keeps counting against the bound until it is done.
+"""
+
+import asyncio
+import contextvars
+import multiprocessing
+import os
+import time
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from threading import Lock
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional
+
+from app.config import settings
+from app.metrics import record
+from app.profiling import call
+
+
+class QueueFullError(RuntimeError):
+    """Raised when the scoring queue is at capacity."""
+
+    def __init__(self, retry_after: int = 1):
+        super().__init__("Scoring queue is full")
+        self.retry_after = retry_after
+
+
+_DONE = object()
+
+
+def _timed_call(submitted: float, fn: Callable, *args: Any) -> Any:
+    # time spent waiting for a free worker, as the "queue" stage
+    record("queue", time.perf_counter() - submitted)
+    return call(fn, *args)
+
+
+def _process_context():
+    # the pool starts on the first request, while warm-up, micro-batcher and
+    # profiler threads may hold locks: a forked worker would inherit them held
+    # and hang. forkserver/spawn workers start from a clean interpreter.
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context(
+        "forkserver" if "forkserver" in methods else "spawn"
+    )
+
+
+class ScoringExecutor:
+    """
+    Worker pool with an admission limit of `max_workers + max_queue` jobs.
+    """
+
+    def __init__(
+        self,
+        kind: str = "thread",
+        max_workers: int = 4,
+        max_queue: int = 32,
+        retry_after: int = 1,
+    ):
+        kind = (kind or "thread").lower()
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind: {kind!r}")
+        self.kind = kind
+        self.max_workers = max(1, int(max_workers))
+        self.max_queue = max(0, int(max_queue))
+        self.retry_after = int(retry_after)
+        self._pool: Optional[Executor] = None
+        self._iter_pool: Optional[Executor] = None
+        self._lock = Lock()
+        self._pending = 0
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    if self.kind == "process":
+                        self._pool = ProcessPoolExecutor(
+                            max_workers=self.max_workers, mp_context=_process_context()
+                        )
+                    else:
+                        self._pool = ThreadPoolExecutor(
+                            max_workers=self.max_workers,
+                            thread_name_prefix="oratio-score",
+                        )
+        return self._pool
+
+    def _get_thread_pool(self) -> Executor:
+        """Pool for work that must stay in this process (generator steps)."""
+        if self.kind == "thread":
+            return self._get_pool()
+        if self._iter_pool is None:
+            with self._lock:
+                if self._iter_pool is None:
+                    self._iter_pool = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="oratio-score-iter",
+                    )
+        return self._iter_pool
+
+    @property
+    def pending(self) -> int:
+        """Jobs currently running or waiting for a worker."""
+        return self._pending
+
+    @property
+    def in_flight(self) -> int:
+        return min(self._pending, self.max_workers)
+
+    @property
+    def queued(self) -> int:
+        return max(0, self._pending - self.max_workers)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+        }
+
+    def _acquire(self) -> None:
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                raise QueueFullError(self.retry_after)
+            self._pending += 1
+
+    def _release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    async def run(self, fn: Callable, *args: Any) -> Any:
+        """
+        Run `fn(*args)` in the pool and await its result.
+        Raises QueueFullError immediately if the pool is saturated.
+        With the process pool, `fn` and its arguments must be picklable.
+        """
+        self._acquire()
+        try:
+            if self.kind == "thread":
+                # run in a copy of the caller's context (request timings, profiling)
+                ctx = contextvars.copy_context()
+                call = (ctx.run, _timed_call, time.perf_counter(), fn, *args)
+                fut = self._get_pool().submit(*call)
+            else:
+                fut = self._get_pool().submit(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        # freed when the work is done (or cancelled before it started)
+        fut.add_done_callback(lambda _f: self._release())
+        return await asyncio.wrap_future(fut)
+
+    async def run_iter(self, gen: Iterator) -> AsyncIterator:
+        """
+        Step the generator `gen` in the pool and yield its items as they are
+        produced. The whole generator counts as one admitted job; QueueFullError
+        is raised from the first `__anext__` if the pool is saturated.
+        Generators can't be sent to another process, so with the process pool
+        the steps run on a thread pool of their own.
+        """
+        self._acquire()
+        step: Optional[Future] = None
+
+        def finish(_f: Optional[Future] = None) -> None:
+            self._release()
+            gen.close()
+
+        try:
+            pool = self._get_thread_pool()
+            ctx = contextvars.copy_context()
+            while True:
+                step = pool.submit(ctx.run, next, gen, _DONE)
+                item = await asyncio.wrap_future(step)
+                if item is _DONE:
+                    return
+                yield item
+        finally:
+            if step is not None and not step.done():
+                # cancelled mid-step: the step still runs in its thread
+                step.add_done_callback(finish)
+            else:
+                finish()
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            pools = (self._pool, self._iter_pool)
+            self._pool = self._iter_pool = None
+        for pool in pools:
+            if pool is not None:
+                pool.shutdown(wait=wait)
+
+
+_executor: Optional[ScoringExecutor] = None
+_executor_lock = Lock()
+
+
+def get_executor() -> ScoringExecutor:
+    """
+    Lazily created process-wide executor configured from settings.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ScoringExecutor(
+                    kind=settings.SCORING_EXECUTOR,
+                    max_workers=settings.SCORING_MAX_WORKERS,
+                    max_queue=settings.SCORING_MAX_QUEUE,
+                    retry_after=settings.SCORING_RETRY_AFTER,
+                )
+    return _executor
+
+
+def shutdown_executor(wait: bool = True) -> None:
+    global _executor
+    with _executor_lock:
+        ex, _executor = _executor, None
+    if ex is not None:
+        ex.shutdown(wait=wait)
+
+
+def _reset_after_fork() -> None:
+    # worker threads/processes do not survive fork(); children build their own pool
+    global _executor, _executor_lock
+    _executor, _executor_lock = None, Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+async def run_scoring(fn: Callable, *args: Any) -> Any:
+    return await get_executor().run(fn, *args)
@@ -0,0 +1,137 @@
+"""
+Background feedback jobs for `/score?feedback=async`.
+
+LLM feedback takes 10-100x longer than scoring, so `/score` returns the
+scores at once with a job id and the feedback is generated in the background
+(app.feedback_service). Clients fetch it from `GET /feedback/{job_id}`, either
+by long-polling (`?wait=<seconds>`) or as server-sent events.
+
+The store is bounded (FEEDBACK_JOBS_MAX jobs; a full store rejects new jobs
+rather than dropping work someone may still poll) and finished jobs expire
+FEEDBACK_JOB_TTL_S seconds after they complete.
+"""
+
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from app.config import settings
+from app.feedback_service import Evidence, agenerate_feedback
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+
+class JobStoreFullError(RuntimeError):
+    """Raised when the job store is at capacity with unfinished jobs."""
+
+
+class FeedbackJob:
+    def __init__(self, job_id: str):
+        self.id = job_id
+        self.status = PENDING
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.feedback: Optional[Dict[str, Dict]] = None
+        self.error: Optional[str] = None
+        self.done = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    def info(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"id": self.id, "status": self.status}
+        if self.status == DONE:
+            out["feedback"] = self.feedback
+        elif self.status == FAILED:
+            out["error"] = self.error
+        return out
+
+
+class FeedbackJobStore:
+    def __init__(self, max_jobs: int = 1000, ttl_s: float = 600.0):
+        self.max_jobs = max(1, int(max_jobs))
+        self.ttl_s = float(ttl_s)
+        self._jobs: "OrderedDict[str, FeedbackJob]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def _expire(self) -> None:
+        cutoff = time.time() - self.ttl_s
+        for job_id in [
+            j.id
+            for j in self._jobs.values()
+            if j.finished_at is not None and j.finished_at < cutoff
+        ]:
+            del self._jobs[job_id]
+
+    def submit(self, evidence: Evidence) -> FeedbackJob:
+        """
+        Start generating feedback for `evidence` in the background.
+        Must be called from the event loop. Raises JobStoreFullError.
+        """
+        self._expire()
+        if len(self._jobs) >= self.max_jobs:
+            # make room by dropping the oldest finished job, never pending ones
+            oldest = next((j for j in self._jobs.values() if j.done.is_set()), None)
+            if oldest is None:
+                raise JobStoreFullError("feedback job store is full")
+            del self._jobs[oldest.id]
+        job = FeedbackJob(uuid.uuid4().hex)
+        self._jobs[job.id] = job
+        job.task = asyncio.get_running_loop().create_task(self._run(job, evidence))
+        return job
+
+    async def _run(self, job: FeedbackJob, evidence: Evidence) -> None:
+        try:
+            job.feedback = await agenerate_feedback(evidence)
+            job.status = DONE
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            job.status = FAILED
+            print(f"[feedback_jobs] job {job.id} failed: {job.error}")
+        finally:
+            if job.status == PENDING:  # cancelled
+                job.status, job.error = FAILED, "cancelled"
+            job.finished_at = time.time()
+            job.task = None
+            job.done.set()
+
+    def get(self, job_id: str) -> Optional[FeedbackJob]:
+        self._expire()
+        return self._jobs.get(job_id)
+
+    async def wait(self, job: FeedbackJob, timeout: float) -> bool:
+        """Wait up to `timeout` seconds for `job`; True if it finished."""
+        if timeout > 0 and not job.done.is_set():
+            try:
+                await asyncio.wait_for(job.done.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return job.done.is_set()
+
+    def cancel_all(self) -> None:
+        for job in self._jobs.values():
+            if job.task is not None:
+                job.task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        pending = sum(1 for j in self._jobs.values() if not j.done.is_set())
+        return {"jobs": len(self._jobs), "pending": pending, "max": self.max_jobs}
+
+
+_store: Optional[FeedbackJobStore] = None
+
+
+def get_job_store() -> FeedbackJobStore:
+    """
+    Process-wide job store (only touched from the event loop, so no lock).
+    """
+    global _store
+    if _store is None:
+        _store = FeedbackJobStore(
+            max_jobs=settings.FEEDBACK_JOBS_MAX, ttl_s=settings.FEEDBACK_JOB_TTL_S
+        )
+    return _store
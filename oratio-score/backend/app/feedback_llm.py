@@ -57,16 +57,8 @@ def generate_feedback_simple(transcript: List[Dict]) -> Dict[str, Dict]:
     return out
 
 
-def _build_prompt_and_parser():
-    """
-    Build prompt template and StructuredOutputParser that expects a JSON list of objects:
-    [
-    {"criterion":"...", "evaluation": "...", "suggestion": "...", "justification":"..."},
-    ...
-    ]
-    """
-    # We will instruct the LLM to output strict JSON for robust parsing
-    template = """You are an objective assistant that writes short  (1-2 sentence) feedback message for student spoken-transcripts.
+# shared with app.feedback_service
+FEEDBACK_TEMPLATE = """You are an objective assistant that writes short  (1-2 sentence) feedback message for student spoken-transcripts.
 Given a list of criteria evidence evidence, produce a JSON array where each item has:
 - criterion (string)
 - evaluation (string, 1-2 sentences)
@@ -77,6 +69,18 @@ Input evidence:
 {transcript_bolb}
 
 Output (JSON array):"""
+
+
+def _build_prompt_and_parser():
+    """
+    Build prompt template and StructuredOutputParser that expects a JSON list of objects:
+    [
+    {"criterion":"...", "evaluation": "...", "suggestion": "...", "justification":"..."},
+    ...
+    ]
+    """
+    # We will instruct the LLM to output strict JSON for robust parsing
+    template = FEEDBACK_TEMPLATE
     prompt = PromptTemplate(input_variables=["transcript_bolb"], template=template)
 
     # We'll not rely on StructuredOutputParser for nested arrays here to keep the dependency simple;
@@ -0,0 +1,380 @@
+"""
+Async LLM feedback service.
+
+`feedback_llm.generate_feedback_llm` builds a new client and chain on every
+call and blocks while one request carries the whole evidence blob. This
+service instead:
+  - reuses one pooled httpx.AsyncClient against an OpenAI-compatible chat
+    completions API: OpenAI, Azure OpenAI, or any server at LLM_BASE_URL
+    (e.g. a local stub in tests)
+  - caches parsed feedback by evidence hash + model + temperature
+    (LRU, LLM_CACHE_SIZE), so regrading unchanged evidence at temperature 0
+    makes no LLM call; identical concurrent requests share one call
+  - caps concurrent LLM calls (LLM_MAX_CONCURRENCY) and falls back to
+    `generate_feedback_simple` on timeout (LLM_TIMEOUT_S, queueing included),
+    HTTP errors or output that does not validate
+  - can fan out one request per criterion in parallel (LLM_PER_CRITERION);
+    each criterion is then cached on its own
+
+Without an API key or LLM_BASE_URL the deterministic feedback is returned.
+"""
+
+import asyncio
+import hashlib
+import json
+import re
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, List, Optional, Union
+
+import httpx
+
+from app.config import settings
+from app.feedback_llm import (
+    FEEDBACK_TEMPLATE,
+    _convert_parsed_to_dict,
+    _validate_parsed_feedback,
+    generate_feedback_simple,
+)
+
+# evidence fields the LLM sees (chunk_scores etc. only add tokens)
+_PROMPT_FIELDS = (
+    "name",
+    "description",
+    "keywords",
+    "keywords_found",
+    "keyword_score",
+    "semantic_score",
+    "length_penalty",
+    "raw_score",
+)
+
+_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+Evidence = Union[Dict[str, Dict], List[Dict]]
+
+
+def _as_items(evidence: Evidence) -> List[Dict]:
+    # score results key evidence by criterion name; feedback_llm takes a list
+    if isinstance(evidence, dict):
+        return [dict(v, name=v.get("name", k)) for k, v in evidence.items()]
+    return list(evidence)
+
+
+def _prompt_item(item: Dict) -> Dict:
+    return {k: item[k] for k in _PROMPT_FIELDS if k in item}
+
+
+class FeedbackService:
+    def __init__(
+        self,
+        base_url: Optional[str],
+        api_key: Optional[str] = None,
+        model: str = "gpt-4o-mini",
+        provider: str = "openai",
+        temperature: float = 0.0,
+        max_tokens: int = 300,
+        max_concurrency: int = 4,
+        timeout_s: float = 20.0,
+        cache_size: int = 1024,
+        per_criterion: bool = False,
+        azure_deployment: Optional[str] = None,
+        azure_api_version: str = "2024-02-01",
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.base_url = base_url.rstrip("/") if base_url else None
+        self.api_key = api_key
+        self.model = model
+        self.provider = provider
+        self.temperature = float(temperature)
+        self.max_tokens = int(max_tokens)
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.timeout_s = float(timeout_s)
+        self.cache_size = int(cache_size)
+        self.per_criterion = per_criterion
+        self.azure_deployment = azure_deployment
+        self.azure_api_version = azure_api_version
+        self._transport = transport
+
+        self._cache: "OrderedDict[str, Dict[str, Dict]]" = OrderedDict()
+        self._cache_lock = Lock()
+        # client, semaphore and in-flight futures belong to one event loop
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+        self.calls = 0
+        self.hits = 0
+        self.misses = 0
+        self.fallbacks = 0
+        self.timeouts = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.base_url is not None
+
+    # ---- plumbing ----
+
+    async def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._client is not None:
+            return
+        # first use, or a new loop (e.g. tests): pooled connections can't move
+        old_client, old_loop = self._client, self._loop
+        self._loop = loop
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout_s,
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency,
+            ),
+            transport=self._transport,
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._inflight = {}
+        if old_client is not None:
+            await _close_on_loop(old_client, old_loop)
+
+    async def aclose(self) -> None:
+        client, self._client, self._loop = self._client, None, None
+        if client is not None:
+            await client.aclose()
+
+    def _url_and_headers(self):
+        headers = {"Content-Type": "application/json"}
+        if self.provider == "azure":
+            url = (
+                f"{self.base_url}/openai/deployments/{self.azure_deployment}"
+                f"/chat/completions?api-version={self.azure_api_version}"
+            )
+            if self.api_key:
+                headers["api-key"] = self.api_key
+        else:
+            url = f"{self.base_url}/chat/completions"
+            if self.api_key:
+                headers["Authorization"] = f"Bearer {self.api_key}"
+        return url, headers
+
+    def cache_key(self, prompt_items: List[Dict]) -> str:
+        blob = json.dumps(prompt_items, sort_keys=True, default=str)
+        h = hashlib.sha256()
+        h.update(f"{self.model}\0{self.temperature!r}\0".encode("utf-8"))
+        h.update(blob.encode("utf-8"))
+        return h.hexdigest()
+
+    def _cache_get(self, key: str) -> Optional[Dict[str, Dict]]:
+        with self._cache_lock:
+            hit = self._cache.get(key)
+            if hit is not None:
+                self._cache.move_to_end(key)
+            return hit
+
+    def _cache_put(self, key: str, value: Dict[str, Dict]) -> None:
+        if self.cache_size <= 0:
+            return
+        with self._cache_lock:
+            self._cache[key] = value
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def clear_cache(self) -> None:
+        with self._cache_lock:
+            self._cache.clear()
+
+    # ---- LLM calls ----
+
+    async def _post(self, prompt_items: List[Dict]) -> str:
+        url, headers = self._url_and_headers()
+        prompt = FEEDBACK_TEMPLATE.format(
+            transcript_bolb=json.dumps(prompt_items, indent=2, default=str)
+        )
+        body = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+        }
+        async with self._semaphore:
+            self.calls += 1
+            resp = await self._client.post(url, json=body, headers=headers)
+        resp.raise_for_status()
+        return resp.json()["choices"][0]["message"]["content"]
+
+    async def _call(self, prompt_items: List[Dict]) -> Optional[Dict[str, Dict]]:
+        """Parsed feedback for `prompt_items`, or None if the LLM path failed."""
+        try:
+            raw = await asyncio.wait_for(self._post(prompt_items), self.timeout_s)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            print(f"[feedback_service] LLM call timed out after {self.timeout_s}s")
+            return None
+        except Exception as e:
+            print(f"[feedback_service] LLM call failed: {type(e).__name__}: {e}")
+            return None
+        try:
+            parsed = json.loads(_FENCE_RE.sub("", raw.strip()))
+        except (TypeError, ValueError):
+            return None
+        if not _validate_parsed_feedback(parsed):
+            return None
+        out = _convert_parsed_to_dict(parsed)
+        if any(item.get("name") not in out for item in prompt_items):
+            return None
+        return {item["name"]: out[item["name"]] for item in prompt_items}
+
+    async def _generate_group(self, items: List[Dict]) -> Dict[str, Dict]:
+        prompt_items = [_prompt_item(i) for i in items]
+        key = self.cache_key(prompt_items)
+        cached = self._cache_get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.hits += 1
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        try:
+            out = await self._call(prompt_items)
+            if out is not None:
+                self._cache_put(key, out)
+            else:
+                self.fallbacks += 1
+                out = generate_feedback_simple(items)
+            fut.set_result(out)
+            return out
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        finally:
+            self._inflight.pop(key, None)
+            if fut.done() and not fut.cancelled():
+                fut.exception()  # mark retrieved when nobody else waited
+
+    async def generate(
+        self, evidence: Evidence, per_criterion: Optional[bool] = None
+    ) -> Dict[str, Dict]:
+        """
+        Feedback keyed by criterion name ({evaluation, suggestion, justification})
+        for a score result's `evidence` (dict by name, or a list of items).
+        Never raises for LLM problems: those fall back to deterministic feedback.
+        """
+        items = [i for i in _as_items(evidence) if i.get("name")]
+        if not items:
+            return {}
+        if not self.enabled:
+            return generate_feedback_simple(items)
+        await self._bind_loop()
+        fan_out = self.per_criterion if per_criterion is None else per_criterion
+        groups = [[i] for i in items] if fan_out else [items]
+        results = await asyncio.gather(*(self._generate_group(g) for g in groups))
+        out: Dict[str, Dict] = {}
+        for r in results:
+            out.update(r)
+        # copies: callers may annotate the result without touching the cache
+        return {name: dict(v) for name, v in out.items()}
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        with self._cache_lock:
+            size = len(self._cache)
+        return {
+            "enabled": self.enabled,
+            "model": self.model,
+            "calls": self.calls,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "fallbacks": self.fallbacks,
+            "timeouts": self.timeouts,
+            "cache_entries": size,
+        }
+
+
+async def _close_on_loop(
+    client: httpx.AsyncClient, loop: Optional[asyncio.AbstractEventLoop]
+) -> None:
+    """
+    Close a client created on another event loop. Its connections can only be
+    closed on that loop: run it there if it is still open.
+    """
+    try:
+        if loop is None or loop.is_closed():
+            # nothing pooled closes cleanly; open sockets went with the loop
+            await client.aclose()
+        elif loop.is_running():
+            close = asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            await asyncio.wrap_future(close)
+        else:
+            await asyncio.to_thread(loop.run_until_complete, client.aclose())
+    except Exception as e:
+        print(f"[feedback_service] Could not close the previous HTTP client: {e}")
+
+
+def _provider() -> str:
+    if settings.LLM_PROVIDER:
+        return settings.LLM_PROVIDER.lower()
+    if settings.AZURE_OPENAI_KEY and settings.AZURE_OPENAI_ENDPOINT:
+        return "azure"
+    return "openai"
+
+
+def service_from_settings() -> FeedbackService:
+    provider = _provider()
+    if provider == "azure":
+        base_url = settings.LLM_BASE_URL or settings.AZURE_OPENAI_ENDPOINT
+        api_key = settings.AZURE_OPENAI_KEY
+    else:
+        base_url = settings.LLM_BASE_URL or (
+            "https://api.openai.com/v1" if settings.OPENAI_API_KEY else None
+        )
+        api_key = settings.OPENAI_API_KEY
+    return FeedbackService(
+        base_url=base_url,
+        api_key=api_key,
+        model=settings.LLM_MODEL,
+        provider=provider,
+        temperature=settings.LLM_TEMPERATURE,
+        max_tokens=settings.LLM_MAX_TOKENS,
+        max_concurrency=settings.LLM_MAX_CONCURRENCY,
+        timeout_s=settings.LLM_TIMEOUT_S,
+        cache_size=settings.LLM_CACHE_SIZE,
+        per_criterion=settings.LLM_PER_CRITERION,
+        azure_deployment=settings.AZURE_OPENAI_DEPLOYMENT,
+        azure_api_version=settings.AZURE_OPENAI_API_VERSION,
+    )
+
+
+_service: Optional[FeedbackService] = None
+_service_lock = Lock()
+
+
+def get_feedback_service() -> FeedbackService:
+    """
+    Process-wide service configured from settings.
+    """
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = service_from_settings()
+    return _service
+
+
+async def close_feedback_service() -> None:
+    if _service is not None:
+        await _service.aclose()
+
+
+async def agenerate_feedback(
+    evidence: Evidence, per_criterion: Optional[bool] = None
+) -> Dict[str, Dict]:
+    return await get_feedback_service().generate(evidence, per_criterion)
@@ -0,0 +1,212 @@
+"""
+Incremental re-scoring for edited transcripts (`/score?incremental=1`).
+
+The transcript is split into sentences / paragraphs (`split_segments`). Per
+segment, keyed by a hash of its cleaned text, the cache keeps
+  - its embedding (per embedding model)
+  - its keyword scan (per rubric version) and, filled lazily, which keywords
+    it matches fuzzily
+so after a small edit only the changed segments are embedded and scanned.
+The transcript-level inputs are rebuilt from the cached pieces:
+  - embedding: segment embeddings pooled with CHUNK_POOLING
+  - keyword hits: union of the segment scans (word count is exact)
+
+Keyword scores equal full scoring except for matches spanning a segment
+boundary. Semantic scores come from pooled sentence embeddings rather than one
+embedding of the whole text, so they differ slightly from full scoring.
+"""
+
+import hashlib
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.metrics import span
+from app.nlp_utils import (
+    KeywordScan,
+    current_model_name,
+    embed_batch,
+    find_keywords_fuzzy,
+    pool_embeddings,
+    split_segments,
+)
+from app.rubric_registry import CompiledRubric
+
+
+class _SegmentKeywords:
+    __slots__ = ("scan", "checked", "fuzzy")
+
+    def __init__(self, scan: KeywordScan):
+        self.scan = scan
+        self.checked: Set[str] = set()  # keywords run through fuzzy matching
+        self.fuzzy: Set[str] = set()  # those of them that matched
+
+
+class SegmentCache:
+    """
+    Thread-safe LRU of per-segment embeddings and keyword scans.
+    """
+
+    def __init__(self, max_entries: int = 20000):
+        self.max_entries = max(0, int(max_entries))
+        self._data: "OrderedDict[Tuple, Any]" = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple) -> Any:
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def get_many(self, keys: List[Tuple]) -> List[Any]:
+        """`get` for many keys under one lock acquisition."""
+        out = []
+        with self._lock:
+            for key in keys:
+                value = self._data.get(key)
+                if value is not None:
+                    self._data.move_to_end(key)
+                out.append(value)
+            found = sum(v is not None for v in out)
+            self.hits += found
+            self.misses += len(out) - found
+        return out
+
+    def put(self, key: Tuple, value: Any) -> None:
+        if not self.max_entries:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
+
+
+def segment_key(segment: str) -> str:
+    # whitespace-normalized like clean_text, without the regex
+    normalized = " ".join(segment.split())
+    return hashlib.blake2b(
+        normalized.encode("utf-8", "surrogatepass"), digest_size=16
+    ).hexdigest()
+
+
+def _segment_embeddings(
+    cache: SegmentCache, segments: List[str], keys: List[str]
+) -> np.ndarray:
+    model = current_model_name()
+    embs: List[Optional[np.ndarray]] = cache.get_many([("emb", model, k) for k in keys])
+    missing: Dict[str, List[int]] = {}
+    for i, emb in enumerate(embs):
+        if emb is None:
+            missing.setdefault(keys[i], []).append(i)
+    if missing:
+        texts = [segments[idx[0]] for idx in missing.values()]
+        for (key, idx), emb in zip(missing.items(), embed_batch(texts)):
+            cache.put(("emb", model, key), emb)
+            for i in idx:
+                embs[i] = emb
+    return np.array(embs)
+
+
+def _segment_scans(
+    cache: SegmentCache,
+    compiled: CompiledRubric,
+    segments: List[str],
+    keys: List[str],
+) -> List[_SegmentKeywords]:
+    version = compiled.version
+    out = cache.get_many([("kw", version, k) for k in keys])
+    for i, entry in enumerate(out):
+        if entry is None:
+            entry = _SegmentKeywords(compiled.keyword_index.scan(segments[i]))
+            cache.put(("kw", version, keys[i]), entry)
+            out[i] = entry
+    return out
+
+
+def _merged_scan(compiled: CompiledRubric, entries: List[_SegmentKeywords]):
+    tokens: List[str] = []
+    matched = set()
+    for e in entries:
+        tokens.extend(e.scan.tokens)
+        matched |= e.scan.matched
+    text_lower = " ".join(e.scan.text_lower for e in entries)
+    return KeywordScan(compiled.keyword_index, text_lower, tokens, matched)
+
+
+def _fuzzy_lookup(entries: List[_SegmentKeywords]):
+    # distinct segments, each checked only for keywords it hasn't seen yet
+    unique = list({id(e): e for e in entries}.values())
+
+    def lookup(keywords: List[str]) -> List[str]:
+        pending = set(keywords)
+        for e in unique:
+            if not pending:
+                break
+            todo = pending - e.checked
+            if todo:
+                e.fuzzy.update(
+                    find_keywords_fuzzy(e.scan.text_lower, list(todo), scan=e.scan)
+                )
+                e.checked |= todo
+            pending -= e.fuzzy
+        return [kw for kw in keywords if kw not in pending]
+
+    return lookup
+
+
+def segmented_inputs(text: str, compiled: CompiledRubric):
+    """
+    (transcript embedding, keyword scan, fuzzy lookup) for scoring `text`
+    against `compiled`, built from cached per-segment results.
+    """
+    cache = get_segment_cache()
+    with span("segment"):
+        segments = split_segments(text) or [text]
+        keys = [segment_key(s) for s in segments]
+    with span("embed"):
+        embs = _segment_embeddings(cache, segments, keys)
+        transcript_emb = pool_embeddings(embs, settings.CHUNK_POOLING)
+    entries = _segment_scans(cache, compiled, segments, keys)
+    return transcript_emb, _merged_scan(compiled, entries), _fuzzy_lookup(entries)
+
+
+_cache: Optional[SegmentCache] = None
+_cache_lock = Lock()
+
+
+def get_segment_cache() -> SegmentCache:
+    """
+    Process-wide segment cache configured from INCREMENTAL_CACHE_SIZE.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SegmentCache(settings.INCREMENTAL_CACHE_SIZE)
+    return _cache
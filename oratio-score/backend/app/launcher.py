@@ -0,0 +1,175 @@
+"""
+Production launcher: preload once, then fork workers that share it.
+
+  python -m app.launcher --workers 4 --host 0.0.0.0 --port 8000
+
+`uvicorn --workers N` imports the app in every worker, so each one loads its
+own embedding model and compiles its own rubric. Here the parent process does
+that once (model load, default rubric from its compiled artifact), freezes the
+GC so those objects are never written to again, binds the listening socket and
+forks the workers. Model weights, rubric embeddings and the imported code are
+then shared copy-on-write; each extra worker only adds its own heap.
+
+Notes:
+  - POSIX only (needs os.fork). On other platforms use uvicorn directly.
+  - The parent never calls the model: inference can start thread pools (e.g.
+    torch intra-op threads) that do not survive fork. A missing or stale
+    rubric artifact is compiled in a throwaway subprocess first (or ahead of
+    time with make compile-rubric); if there is still none (RUBRIC_ARTIFACTS=0,
+    unwritable RUBRIC_ARTIFACT_DIR) the parent only loads the model and each
+    worker compiles the rubric in its startup warm-up.
+  - Workers that die are restarted. SIGTERM/SIGINT stop all of them gracefully.
+
+Defaults come from HOST, PORT and WEB_CONCURRENCY (number of workers).
+"""
+
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, List, Optional
+
+# restart a crashing worker at most this often
+_RESPAWN_BACKOFF_S = 1.0
+
+
+def preload(rubric_id: Optional[str] = None) -> Dict[str, float]:
+    """
+    Import the app and load everything the workers should share.
+    Returns the warm-up timings; raises if warm-up failed.
+    """
+    from app import main  # noqa: F401  (import the app before forking)
+    from app import warmup
+
+    state = warmup.run_prefork_warmup(rubric_id)
+    if state.error is not None:
+        raise RuntimeError(f"preload failed: {state.error}")
+    # move everything loaded so far to a permanent generation: the collector
+    # then never touches (and copies) those pages in the workers
+    gc.collect()
+    gc.freeze()
+    return dict(state.timings)
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(sock: socket.socket, log_level: str) -> None:
+    import uvicorn
+
+    from app.main import app
+
+    for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGCHLD):
+        signal.signal(sig, signal.SIG_DFL)
+    config = uvicorn.Config(app, log_level=log_level, lifespan="on")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def spawn_worker(sock: socket.socket, log_level: str = "info") -> int:
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            _run_worker(sock, log_level)
+        except BaseException as e:
+            print(f"[launcher] worker {os.getpid()} crashed: {e}", file=sys.stderr)
+            code = 1
+        finally:
+            os._exit(code)
+    return pid
+
+
+def serve(
+    host: str,
+    port: int,
+    workers: int,
+    log_level: str = "info",
+    rubric_id: Optional[str] = None,
+) -> int:
+    if not hasattr(os, "fork"):
+        print("[launcher] os.fork is not available; run uvicorn directly")
+        return 2
+
+    t = time.perf_counter()
+    timings = preload(rubric_id)
+    print(
+        f"[launcher] preloaded in {time.perf_counter() - t:.2f}s "
+        f"(model {timings.get('model_load_s', 0):.2f}s, "
+        f"rubric {timings.get('rubric_compile_s', 0):.2f}s)"
+    )
+    sock = bind_socket(host, port)
+    print(f"[launcher] listening on {host}:{port} with {workers} workers")
+
+    children: List[int] = []
+    stopping = False
+
+    def _stop(signum, _frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+    children.extend(spawn_worker(sock, log_level) for _ in range(workers))
+
+    last_respawn = 0.0
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        if pid not in children:
+            continue
+        children.remove(pid)
+        if stopping:
+            continue
+        print(f"[launcher] worker {pid} exited ({status}); restarting")
+        wait = _RESPAWN_BACKOFF_S - (time.monotonic() - last_respawn)
+        if wait > 0:
+            time.sleep(wait)
+        last_respawn = time.monotonic()
+        children.append(spawn_worker(sock, log_level))
+
+    sock.close()
+    print("[launcher] all workers stopped")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(
+        prog="python -m app.launcher",
+        description="Preload the model and rubric once, then fork uvicorn workers.",
+    )
+    ap.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    ap.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    ap.add_argument(
+        "--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "2"))
+    )
+    ap.add_argument("--log-level", default="info")
+    ap.add_argument("--rubric", default=None, help="rubric id to preload")
+    args = ap.parse_args(argv)
+    return serve(
+        args.host,
+        args.port,
+        max(1, args.workers),
+        log_level=args.log_level,
+        rubric_id=args.rubric,
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,60 @@
 # backend/app/main.py
 from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import RedirectResponse
+from fastapi.responses import (
+    FileResponse,
+    JSONResponse,
+    RedirectResponse,
+    StreamingResponse,
+)
 from pydantic import BaseModel
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from app import config
 from app.scoring import score_transcript as scoring_pipeline
-from app.zon import zon_parse, zon_serialize
-import json
+from app.scoring import score_transcripts as batch_scoring_pipeline
+from app.scoring import iter_score_events
+from app.executor import QueueFullError, get_executor, run_scoring, shutdown_executor
+from app.feedback_jobs import JobStoreFullError, get_job_store
+from app.feedback_service import agenerate_feedback, close_feedback_service
+from app.rubric_registry import UnknownRubricError, get_rubric_registry
+from app import warmup
+from app.codec import dumps_json, read_payload, render, wants_zon
+from app.zon import ZonParseError
+from app.metrics import collect_timings, observe, render_prometheus, rounded, span
+from app.embedding_cache import get_embedding_cache
+from app.feedback_service import get_feedback_service
+from app.nlp_utils import loaded_model_name, microbatch_stats
+from app.profiling import get_profiler
+from app.incremental import get_segment_cache
+from app.result_cache import (
+    etag,
+    etag_matches,
+    get_result_cache,
+    request_key,
+    result_key,
+)
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from functools import partial
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # warm up in the background so /health answers while /ready reports progress
+    task = None
+    if warmup.state.enabled:
+        task = asyncio.create_task(asyncio.to_thread(warmup.run_warmup))
+    yield
+    if task is not None and not task.done():
+        task.cancel()
+    shutdown_executor(wait=False)
+    get_job_store().cancel_all()
+    await close_feedback_service()
 
 
-app = FastAPI(title="OratioScore - Backend")
+app = FastAPI(title="OratioScore - Backend", lifespan=lifespan)
 
 # Allow local dev from Streamlit or other hosts
 app.add_middleware(
@@ -27,11 +70,147 @@ class ScoreRequest(BaseModel):
     text: str
 
 
+def _busy_response(exc: QueueFullError) -> Response:
+    return Response(
+        status_code=503,
+        content="Scoring queue is full, retry later",
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+def _invalid_zon_response(exc: ZonParseError) -> Response:
+    return Response(status_code=400, content=f"Invalid request format: {exc}")
+
+
+def _rubric_param(request: Request):
+    """Rubric id from `?rubric=...` (None -> default rubric).
+
+    Raises UnknownRubricError if no such rubric file exists.
+    """
+    rubric_id = request.query_params.get("rubric") or None
+    if rubric_id is not None:
+        get_rubric_registry().resolve(rubric_id)
+    return rubric_id
+
+
+def _incremental_param(request: Request) -> bool:
+    return request.query_params.get("incremental") in ("1", "true")
+
+
+def _unknown_rubric_response(exc: UnknownRubricError) -> Response:
+    return Response(status_code=404, content=f"Unknown rubric: {exc.args[0]}")
+
+
+def _empty_result(error: str = "No transcript provided") -> Dict[str, Any]:
+    return {
+        "overall_score": 0.0,
+        "word_count": 0,
+        "criteria": [],
+        "evidence": {},
+        "error": error,
+    }
+
+
+def _start_timings(request: Request, endpoint: str):
+    """
+    (start time, per-request stage timings or None) for `?timings=1`. Also
+    selects the request for profiling (see app.profiling).
+    """
+    get_profiler().begin(request.headers.get("x-profile-token"), endpoint)
+    wanted = request.query_params.get("timings") in ("1", "true")
+    return time.perf_counter(), (collect_timings() if wanted else None)
+
+
+def _finish(
+    request: Request,
+    payload: Dict[str, Any],
+    endpoint: str,
+    t0: float,
+    timings,
+    stream: bool = False,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """Render `payload`, adding `timings` (ms) if requested, and record latency."""
+    if timings is not None:
+        total = round((time.perf_counter() - t0) * 1000, 3)
+        payload = {**payload, "timings": {**rounded(timings), "total": total}}
+    with span("render"):
+        response = render(payload, request, stream=stream)
+    return _sent(response, endpoint, t0, headers)
+
+
+def _sent(
+    response: Response,
+    endpoint: str,
+    t0: float,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """Record latency for a finished `response` and add `headers`."""
+    observe("oratio_request_seconds", time.perf_counter() - t0, endpoint=endpoint)
+    if headers:
+        response.headers.update(headers)
+    profile = get_profiler().current()
+    if profile is not None and profile.reason == "token":
+        response.headers["X-Profile-Id"] = profile.id
+    return response
+
+
+async def _read_text(request: Request):
+    """`text` from a /score-style body, or a 400 Response for malformed input."""
+    # body is read and decoded exactly once
+    try:
+        data = await read_payload(request)
+        if not isinstance(data, dict):
+            raise ValueError("expected an object body")
+        return data.get("text")
+    except ZonParseError as e:
+        return _invalid_zon_response(e)
+    except Exception:
+        return Response(status_code=400, content="Invalid request format")
+
+
+def _score_keyed(text: str, rubric_id: Optional[str], incremental: bool):
+    """
+    (result, result cache key) for `text`, keyed by the rubric version and
+    model it was actually scored with (see result_cache.result_key).
+    """
+    with span("rubric"):
+        compiled = get_rubric_registry().get(rubric_id)
+    res = scoring_pipeline(text, incremental=incremental, compiled=compiled)
+    return res, result_key(text, compiled, incremental)
+
+
+def _with_feedback_job(res: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        job = get_job_store().submit(res.get("evidence") or {})
+    except JobStoreFullError:
+        return {**res, "feedback_job": None, "feedback_error": "Feedback queue is full"}
+    return {
+        **res,
+        "feedback_job": {
+            "id": job.id,
+            "status": job.status,
+            "url": f"/feedback/{job.id}",
+        },
+    }
+
+
 @app.get("/health")
 def health() -> Dict[str, Any]:
     return {"status": "ok", "app": "oratio-score-backend"}
 
 
+@app.get("/ready")
+def ready():
+    """Readiness for load balancers: 200 once the model and default rubric are warm.
+
+    Includes warm-up step timings. Returns 503 while warm-up is pending, running
+    or failed. Always ready when WARMUP_ON_STARTUP is off.
+    """
+    report = warmup.state.report()
+    return JSONResponse(status_code=200 if report["ready"] else 503, content=report)
+
+
 @app.post("/score")
 async def score_transcript(request: Request):
     """Run the deterministic scoring pipeline and return JSON or ZON response.
@@ -40,62 +219,343 @@ async def score_transcript(request: Request):
       - JSON body: {"text": "..."}
       - ZON body: text "..."  OR { text "..." }
 
+    Query params:
+      - rubric: rubric id (RUBRIC_DIR/<id>.xlsx); the default rubric if omitted
+      - feedback=async: also start LLM feedback generation in the background;
+        the response gets `feedback_job` ({id, status, url}) to fetch it from
+        GET /feedback/{id}
+      - timings=1: add per-stage `timings` (ms) to the response
+      - incremental=1: reuse cached per-sentence work from earlier versions of
+        an edited transcript (see app.incremental)
+
     Returns JSON by default. If `Accept` header includes 'zon', returns ZON.
+    Results are cached (app.result_cache): responses carry an `ETag`, and a
+    request whose `If-None-Match` matches gets a 304 without being scored.
+    """
+    t0, timings = _start_timings(request, "/score")
+    try:
+        rubric_id = _rubric_param(request)
+    except UnknownRubricError as e:
+        return _unknown_rubric_response(e)
+
+    with span("parse"):
+        text_val = await _read_text(request)
+    if isinstance(text_val, Response):
+        return text_val
+
+    if not text_val or not str(text_val).strip():
+        return _finish(request, _empty_result(), "/score", t0, timings)
+
+    text = str(text_val)
+    feedback_job = request.query_params.get("feedback") == "async"
+    incremental = _incremental_param(request)
+    scorer = partial(_score_keyed, rubric_id=rubric_id, incremental=incremental)
+    cache = get_result_cache()
+    res = None
+    representation = "zon" if wants_zon(request) else "json"
+    # responses that differ per request get no ETag
+    tagged = cache.enabled and not (feedback_job or timings is not None)
+    headers: Dict[str, str] = {}
+    if cache.enabled:
+        with span("cache"):
+            key = request_key(text, rubric_id, incremental)
+            tag = etag(key, representation)
+            # the result is a pure function of the key: no lookup needed
+            if tagged and etag_matches(request.headers.get("if-none-match"), tag):
+                return _sent(Response(status_code=304), "/score", t0, {"ETag": tag})
+            res = cache.get(key)
+        headers["X-Result-Cache"] = "miss" if res is None else "hit"
+        if res is not None and tagged:
+            headers["ETag"] = tag
+
+    if res is None:
+        try:
+            res, scored_key = await run_scoring(scorer, text)
+        except QueueFullError as e:
+            return _busy_response(e)
+        except Exception as e:
+            scored_key = None
+            res = {
+                **_empty_result("Scoring failed"),
+                "word_count": len(text.split()),
+                "details": str(e),
+            }
+        if cache.enabled and scored_key is not None and not res.get("error"):
+            if tagged:
+                headers["ETag"] = etag(scored_key, representation)
+            # equal keys mean the same rubric version and model as the lookup;
+            # a result scored against a rubric reloaded meanwhile is still
+            # served, but not cached under the lookup key
+            if key == scored_key:
+                cache.put(key, res)
+    if feedback_job and not res.get("error"):
+        res = _with_feedback_job(res)
+    return _finish(request, res, "/score", t0, timings, headers=headers)
+
+
+@app.post("/score/stream")
+async def score_stream(request: Request):
+    """`/score` as a stream of events, sent as soon as each part is ready.
+
+    Same body and `?rubric=` param as `/score`. Events, in order:
+      - start: {word_count, criteria, rubric, rubric_version} (before embedding)
+      - criterion: {index, criterion, evidence}, one per rubric criterion
+      - overall: {overall_score, word_count}
+      - feedback: {feedback} with `?feedback=1` (LLM feedback, after overall)
+      - error: {error, details} if scoring fails midway
+    Collecting `criterion` events gives the `/score` criteria and evidence.
+
+    Server-sent events by default; NDJSON ({"event", "data"} per line) with
+    `?format=ndjson` or `Accept: application/x-ndjson`.
     """
-    content_type = request.headers.get("content-type", "").lower()
-    accept = request.headers.get("accept", "").lower()
+    try:
+        rubric_id = _rubric_param(request)
+    except UnknownRubricError as e:
+        return _unknown_rubric_response(e)
+
+    text_val = await _read_text(request)
+    if isinstance(text_val, Response):
+        return text_val
+
+    ndjson = (
+        request.query_params.get("format") == "ndjson"
+        or "ndjson" in request.headers.get("accept", "").lower()
+    )
+
+    def frame(event: str, data: Dict[str, Any]) -> str:
+        if ndjson:
+            return dumps_json({"event": event, "data": data}).decode() + "\n"
+        return f"event: {event}\ndata: {dumps_json(data).decode()}\n\n"
+
+    text = str(text_val or "")
+    want_feedback = request.query_params.get("feedback") in ("1", "true")
+    events = None
+    if not text.strip():
+        first = ("overall", _empty_result())
+    else:
+        gen = iter_score_events(
+            text, rubric=rubric_id, incremental=_incremental_param(request)
+        )
+        events = get_executor().run_iter(gen)
+        # admission happens on the first step, so a full queue is still a 503
+        try:
+            first = await events.__anext__()
+        except QueueFullError as e:
+            return _busy_response(e)
+        except Exception as e:
+            events = None
+            first = ("error", {"error": "Scoring failed", "details": str(e)})
+
+    async def body():
+        yield frame(*first)
+        if events is None:
+            return
+        evidence: Dict[str, Any] = {}
+        try:
+            async for event, data in events:
+                if event == "criterion":
+                    evidence[data["criterion"]["name"]] = data["evidence"]
+                yield frame(event, data)
+        except Exception as e:
+            yield frame("error", {"error": "Scoring failed", "details": str(e)})
+            return
+        finally:
+            # client gone mid-stream: free the executor slot now, not at GC
+            await events.aclose()
+        if want_feedback:
+            try:
+                yield frame(
+                    "feedback", {"feedback": await agenerate_feedback(evidence)}
+                )
+            except Exception as e:
+                yield frame("error", {"error": "Feedback failed", "details": str(e)})
+
+    return StreamingResponse(
+        body(),
+        media_type="application/x-ndjson" if ndjson else "text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+@app.post("/score/batch")
+async def score_batch(request: Request):
+    """Score many transcripts in one call (single embedding pass for all of them).
+
+    Accepts:
+      - JSON body: {"texts": ["...", "..."]}
+      - ZON body: texts [ "...", "..." ]
 
-    # parse input
-    text_val = None
-    raw_body = await request.body()
-    body_text = raw_body.decode("utf-8") if raw_body else ""
+    Returns {"count": n, "results": [...]} where each result has the same shape
+    as the `/score` response. Empty transcripts get the `/score` empty payload.
+    Supports the same `?rubric=` and `?timings=1` query params as `/score`.
+    """
+    t0, timings = _start_timings(request, "/score/batch")
+    try:
+        rubric_id = _rubric_param(request)
+    except UnknownRubricError as e:
+        return _unknown_rubric_response(e)
 
     try:
-        if "zon" in content_type:
-            parsed = zon_parse(body_text)
-            # allow top-level 'text' key or bare string under 'text'
-            text_val = parsed.get("text") if isinstance(parsed, dict) else None
-        else:
-            # default JSON parsing
-            data = await request.json()
-            text_val = data.get("text")
+        with span("parse"):
+            data = await read_payload(request)
+        texts = data.get("texts") if isinstance(data, dict) else None
+        if not isinstance(texts, list):
+            raise ValueError("texts must be a list")
+    except ZonParseError as e:
+        return _invalid_zon_response(e)
     except Exception:
         return Response(status_code=400, content="Invalid request format")
 
-    if not text_val or not str(text_val).strip():
-        payload = {
-            "overall_score": 0.0,
-            "word_count": 0,
-            "criteria": [],
-            "evidence": {},
-            "error": "No transcript provided",
-        }
-        if "zon" in accept:
-            return Response(
-                content=zon_serialize(payload), media_type="application/zon"
-            )
-        return payload
-
+    texts = ["" if t is None else str(t) for t in texts]
+    # only non-empty transcripts go through the pipeline; keep original order
+    idx = [i for i, t in enumerate(texts) if t.strip()]
+    results = [_empty_result() for _ in texts]
     try:
-        res = scoring_pipeline(str(text_val))
-        # return ZON if requested
-        if "zon" in accept:
-            return Response(content=zon_serialize(res), media_type="application/zon")
-        return res
+        scored = await run_scoring(
+            partial(batch_scoring_pipeline, rubric=rubric_id), [texts[i] for i in idx]
+        )
+        for i, res in zip(idx, scored):
+            results[i] = res
+    except QueueFullError as e:
+        return _busy_response(e)
     except Exception as e:
-        payload = {
-            "overall_score": 0.0,
-            "word_count": len(str(text_val).split()),
-            "criteria": [],
-            "evidence": {},
-            "error": "Scoring failed",
-            "details": str(e),
-        }
-        if "zon" in accept:
-            return Response(
-                content=zon_serialize(payload), media_type="application/zon"
-            )
-        return payload
+        for i in idx:
+            results[i] = {
+                **_empty_result("Scoring failed"),
+                "word_count": len(texts[i].split()),
+                "details": str(e),
+            }
+
+    payload = {"count": len(results), "results": results}
+    # batch payloads can be large: stream ZON chunks instead of one big string
+    return _finish(request, payload, "/score/batch", t0, timings, stream=True)
+
+
+@app.get("/feedback/{job_id}")
+async def get_feedback(job_id: str, request: Request):
+    """Result of a `/score?feedback=async` job.
+
+    Returns {"id", "status": pending|done|failed, "feedback"?, "error"?}; 404 once
+    the job is unknown or expired (FEEDBACK_JOB_TTL_S after it finished).
+
+    Query params:
+      - wait: long-poll, holding the request up to this many seconds
+        (capped at FEEDBACK_WAIT_MAX_S) until the job finishes
+
+    With `Accept: text/event-stream` the response is a server-sent event stream:
+    a `status` event now, then a `feedback` event when the job finishes.
+    """
+    store = get_job_store()
+    job = store.get(job_id)
+    if job is None:
+        return Response(status_code=404, content=f"Unknown feedback job: {job_id}")
+
+    if "text/event-stream" in request.headers.get("accept", "").lower():
+
+        async def events():
+            yield f"event: status\ndata: {dumps_json(job.info()).decode()}\n\n"
+            while not await store.wait(job, 15.0):
+                yield ": keep-alive\n\n"
+            yield f"event: feedback\ndata: {dumps_json(job.info()).decode()}\n\n"
+
+        return StreamingResponse(
+            events(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache"},
+        )
+
+    try:
+        wait = float(request.query_params.get("wait") or 0)
+    except ValueError:
+        return Response(status_code=400, content="Invalid wait parameter")
+    await store.wait(job, min(max(wait, 0.0), config.settings.FEEDBACK_WAIT_MAX_S))
+    return render(job.info(), request)
+
+
+@app.get("/rubrics")
+def list_rubrics() -> Dict[str, Any]:
+    """Rubrics currently compiled in the registry (id, version, criteria count)."""
+    return {"rubrics": get_rubric_registry().describe()}
+
+
+def _metric_samples():
+    """Gauges and counters read from the long-lived components at scrape time."""
+    ex = get_executor().stats()
+    for key in ("in_flight", "queued", "max_workers", "max_queue"):
+        yield f"oratio_executor_{key}", "gauge", {"kind": ex["kind"]}, ex[key]
+
+    cache = get_embedding_cache().stats()
+    for key in ("hits", "disk_hits", "misses"):
+        yield f"oratio_embedding_cache_{key}_total", "counter", {}, cache[key]
+    yield "oratio_embedding_cache_entries", "gauge", {}, cache["entries"]
+
+    batcher = microbatch_stats()
+    if batcher is not None:
+        yield "oratio_embedding_batches_total", "counter", {}, batcher["batches"]
+        yield "oratio_embedding_batch_items_total", "counter", {}, batcher["items"]
+
+    fb = get_feedback_service().stats()
+    for key in ("calls", "hits", "misses", "fallbacks", "timeouts"):
+        yield f"oratio_feedback_{key}_total", "counter", {}, fb[key]
+    yield "oratio_feedback_cache_entries", "gauge", {}, fb["cache_entries"]
+
+    results = get_result_cache().stats()
+    for key in ("hits", "shared_hits", "misses", "errors"):
+        yield f"oratio_result_cache_{key}_total", "counter", {}, results[key]
+    yield "oratio_result_cache_entries", "gauge", {}, results["entries"]
+
+    jobs = get_job_store().stats()
+    yield "oratio_feedback_jobs", "gauge", {}, jobs["jobs"]
+    yield "oratio_feedback_jobs_pending", "gauge", {}, jobs["pending"]
+
+    segments = get_segment_cache().stats()
+    for key in ("hits", "misses"):
+        yield f"oratio_segment_cache_{key}_total", "counter", {}, segments[key]
+    yield "oratio_segment_cache_entries", "gauge", {}, segments["entries"]
+
+    registry = get_rubric_registry()
+    yield "oratio_rubric_reloads_total", "counter", {}, registry.reloads
+
+    for step, seconds in warmup.state.report()["timings"].items():
+        yield "oratio_warmup_seconds", "gauge", {"step": step}, seconds
+
+    model = loaded_model_name()
+    if model:
+        yield "oratio_model_info", "gauge", {"model": model}, 1
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus metrics: stage/request latency histograms, caches, queue depth."""
+    return Response(
+        content=render_prometheus(_metric_samples()),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+def _profiles_allowed(request: Request) -> bool:
+    return get_profiler().check_token(request.headers.get("x-profile-token"))
+
+
+@app.get("/admin/profiles", include_in_schema=False)
+def list_profiles(request: Request):
+    """Stored profiles, newest first. Needs `X-Profile-Token: <PROFILE_TOKEN>`."""
+    if not _profiles_allowed(request):
+        return JSONResponse(status_code=404, content={"error": "Not found"})
+    profiler = get_profiler()
+    return {"profiles": profiler.store.list(), **profiler.stats()}
+
+
+@app.get("/admin/profiles/{name}", include_in_schema=False)
+def download_profile(name: str, request: Request):
+    """Download one profile (`.prof` pstats or `.folded` collapsed stacks)."""
+    path = get_profiler().store.path(name) if _profiles_allowed(request) else None
+    if path is None:
+        return JSONResponse(status_code=404, content={"error": "Not found"})
+    media_type = (
+        "text/plain" if name.endswith(".folded") else "application/octet-stream"
+    )
+    return FileResponse(path, media_type=media_type, filename=name)
 
 
 @app.get("/", include_in_schema=False)
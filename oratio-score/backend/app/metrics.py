@@ -0,0 +1,278 @@
+"""
+Lightweight latency instrumentation and Prometheus text exposition.
+
+Pipeline code wraps its stages in `span("<stage>")`:
+
+    with span("embed"):
+        emb = get_embedding(text)
+
+Each span observes its duration into the `oratio_stage_seconds{stage=...}`
+histogram and, when the current request collects timings (`?timings=1`, see
+`collect_timings`), into that request's per-stage totals. Other histograms are
+fed with `observe(name, seconds, **labels)`, point-in-time values with
+`set_gauge`. GET /metrics renders everything with `render_prometheus`.
+
+METRICS_ENABLED=0 turns spans into a shared no-op (one flag check and one
+context variable lookup) unless the request asked for its timings.
+"""
+
+import os
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# seconds; Prometheus client defaults extended down to 100us
+BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+STAGE_METRIC = "oratio_stage_seconds"
+
+_HELP = {
+    STAGE_METRIC: "Time spent in each scoring pipeline stage.",
+    "oratio_request_seconds": "Request latency by endpoint, measured in the handler.",
+}
+
+_enabled = os.getenv("METRICS_ENABLED", "1").lower() in ("1", "true", "yes")
+
+# per-request stage totals (ms), set by collect_timings
+_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar(
+    "oratio_timings", default=None
+)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def set_enabled(value: bool) -> None:
+    global _enabled
+    _enabled = bool(value)
+
+
+class Histogram:
+    """Cumulative-on-render histogram with fixed buckets (thread-safe)."""
+
+    __slots__ = ("buckets", "counts", "count", "sum", "_lock")
+
+    def __init__(self, buckets: Iterable[float] = BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self._lock = Lock()
+
+    def observe(self, value: float) -> None:
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.count += 1
+            self.sum += value
+
+    def snapshot(self) -> Tuple[List[int], int, float]:
+        """(cumulative bucket counts incl. +Inf, count, sum)."""
+        with self._lock:
+            counts, count, total = list(self.counts), self.count, self.sum
+        cumulative, running = [], 0
+        for c in counts:
+            running += c
+            cumulative.append(running)
+        return cumulative, count, total
+
+
+class Registry:
+    def __init__(self):
+        self._lock = Lock()
+        self.histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self.gauges: Dict[Tuple[str, Labels], float] = {}
+
+    def histogram(self, name: str, labels: Labels = ()) -> Histogram:
+        key = (name, labels)
+        h = self.histograms.get(key)
+        if h is None:
+            with self._lock:
+                h = self.histograms.setdefault(key, Histogram())
+        return h
+
+    def set_gauge(self, name: str, value: float, labels: Labels = ()) -> None:
+        self.gauges[(name, labels)] = float(value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.histograms.clear()
+            self.gauges.clear()
+
+
+registry = Registry()
+
+
+def _labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def observe(name: str, seconds: float, **labels: str) -> None:
+    if _enabled:
+        registry.histogram(name, _labels(labels)).observe(seconds)
+
+
+def set_gauge(name: str, value: float, **labels: str) -> None:
+    registry.set_gauge(name, value, _labels(labels))
+
+
+class _Span:
+    __slots__ = ("stage", "hist", "timings", "t0")
+
+    def __init__(self, stage: str, hist: Optional[Histogram], timings):
+        self.stage = stage
+        self.hist = hist
+        self.timings = timings
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        dt = time.perf_counter() - self.t0
+        if self.hist is not None:
+            self.hist.observe(dt)
+        if self.timings is not None:
+            self.timings[self.stage] = self.timings.get(self.stage, 0.0) + dt * 1000
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+_stage_hists: Dict[str, Histogram] = {}
+
+
+def span(stage: str):
+    """Context manager timing one pipeline stage (see module docstring)."""
+    timings = _timings.get()
+    if not _enabled:
+        return _NULL_SPAN if timings is None else _Span(stage, None, timings)
+    hist = _stage_hists.get(stage)
+    if hist is None:
+        hist = _stage_hists[stage] = registry.histogram(
+            STAGE_METRIC, (("stage", stage),)
+        )
+    return _Span(stage, hist, timings)
+
+
+def record(stage: str, seconds: float) -> None:
+    """Add an already measured stage duration (like a finished `span`)."""
+    timings = _timings.get()
+    if _enabled:
+        registry.histogram(STAGE_METRIC, (("stage", stage),)).observe(seconds)
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds * 1000
+
+
+def collect_timings() -> Dict[str, float]:
+    """
+    Start collecting stage timings (ms) for the current request/context and
+    return the dict they accumulate in. Contexts copied afterwards (e.g. the
+    scoring executor's threads) add to the same dict.
+    """
+    timings: Dict[str, float] = {}
+    _timings.set(timings)
+    return timings
+
+
+def rounded(timings: Dict[str, float]) -> Dict[str, float]:
+    return {k: round(v, 3) for k, v in timings.items()}
+
+
+def reset() -> None:
+    """Drop all recorded metrics (tests)."""
+    registry.clear()
+    _stage_hists.clear()
+
+
+# ---------------------------
+# Prometheus text format
+# ---------------------------
+
+
+def _escape(v: str) -> str:
+    return v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+def _fmt_value(v: float) -> str:
+    v = float(v)
+    if v.is_integer() and abs(v) < 1e15:
+        return str(int(v))
+    return repr(v)
+
+
+# (name, "gauge"|"counter", labels, value)
+Sample = Tuple[str, str, Dict[str, str], float]
+
+
+def render_prometheus(extra: Iterable[Sample] = ()) -> str:
+    """
+    All histograms and gauges in the Prometheus text exposition format (0.0.4),
+    plus `extra` samples read from other components at scrape time.
+    """
+    lines: List[str] = []
+    by_name: Dict[str, List[Tuple[Labels, Histogram]]] = {}
+    for (name, labels), h in list(registry.histograms.items()):
+        by_name.setdefault(name, []).append((labels, h))
+    for name in sorted(by_name):
+        if name in _HELP:
+            lines.append(f"# HELP {name} {_HELP[name]}")
+        lines.append(f"# TYPE {name} histogram")
+        for labels, h in sorted(by_name[name], key=lambda x: x[0]):
+            cumulative, count, total = h.snapshot()
+            bounds = [repr(b) for b in h.buckets] + ["+Inf"]
+            for le, c in zip(bounds, cumulative):
+                lines.append(f"{name}_bucket{_fmt_labels(labels, ('le', le))} {c}")
+            lines.append(f"{name}_sum{_fmt_labels(labels)} {repr(total)}")
+            lines.append(f"{name}_count{_fmt_labels(labels)} {count}")
+
+    samples: Dict[str, Tuple[str, Dict[Labels, float]]] = {}
+    for (name, labels), value in list(registry.gauges.items()):
+        samples.setdefault(name, ("gauge", {}))[1][labels] = value
+    for name, kind, labels, value in extra:
+        if value is not None:
+            samples.setdefault(name, (kind, {}))[1][_labels(labels)] = value
+    for name in sorted(samples):
+        kind, values = samples[name]
+        lines.append(f"# TYPE {name} {kind}")
+        for labels in sorted(values):
+            lines.append(f"{name}{_fmt_labels(labels)} {_fmt_value(values[labels])}")
+    return "\n".join(lines) + "\n"
@@ -1,10 +1,16 @@
 """
 This file provides:
 - basic text cleaning/tokenization utilities
-- keyword matching (exact + fuzzy via rapidfuzz)
+- keyword matching (exact + fuzzy via rapidfuzz), including a precompiled
+  KeywordIndex that scans a transcript once for all rubric keywords
 - a Render-safe embedding model loader with small-model preference,
-  lazy singleton loading, and deterministic dummy fallback
+  lazy singleton loading, and deterministic dummy fallback; ONNX / int8
+  backends are selected with EMBEDDING_BACKEND (see app.embedding_backends)
 - embedding helpers and cosine similarity
+- an optional micro-batching scheduler that coalesces concurrent
+  get_embedding/embed_batch calls into a single model.encode
+- a content-addressed embedding cache in front of get_embedding/embed_batch
+  (see app.embedding_cache)
 
 Notes:
 - To avoid OOM on small hosts (Render free tier), the loader prefers
@@ -12,19 +18,33 @@ Notes:
   EMBEDDING_MODEL environment variable.
 - If sentence-transformers is not installed (e.g., tests), a dummy
   deterministic zero-vector model is used unless EMBEDDING_ALLOW_FALLBACK=0.
+- Micro-batching is controlled by EMBEDDING_MICROBATCH ("1" default),
+  EMBEDDING_BATCH_MAX_SIZE (items per encode) and EMBEDDING_BATCH_MAX_WAIT_MS
+  (how long the worker waits for more callers after the first one).
+- The embedding cache is controlled by EMBEDDING_CACHE_SIZE (in-memory
+  entries, "0" disables it) and EMBEDDING_CACHE_PATH (optional SQLite file).
 """
 
 import os
+import queue
 import re
-from typing import List, Optional, Tuple
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
 import numpy as np
 from functools import lru_cache
-from threading import Lock
+from threading import Lock, Thread
+
+from app import embedding_backends
+from app.embedding_cache import get_embedding_cache
+from app.metrics import set_gauge, span
 
 # optional fuzzy matching (rapidfuzz)
 try:
+    from rapidfuzz import process as fuzzy_process  # type: ignore
     from rapidfuzz.fuzz import ratio as fuzzy_ratio  # type: ignore
 except Exception:
+    fuzzy_process = None  # type: ignore
     fuzzy_ratio = None  # type: ignore
 
 # embeddings (optional import)
@@ -65,50 +85,198 @@ def count_words(text: str) -> int:
     return len(tokenize_words(text))
 
 
+# a keyword made only of word characters separated by single spaces can be
+# matched by looking up token n-grams; anything else keeps its own regex
+_SIMPLE_KEYWORD_RE = re.compile(r"\w+(?: \w+)*")
+_WORD_RE = re.compile(r"\b\w+\b")
+
+
+def _keyword_regex(kw_lower: str):
+    return re.compile(rf"\b{re.escape(kw_lower)}\b")
+
+
+class KeywordIndex:
+    """
+    Precompiled matcher for a fixed set of keywords (e.g. all keywords of all
+    rubric criteria).
+
+    `scan(text)` tokenizes the transcript once and records every indexed
+    keyword that occurs in it; the result is shared across criteria. Matching
+    is equivalent to `re.search(rf"\b{kw}\b", clean_text(text).lower())`:
+    simple keywords are looked up as token n-grams in a set, keywords with
+    punctuation use a regex compiled once at build time.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.phrases: Set[str] = set()
+        self.patterns: Dict[str, "re.Pattern"] = {}
+        self.max_ngram = 0
+        for kw in keywords:
+            if not kw:
+                continue
+            k = str(kw).lower()
+            if _SIMPLE_KEYWORD_RE.fullmatch(k):
+                self.phrases.add(k)
+                self.max_ngram = max(self.max_ngram, k.count(" ") + 1)
+            elif k not in self.patterns:
+                self.patterns[k] = _keyword_regex(k)
+
+    def __contains__(self, kw_lower: str) -> bool:
+        return kw_lower in self.phrases or kw_lower in self.patterns
+
+    def scan(self, text: str) -> "KeywordScan":
+        with span("tokenize"):
+            text_lower = clean_text(text).lower()
+            spans = [(m.start(), m.end()) for m in _WORD_RE.finditer(text_lower)]
+            tokens = [text_lower[a:b] for a, b in spans]
+        with span("keyword_scan"):
+            matched = self._match(text_lower, spans, tokens)
+        return KeywordScan(self, text_lower, tokens, matched)
+
+    def _match(
+        self, text_lower: str, spans: List[Tuple[int, int]], tokens: List[str]
+    ) -> Set[str]:
+        matched: Set[str] = set()
+        if self.phrases:
+            n_tok = len(tokens)
+            for i in range(n_tok):
+                phrase = tokens[i]
+                if phrase in self.phrases:
+                    matched.add(phrase)
+                for j in range(i + 1, min(n_tok, i + self.max_ngram)):
+                    # n-grams only span tokens separated by exactly one space
+                    if text_lower[spans[j - 1][1] : spans[j][0]] != " ":
+                        break
+                    phrase = phrase + " " + tokens[j]
+                    if phrase in self.phrases:
+                        matched.add(phrase)
+        for k, pat in self.patterns.items():
+            if pat.search(text_lower):
+                matched.add(k)
+        return matched
+
+
+class KeywordScan:
+    """
+    Result of scanning one transcript with a KeywordIndex.
+    """
+
+    def __init__(
+        self, index: KeywordIndex, text_lower: str, tokens: List[str], matched: Set[str]
+    ):
+        self.index = index
+        self.text_lower = text_lower
+        self.tokens = tokens
+        self.matched = matched
+
+    @property
+    def word_count(self) -> int:
+        return len(self.tokens)
+
+    def find(self, keywords: List[str]) -> List[str]:
+        """
+        Keywords (original strings, original order) present in the transcript.
+        Keywords that were not indexed are checked with a one-off regex.
+        """
+        found = []
+        for kw in keywords:
+            if not kw:
+                continue
+            k = kw.lower()
+            if k in self.index:
+                hit = k in self.matched
+            else:
+                hit = _keyword_regex(k).search(self.text_lower) is not None
+            if hit:
+                found.append(kw)
+        return found
+
+
+@lru_cache(maxsize=256)
+def _compiled_keywords(keywords: Tuple[str, ...]) -> KeywordIndex:
+    return KeywordIndex(keywords)
+
+
 def find_keywords_exact(text: str, keywords: List[str]) -> List[str]:
     """
     Find exact keyword matches using word-boundary regex.
     Returns the list of keywords found (preserves original keyword strings).
     """
-    text_lower = clean_text(text).lower()
-    found = []
-    for kw in keywords:
-        if not kw:
-            continue
-        if re.search(rf"\b{re.escape(kw.lower())}\b", text_lower):
-            found.append(kw)
-    return found
+    keywords = [kw for kw in keywords if kw]
+    if not keywords:
+        return []
+    return _compiled_keywords(tuple(keywords)).scan(text).find(keywords)
+
+
+# transcript windows compared per rapidfuzz.cdist call (bounds memory)
+_FUZZY_WINDOW_CHUNK = 4096
+
+
+def _token_windows(tokens: List[str], n: int) -> List[str]:
+    """
+    Distinct n-token windows of the transcript (the whole transcript if it is
+    shorter than n tokens).
+    """
+    if not tokens:
+        return []
+    if len(tokens) <= n:
+        return [" ".join(tokens)]
+    windows = (" ".join(tokens[i : i + n]) for i in range(len(tokens) - n + 1))
+    return list(dict.fromkeys(windows))
 
 
 def find_keywords_fuzzy(
-    text: str, keywords: List[str], threshold: int = 85
+    text: str,
+    keywords: List[str],
+    threshold: int = 85,
+    scan: Optional[KeywordScan] = None,
 ) -> List[str]:
     """
     Fuzzy matching fallback — returns keywords where fuzzy match >= threshold.
     Requires rapidfuzz; if not installed, falls back to exact match.
-    NOTE: fuzzy_ratio is applied between keyword and full text (cheap fallback),
-    which is sufficient for short transcripts and keyword lists.
+    Each keyword is compared (fuzz.ratio) against transcript windows of the
+    same number of tokens, using batched rapidfuzz.process.cdist with
+    `score_cutoff=threshold`; a keyword stops being compared once it matched.
+    Pass a precomputed `scan` to reuse its tokens.
     """
-    if fuzzy_ratio is None:
+    if fuzzy_ratio is None or fuzzy_process is None:
         return find_keywords_exact(text, keywords)
 
-    text_lower = clean_text(text).lower()
-    found = []
+    keywords = [kw for kw in keywords if kw]
+    if not keywords:
+        return []
+    if scan is None:
+        scan = _compiled_keywords(tuple(keywords)).scan(text)
+
+    # check exact first
+    found = set(scan.find(keywords))
+
+    # group the remaining keywords by token count
+    by_n: Dict[int, List[Tuple[str, str]]] = {}
     for kw in keywords:
-        if not kw:
-            continue
-        # check exact first
-        if re.search(rf"\b{re.escape(kw.lower())}\b", text_lower):
-            found.append(kw)
+        if kw in found:
             continue
-        # fuzzy: compare keyword vs text
-        try:
-            score = fuzzy_ratio(kw.lower(), text_lower)
-        except Exception:
-            score = 0
-        if score >= threshold:
-            found.append(kw)
-    return found
+        k = " ".join(kw.lower().split())
+        by_n.setdefault(k.count(" ") + 1, []).append((kw, k))
+
+    for n, pending in by_n.items():
+        windows = _token_windows(scan.tokens, n)
+        for start in range(0, len(windows), _FUZZY_WINDOW_CHUNK):
+            if not pending:
+                break
+            chunk = windows[start : start + _FUZZY_WINDOW_CHUNK]
+            scores = fuzzy_process.cdist(
+                [k for _, k in pending],
+                chunk,
+                scorer=fuzzy_ratio,
+                score_cutoff=threshold,
+                dtype=np.uint8,
+            )
+            hit = scores.max(axis=1) >= threshold
+            found.update(kw for (kw, _), h in zip(pending, hit) if h)
+            pending = [p for p, h in zip(pending, hit) if not h]
+
+    return [kw for kw in keywords if kw in found]
 
 
 # ---------------------------
@@ -123,8 +291,12 @@ _PREFERRED_MODELS = [
 ]
 
 _model = None
+_model_name: Optional[str] = None
 _model_lock = Lock()
 
+# name reported for the deterministic zero-vector model
+DUMMY_MODEL_NAME = "dummy-zero-384"
+
 
 def _make_dummy_model(dim: int = 384):
     """
@@ -153,10 +325,26 @@ def load_embedding_model(model_name: Optional[str] = None):
       3. deterministic dummy fallback (if allowed)
 
     Environment flags:
-      EMBEDDING_MODEL         -> override model name
+      EMBEDDING_MODEL         -> override model name ("dummy-zero-384" for the dummy)
       EMBEDDING_ALLOW_FALLBACK -> "0"/"false"/"no" to disable dummy fallback
+      EMBEDDING_BACKEND       -> "sentence-transformers" (default), "onnx" or
+                                 "onnx-int8" (see app.embedding_backends)
+      EMBEDDING_MODEL_DIR     -> local model directory for the ONNX backends
+
+    If an ONNX backend fails to load and fallback is allowed, the
+    sentence-transformers chain above is used instead.
     """
-    global _model
+    if _model is not None:
+        return _model
+    t0 = time.perf_counter()
+    model = _load_model(model_name)
+    # exported on /metrics
+    set_gauge("oratio_model_load_seconds", time.perf_counter() - t0)
+    return model
+
+
+def _load_model(model_name: Optional[str]):
+    global _model, _model_name
 
     if _model is not None:
         return _model
@@ -171,6 +359,35 @@ def load_embedding_model(model_name: Optional[str] = None):
         "yes",
     )
 
+    # EMBEDDING_MODEL=dummy-zero-384 asks for the dummy explicitly (benchmarks, CI)
+    if desired == DUMMY_MODEL_NAME:
+        with _model_lock:
+            if _model is None:
+                _model, _model_name = _make_dummy_model(), DUMMY_MODEL_NAME
+        return _model
+
+    backend = embedding_backends.backend_name()
+    if backend != embedding_backends.SENTENCE_TRANSFORMERS:
+        with _model_lock:
+            if _model is not None:
+                return _model
+            model_dir = os.getenv("EMBEDDING_MODEL_DIR")
+            try:
+                print(
+                    f"[nlp_utils] Loading {backend} embedding backend from {model_dir}"
+                )
+                m = embedding_backends.load_backend_model(backend, model_dir)
+                _model, _model_name = m, m.name
+                print(f"[nlp_utils] Successfully loaded embedding model: {m.name}")
+                return _model
+            except Exception as e:
+                print(f"[nlp_utils] Failed to load {backend} backend: {e}")
+                if not allow_fallback:
+                    raise RuntimeError(
+                        f"Failed to load the {backend} embedding backend"
+                    ) from e
+                print("[nlp_utils] Falling back to sentence-transformers")
+
     # If sentence_transformers is missing, optionally return dummy model
     if SentenceTransformer is None:
         if not allow_fallback:
@@ -178,6 +395,7 @@ def load_embedding_model(model_name: Optional[str] = None):
                 "sentence_transformers is not installed and fallback disabled (EMBEDDING_ALLOW_FALLBACK=0)"
             )
         _model = _make_dummy_model()
+        _model_name = DUMMY_MODEL_NAME
         return _model
 
     # Thread-safe lazy initialization
@@ -193,6 +411,7 @@ def load_embedding_model(model_name: Optional[str] = None):
                 # print/logging to stdout so Render logs show model load attempts
                 print(f"[nlp_utils] Attempting to load model: {candidate}")
                 _model = SentenceTransformer(candidate)
+                _model_name = candidate
                 print(f"[nlp_utils] Successfully loaded embedding model: {candidate}")
                 return _model
             except Exception as e:
@@ -205,27 +424,365 @@ def load_embedding_model(model_name: Optional[str] = None):
 
         print("[nlp_utils] Falling back to deterministic dummy embedding model")
         _model = _make_dummy_model()
+        _model_name = DUMMY_MODEL_NAME
         return _model
 
 
+def reset_embedding_model() -> None:
+    """
+    Drop the loaded model so the next load_embedding_model() call re-reads the
+    environment (EMBEDDING_MODEL, EMBEDDING_ALLOW_FALLBACK).
+    """
+    global _model, _model_name
+    with _model_lock:
+        _model = None
+        _model_name = None
+
+
+# keep the functools-style API the tests (and callers) use to reset the singleton
+load_embedding_model.cache_clear = reset_embedding_model  # type: ignore[attr-defined]
+
+
+def loaded_model_name() -> Optional[str]:
+    """Name of the loaded embedding model, or None (never triggers a load)."""
+    return _model_name
+
+
+def configured_model_name() -> str:
+    """Name of the loaded model, else the one EMBEDDING_MODEL asks for (no load)."""
+    return _model_name or os.getenv("EMBEDDING_MODEL") or _MODEL_NAME
+
+
+def current_model_name() -> str:
+    """
+    Name of the loaded embedding model (loads it if necessary).
+    Used to key caches so they are invalidated when the model changes.
+    """
+    load_embedding_model()
+    return _model_name or DUMMY_MODEL_NAME
+
+
+# ---------------------------
+# Micro-batching scheduler
+# ---------------------------
+
+# upper bounds of the batch-size histogram buckets (last bucket is +Inf)
+_BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128]
+
+
+class EmbeddingMicroBatcher:
+    """
+    Collects pending encode requests from many threads and runs them through
+    the model as one batch.
+
+    The background worker blocks for the first request, then keeps collecting
+    for up to `max_wait_ms` or until `max_batch_size` texts are pending. Each
+    request is a group of texts (one for get_embedding, many for embed_batch);
+    groups are never split, so a single large group may exceed the limit.
+
+    `in_flight_fn`, if given, returns how many callers could still submit
+    (e.g. scoring jobs running). Once the batch holds a group per caller the
+    worker flushes without waiting, so a lone request pays no batching delay.
+    """
+
+    def __init__(
+        self,
+        encode_fn: Callable[[List[str]], List[np.ndarray]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        in_flight_fn: Optional[Callable[[], int]] = None,
+    ):
+        self.encode_fn = encode_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait_ms = max(0.0, float(max_wait_ms))
+        self.in_flight_fn = in_flight_fn
+        self._queue: "queue.Queue" = queue.Queue()
+        self._lock = Lock()
+        self._thread: Optional[Thread] = None
+        self._batches = 0
+        self._items = 0
+        self._histogram: Dict[str, int] = {
+            str(b): 0 for b in _BATCH_SIZE_BUCKETS + ["+Inf"]
+        }
+
+    def _ensure_worker(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = Thread(
+                    target=self._run, name="embedding-microbatcher", daemon=True
+                )
+                self._thread.start()
+
+    def submit(self, texts: List[str]) -> Future:
+        """
+        Queue `texts` for encoding. The returned future resolves to a list of
+        1D numpy arrays, one per text.
+        """
+        fut: Future = Future()
+        if not texts:
+            fut.set_result([])
+            return fut
+        self._ensure_worker()
+        self._queue.put((list(texts), fut))
+        return fut
+
+    def _collect(self) -> List[Tuple[List[str], Future]]:
+        first = self._queue.get()
+        batch = [first]
+        size = len(first[0])
+        deadline = time.monotonic() + self.max_wait_ms / 1000.0
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining > 0 and self._everyone_queued(len(batch)):
+                remaining = 0
+            try:
+                if remaining > 0:
+                    item = self._queue.get(timeout=remaining)
+                else:
+                    # no more waiting, but take what is already queued
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    def _everyone_queued(self, groups: int) -> bool:
+        return self.in_flight_fn is not None and self.in_flight_fn() <= groups
+
+    def _record(self, size: int) -> None:
+        with self._lock:
+            self._batches += 1
+            self._items += size
+            for b in _BATCH_SIZE_BUCKETS:
+                if size <= b:
+                    self._histogram[str(b)] += 1
+                    break
+            else:
+                self._histogram["+Inf"] += 1
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            texts = [t for group, _ in batch for t in group]
+            self._record(len(texts))
+            try:
+                embs = self.encode_fn(texts)
+            except BaseException as e:
+                for _, fut in batch:
+                    fut.set_exception(e)
+                continue
+            pos = 0
+            for group, fut in batch:
+                fut.set_result(embs[pos : pos + len(group)])
+                pos += len(group)
+
+    def stats(self) -> Dict:
+        """
+        Batch counters. `histogram` counts batches per size bucket
+        (bucket label = inclusive upper bound, non-cumulative).
+        """
+        with self._lock:
+            return {
+                "batches": self._batches,
+                "items": self._items,
+                "mean_batch_size": (
+                    self._items / self._batches if self._batches else 0.0
+                ),
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait_ms,
+                "histogram": dict(self._histogram),
+            }
+
+
+def _encode_texts(texts: List[str]) -> List[np.ndarray]:
+    m = load_embedding_model()
+    with span("encode"):
+        embs = m.encode(texts, convert_to_numpy=True, show_progress_bar=False)
+    return [np.array(e).reshape(-1) for e in embs]
+
+
+_batcher: Optional[EmbeddingMicroBatcher] = None
+_batcher_lock = Lock()
+
+
+def _scoring_in_flight() -> int:
+    # embeddings are requested from scoring jobs running in app.executor
+    from app.executor import get_executor
+
+    return get_executor().in_flight
+
+
+def _microbatch_enabled() -> bool:
+    return os.getenv("EMBEDDING_MICROBATCH", "1").lower() in ("1", "true", "yes")
+
+
+def get_microbatcher() -> EmbeddingMicroBatcher:
+    """
+    Process-wide micro-batcher, created on first use.
+    """
+    global _batcher
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                _batcher = EmbeddingMicroBatcher(
+                    _encode_texts,
+                    max_batch_size=int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "32")),
+                    max_wait_ms=float(os.getenv("EMBEDDING_BATCH_MAX_WAIT_MS", "5")),
+                    in_flight_fn=_scoring_in_flight,
+                )
+    return _batcher
+
+
+def _reset_after_fork() -> None:
+    # the batcher's worker thread does not survive fork(); the loaded model does
+    global _batcher, _batcher_lock
+    _batcher, _batcher_lock = None, Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def microbatch_stats() -> Optional[Dict]:
+    """
+    Stats of the micro-batcher, or None if it has not been used yet.
+    """
+    return _batcher.stats() if _batcher is not None else None
+
+
+def _encode_uncached(texts: List[str]) -> List[np.ndarray]:
+    if _microbatch_enabled():
+        return get_microbatcher().submit(list(texts)).result()
+    return _encode_texts(list(texts))
+
+
 def get_embedding(text: str, model: Optional[object] = None) -> np.ndarray:
     """
     Returns a 1D numpy array embedding for the given text.
     Ensures deterministic 1-D output even for single-string input.
+    Without an explicit `model`, the call goes through the embedding cache and
+    the micro-batcher (unless EMBEDDING_MICROBATCH=0).
     """
-    m = model or load_embedding_model()
-    emb = m.encode(text, convert_to_numpy=True, show_progress_bar=False)
+    if model is None:
+        return embed_batch([text])[0]
+    emb = model.encode(text, convert_to_numpy=True, show_progress_bar=False)
     return np.array(emb).reshape(-1)
 
 
 def embed_batch(texts: List[str], model: Optional[object] = None) -> List[np.ndarray]:
     """
     Encode a batch of texts and return a list of 1D numpy arrays.
+    Without an explicit `model`, cached embeddings are reused and only the
+    misses are encoded.
     """
-    m = model or load_embedding_model()
-    embs = m.encode(texts, convert_to_numpy=True, show_progress_bar=False)
-    # convert to list of 1d np arrays
-    return [np.array(e).reshape(-1) for e in embs]
+    if model is not None:
+        embs = model.encode(texts, convert_to_numpy=True, show_progress_bar=False)
+        # convert to list of 1d np arrays
+        return [np.array(e).reshape(-1) for e in embs]
+
+    texts = list(texts)
+    cache = get_embedding_cache()
+    if not cache.enabled:
+        return _encode_uncached(texts)
+
+    model_name = current_model_name()
+    normalized = [clean_text(t) for t in texts]
+    out: List[Optional[np.ndarray]] = [cache.get(model_name, n) for n in normalized]
+    # encode each distinct missing text once
+    missing: Dict[str, List[int]] = {}
+    for i, emb in enumerate(out):
+        if emb is None:
+            missing.setdefault(normalized[i], []).append(i)
+    if missing:
+        miss_texts = [texts[idx[0]] for idx in missing.values()]
+        for (norm, idx), emb in zip(missing.items(), _encode_uncached(miss_texts)):
+            cache.put(model_name, norm, emb)
+            for i in idx:
+                out[i] = emb
+    return out  # type: ignore[return-value]
+
+
+def chunk_words(
+    text: str, window: int = 128, overlap: int = 32
+) -> List[Tuple[int, int, str]]:
+    """
+    Split text into overlapping windows of `window` words (whitespace split).
+    Returns (start_word, end_word, chunk_text) tuples; end is exclusive.
+    Text that fits in one window yields a single chunk.
+    """
+    words = clean_text(text).split(" ") if text and text.strip() else []
+    if not words:
+        return []
+    window = max(1, int(window))
+    step = max(1, window - max(0, int(overlap)))
+    chunks = []
+    start = 0
+    while True:
+        end = min(len(words), start + window)
+        chunks.append((start, end, " ".join(words[start:end])))
+        if end >= len(words):
+            break
+        start += step
+    return chunks
+
+
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+_SENTENCE_END_RE = re.compile(r"[.!?]\s+")
+
+
+def split_segments(text: str) -> List[str]:
+    """
+    Split text into paragraphs (blank lines) and those into sentences (.!?
+    followed by whitespace); segments are stripped, empty ones dropped.
+    Splits only happen at whitespace, so the segments' `tokenize_words` tokens
+    are exactly the tokens of the whole text.
+    """
+    parts = []
+    for para in _PARAGRAPH_RE.split(text or ""):
+        start = 0
+        for m in _SENTENCE_END_RE.finditer(para):
+            parts.append(para[start : m.start() + 1])
+            start = m.end()
+        parts.append(para[start:])
+    return [s for s in (p.strip() for p in parts) if s]
+
+
+def embed_in_batches(texts: List[str], batch_size: int = 32) -> np.ndarray:
+    """
+    Embed texts `batch_size` at a time and return a (len(texts), dim) matrix.
+    """
+    batch_size = max(1, int(batch_size))
+    rows: List[np.ndarray] = []
+    for i in range(0, len(texts), batch_size):
+        rows.extend(embed_batch(texts[i : i + batch_size]))
+    return np.array(rows)
+
+
+def pool_embeddings(embs: np.ndarray, method: str = "mean") -> np.ndarray:
+    """
+    Pool chunk embeddings (n_chunks, dim) into one vector.
+      mean      -> average of the chunks
+      max       -> element-wise max
+      attention -> average weighted by softmax(cosine(chunk, mean) / 0.1), so
+                   chunks close to the overall topic count more than digressions
+    """
+    embs = np.asarray(embs, dtype=float)
+    if embs.ndim == 1:
+        return embs
+    method = (method or "mean").lower()
+    if method == "max":
+        return embs.max(axis=0)
+    mean = embs.mean(axis=0)
+    if method != "attention":
+        return mean
+    norms = np.linalg.norm(embs, axis=1) * np.linalg.norm(mean)
+    sims = np.divide(embs @ mean, norms, out=np.zeros(len(embs)), where=norms != 0)
+    weights = np.exp((sims - sims.max()) / 0.1)
+    weights /= weights.sum()
+    return weights @ embs
 
 
 def cosine_sim(a: np.ndarray, b: np.ndarray) -> float:
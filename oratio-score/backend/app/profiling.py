@@ -0,0 +1,373 @@
+"""
+On-demand profiling of scoring requests.
+
+A request is profiled when
+  - it carries `X-Profile-Token: <PROFILE_TOKEN>` (always, not rate limited),
+  - it is picked by PROFILE_SAMPLE_RATE (e.g. 0.001), or
+  - it runs longer than PROFILE_SLOW_MS: a sampling profiler starts watching
+    the worker thread once the threshold has passed, so the profile shows what
+    the slow request was busy with from then on.
+
+Token/sampled requests use cProfile (saved as `.prof`, readable with pstats or
+snakeviz) unless PROFILE_MODE=sample. Sampled stacks are saved in the
+collapsed format (`.folded`, one `frame;frame;frame count` line per stack) for
+flamegraph.pl or speedscope. Profiles go to PROFILE_DIR, which keeps only the
+newest PROFILE_MAX_FILES files.
+
+Meant to stay configured in production: everything is off by default,
+untriggered requests pay one context variable lookup, automatic profiles are
+capped at PROFILE_MAX_PER_MIN, only one cProfile runs at a time (others fall
+back to sampling) and profiling errors never fail a request. Profiling hooks
+into the thread executor; with SCORING_EXECUTOR=process nothing is recorded.
+"""
+
+import cProfile
+import hmac
+import logging
+import marshal
+import os
+import random
+import re
+import secrets
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_current: ContextVar[Optional["RequestProfile"]] = ContextVar(
+    "oratio_profile", default=None
+)
+
+# cProfile can't run in two threads at once on 3.12+ (one sys.monitoring tool)
+_cprofile_lock = threading.Lock()
+
+_NAME_RE = re.compile(
+    r"^(?P<created>\d{13})-(?P<id>[0-9a-f]{8})-(?P<reason>[a-z]+)"
+    r"-(?P<ms>\d+)ms\.(?P<ext>prof|folded)$"
+)
+
+
+class RequestProfile:
+    __slots__ = (
+        "profiler",
+        "id",
+        "reason",
+        "mode",
+        "endpoint",
+        "started",
+        "sample_from",
+        "stacks",
+    )
+
+    def __init__(
+        self,
+        profiler: "Profiler",
+        reason: str,
+        mode: str,
+        endpoint: str,
+        sample_from: float = 0.0,
+    ):
+        self.profiler = profiler
+        self.id = secrets.token_hex(4)
+        self.reason = reason
+        self.mode = mode  # cprofile|sample
+        self.endpoint = endpoint
+        self.started = time.perf_counter()
+        self.sample_from = self.started + sample_from
+        self.stacks: Counter = Counter()
+
+
+def _collapse(frame, limit: int = 128) -> str:
+    parts = []
+    while frame is not None and len(parts) < limit:
+        co = frame.f_code
+        parts.append(
+            f"{co.co_name} ({os.path.basename(co.co_filename)}:{co.co_firstlineno})"
+        )
+        frame = frame.f_back
+    return ";".join(reversed(parts))
+
+
+class Sampler:
+    """
+    One daemon thread sampling the stacks of watched threads every
+    `interval_s`, but only once their `sample_from` time has passed.
+    """
+
+    def __init__(self, interval_s: float = 0.01, max_stacks: int = 5000):
+        self.interval_s = max(0.001, float(interval_s))
+        self.max_stacks = max_stacks
+        self._watches: Dict[int, RequestProfile] = {}
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def watch(self, thread_id: int, prof: RequestProfile) -> None:
+        with self._cond:
+            self._watches[thread_id] = prof
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._loop, name="oratio-profiler", daemon=True
+                )
+                self._thread.start()
+            self._cond.notify()
+
+    def unwatch(self, thread_id: int) -> None:
+        # samples are taken under the same lock: none arrive after this returns
+        with self._cond:
+            self._watches.pop(thread_id, None)
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._watches:
+                    self._cond.wait()
+                now = time.perf_counter()
+                first = min(p.sample_from for p in self._watches.values())
+                if first > now:
+                    self._cond.wait(first - now)
+                    continue
+                frames = sys._current_frames()
+                for tid, prof in self._watches.items():
+                    frame = frames.get(tid)
+                    if frame is None or prof.sample_from > now:
+                        continue
+                    key = _collapse(frame)
+                    if key in prof.stacks or len(prof.stacks) < self.max_stacks:
+                        prof.stacks[key] += 1
+                del frames, frame
+            time.sleep(self.interval_s)
+
+
+class ProfileStore:
+    """Directory of profile files keeping only the newest `max_files`."""
+
+    def __init__(self, directory: str, max_files: int = 50):
+        self.directory = directory
+        self.max_files = max(1, int(max_files))
+        self._lock = threading.Lock()
+
+    def save(self, prof: RequestProfile, duration_s: float, ext: str, data: bytes):
+        os.makedirs(self.directory, exist_ok=True)
+        name = (
+            f"{int(time.time() * 1000):013d}-{prof.id}-{prof.reason}"
+            f"-{int(duration_s * 1000)}ms.{ext}"
+        )
+        path = os.path.join(self.directory, name)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        with self._lock:
+            names = self._names()
+            for old in names[: max(0, len(names) - self.max_files)]:
+                try:
+                    os.remove(os.path.join(self.directory, old))
+                except OSError:
+                    pass
+        return name
+
+    def _names(self) -> List[str]:
+        try:
+            return sorted(n for n in os.listdir(self.directory) if _NAME_RE.match(n))
+        except FileNotFoundError:
+            return []
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Newest first."""
+        out = []
+        for name in reversed(self._names()):
+            m = _NAME_RE.match(name)
+            try:
+                size = os.path.getsize(os.path.join(self.directory, name))
+            except OSError:
+                continue  # evicted meanwhile
+            out.append(
+                {
+                    "name": name,
+                    "id": m["id"],
+                    "reason": m["reason"],
+                    "format": "pstats" if m["ext"] == "prof" else "collapsed",
+                    "duration_ms": int(m["ms"]),
+                    "created": int(m["created"]) / 1000,
+                    "bytes": size,
+                }
+            )
+        return out
+
+    def path(self, name: str) -> Optional[str]:
+        """Path of a stored profile, or None (also for names not made by save)."""
+        if not _NAME_RE.match(name):
+            return None
+        path = os.path.join(self.directory, name)
+        return path if os.path.isfile(path) else None
+
+
+class Profiler:
+    def __init__(
+        self,
+        directory: str,
+        token: Optional[str] = None,
+        sample_rate: float = 0.0,
+        slow_ms: float = 0.0,
+        mode: str = "cprofile",
+        max_files: int = 50,
+        max_per_min: int = 10,
+        interval_ms: float = 10.0,
+    ):
+        mode = (mode or "cprofile").lower()
+        if mode not in ("cprofile", "sample"):
+            raise ValueError(f"Unknown profile mode: {mode!r}")
+        self.token = token or None
+        self.sample_rate = max(0.0, float(sample_rate))
+        self.slow_s = max(0.0, float(slow_ms)) / 1000
+        self.mode = mode
+        self.max_per_min = max(0, int(max_per_min))
+        self.store = ProfileStore(directory, max_files)
+        self.sampler = Sampler(interval_ms / 1000)
+        self._recent: deque = deque()
+        self._recent_lock = threading.Lock()
+        self.saved = 0
+        self.errors = 0
+
+    def _take_budget(self) -> bool:
+        now = time.monotonic()
+        with self._recent_lock:
+            while self._recent and now - self._recent[0] > 60:
+                self._recent.popleft()
+            if len(self._recent) >= self.max_per_min:
+                return False
+            self._recent.append(now)
+            return True
+
+    def check_token(self, token: Optional[str]) -> bool:
+        return bool(self.token and token) and hmac.compare_digest(
+            token.encode(), self.token.encode()
+        )
+
+    def begin(self, token: Optional[str], endpoint: str) -> Optional[RequestProfile]:
+        """
+        Decide whether the current request is profiled. The returned profile is
+        picked up by `call` in the scoring executor's worker thread.
+        """
+        if self.check_token(token):
+            prof = RequestProfile(self, "token", self.mode, endpoint)
+        elif (
+            self.sample_rate
+            and random.random() < self.sample_rate
+            and self._take_budget()
+        ):
+            prof = RequestProfile(self, "sampled", self.mode, endpoint)
+        elif self.slow_s:
+            prof = RequestProfile(self, "slow", "sample", endpoint, self.slow_s)
+        else:
+            prof = None
+        _current.set(prof)
+        return prof
+
+    def current(self) -> Optional[RequestProfile]:
+        return _current.get()
+
+    def run(self, prof: RequestProfile, fn: Callable, args) -> Any:
+        if prof.mode == "cprofile" and _cprofile_lock.acquire(blocking=False):
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+                try:
+                    return fn(*args)
+                finally:
+                    profile.disable()
+            finally:
+                _cprofile_lock.release()
+                self._finish(prof, profile)
+        tid = threading.get_ident()
+        self.sampler.watch(tid, prof)
+        try:
+            return fn(*args)
+        finally:
+            self.sampler.unwatch(tid)
+            self._finish(prof, None)
+
+    def _finish(self, prof: RequestProfile, profile: Optional[cProfile.Profile]):
+        duration = time.perf_counter() - prof.started
+        try:
+            if profile is not None:
+                profile.create_stats()
+                data, ext = marshal.dumps(profile.stats), "prof"
+            else:
+                if not prof.stacks:
+                    return
+                if prof.reason == "slow" and (
+                    duration < self.slow_s or not self._take_budget()
+                ):
+                    return
+                lines = (f"{k} {n}\n" for k, n in sorted(prof.stacks.items()))
+                data, ext = "".join(lines).encode("utf-8"), "folded"
+            name = self.store.save(prof, duration, ext, data)
+            self.saved += 1
+            logger.debug("saved profile %s (%s)", name, prof.endpoint)
+        except Exception as e:
+            self.errors += 1
+            logger.warning("failed to save profile: %s", e)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "saved": self.saved,
+            "errors": self.errors,
+            "sample_rate": self.sample_rate,
+            "slow_ms": self.slow_s * 1000,
+            "mode": self.mode,
+        }
+
+
+def call(fn: Callable, *args: Any) -> Any:
+    """
+    Run `fn(*args)`, profiled if the current request was selected by
+    `Profiler.begin`. Called from the executor's worker threads.
+    """
+    prof = _current.get()
+    if prof is None:
+        return fn(*args)
+    return prof.profiler.run(prof, fn, args)
+
+
+_profiler: Optional[Profiler] = None
+_profiler_lock = threading.Lock()
+
+
+def get_profiler() -> Profiler:
+    """
+    Process-wide profiler configured from the PROFILE_* settings.
+    """
+    global _profiler
+    if _profiler is None:
+        with _profiler_lock:
+            if _profiler is None:
+                _profiler = Profiler(
+                    directory=settings.PROFILE_DIR
+                    or os.path.join(tempfile.gettempdir(), "oratio-profiles"),
+                    token=settings.PROFILE_TOKEN,
+                    sample_rate=settings.PROFILE_SAMPLE_RATE,
+                    slow_ms=settings.PROFILE_SLOW_MS,
+                    mode=settings.PROFILE_MODE,
+                    max_files=settings.PROFILE_MAX_FILES,
+                    max_per_min=settings.PROFILE_MAX_PER_MIN,
+                    interval_ms=settings.PROFILE_INTERVAL_MS,
+                )
+    return _profiler
+
+
+def _reset_after_fork() -> None:
+    # the sampler thread does not survive fork(); each worker gets its own
+    global _profiler, _profiler_lock
+    _profiler, _profiler_lock = None, threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,259 @@
+"""
+Full-result cache for /score.
+
+Scoring is deterministic given the transcript, the rubric content, the
+embedding model, the scoring settings (KEYWORD_WEIGHT, SEMANTIC_WEIGHT,
+length penalties, chunking) and the mode (full or incremental). `fingerprint`
+hashes all of them into one key, so a repeated submission or frontend retry is
+answered from the cache without touching the scoring executor or the model.
+The key also serves as the ETag: a client that still holds the result gets a
+304 without any lookup.
+
+Tiers:
+  - in-process LRU (RESULT_CACHE_SIZE entries, 0 disables the cache) with a
+    per-entry TTL (RESULT_CACHE_TTL_S)
+  - optional shared backend for multi-replica deployments: Redis via
+    RESULT_CACHE_URL (needs the `redis` package), or any object with
+    `get(key) -> bytes | None` and `set(key, value, ttl_s)`
+
+Values are stored as encoded JSON, so the shared backend can hold them as-is.
+Bump SCHEMA when the scoring output changes to invalidate old entries.
+"""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
+
+from app.codec import dumps_json, loads_json
+from app.config import settings
+from app.nlp_utils import configured_model_name, loaded_model_name
+from app.rubric_registry import CompiledRubric, get_rubric_registry
+
+SCHEMA = 1
+
+try:
+    import redis  # type: ignore
+except Exception:
+    redis = None  # type: ignore
+
+
+def _scoring_settings() -> Tuple:
+    return (
+        float(settings.KEYWORD_WEIGHT),
+        float(settings.SEMANTIC_WEIGHT),
+        float(settings.LENGTH_PENALTY_UNDER_MIN),
+        float(settings.LENGTH_PENALTY_OVER_MAX),
+        bool(settings.EMBEDDING_CHUNKING),
+        int(settings.CHUNK_WORDS),
+        int(settings.CHUNK_OVERLAP),
+        settings.CHUNK_POOLING,
+    )
+
+
+def fingerprint(
+    text: str, rubric_version: str, model_name: str, incremental: bool = False
+) -> str:
+    h = hashlib.sha256()
+    params = [SCHEMA, rubric_version, model_name, incremental, *_scoring_settings()]
+    h.update(json.dumps(params).encode("utf-8"))
+    h.update(b"\0")
+    h.update(text.encode("utf-8", "surrogatepass"))
+    return h.hexdigest()
+
+
+def request_key(
+    text: str, rubric_id: Optional[str] = None, incremental: bool = False
+) -> str:
+    """
+    Fingerprint for scoring `text` against `rubric_id` as the rubric file is
+    right now, compiled or not (cold start, reload pending). A result may be
+    stored under it only if its `result_key` is the same. Never loads the model.
+    """
+    version, _ = get_rubric_registry().current_version(rubric_id)
+    return fingerprint(text, version, configured_model_name(), incremental)
+
+
+def result_key(
+    text: str, compiled: CompiledRubric, incremental: bool = False
+) -> Optional[str]:
+    """
+    Fingerprint of a result scored against `compiled`: the rubric version and
+    model the scorer actually used, which during a background reload are not
+    the ones `request_key` sees. None if the model changed under the scorer.
+    """
+    loaded = loaded_model_name()
+    if loaded is not None and loaded != compiled.model_name:
+        return None
+    return fingerprint(text, compiled.version, compiled.model_name, incremental)
+
+
+def etag(key: str, representation: str = "json") -> str:
+    return f'"{key[:32]}-{representation}"'
+
+
+def etag_matches(if_none_match: Optional[str], tag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    # weak comparison, as If-None-Match requires. "*" is not honoured: it
+    # means "any current representation", and a 304 must name a concrete one
+    return tag in tags or f"W/{tag}" in tags
+
+
+class LocalBackend:
+    """
+    In-process LRU with per-entry TTL. Also the stand-in for a shared backend
+    in tests (two ResultCache objects over one LocalBackend act as replicas).
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max(0, int(max_entries))
+        self._data: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl_s: float) -> None:
+        if not self.max_entries:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl_s, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class RedisBackend:
+    """Shared backend on Redis (`SET key value EX ttl`)."""
+
+    def __init__(self, url: str, prefix: str = "oratio:result:"):
+        if redis is None:
+            raise ImportError("RESULT_CACHE_URL needs the `redis` package")
+        self._client = redis.Redis.from_url(url, socket_timeout=0.5)
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes, ttl_s: float) -> None:
+        self._client.set(self.prefix + key, value, ex=max(1, int(ttl_s)))
+
+
+class ResultCache:
+    """
+    Local LRU+TTL tier in front of an optional shared backend. Errors from the
+    shared backend count as misses: the cache never fails a request.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_s: float = 3600.0,
+        shared: Optional[Any] = None,
+    ):
+        self.ttl_s = float(ttl_s)
+        self.local = LocalBackend(max_entries)
+        self.shared = shared
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.local.max_entries > 0 and self.ttl_s > 0
+
+    def get(self, key: str) -> Optional[Dict]:
+        if not self.enabled:
+            return None
+        value = self.local.get(key)
+        if value is None and self.shared is not None:
+            try:
+                value = self.shared.get(key)
+            except Exception as e:
+                self.errors += 1
+                print(f"[result_cache] shared get failed: {e}")
+            if value is not None:
+                self.shared_hits += 1
+                self.local.set(key, value, self.ttl_s)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return loads_json(value)
+
+    def put(self, key: str, result: Dict) -> None:
+        if not self.enabled:
+            return
+        value = dumps_json(result)
+        self.local.set(key, value, self.ttl_s)
+        if self.shared is not None:
+            try:
+                self.shared.set(key, value, self.ttl_s)
+            except Exception as e:
+                self.errors += 1
+                print(f"[result_cache] shared set failed: {e}")
+
+    def clear(self) -> None:
+        self.local.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.local),
+            "max_entries": self.local.max_entries,
+            "ttl_s": self.ttl_s,
+            "shared": self.shared is not None,
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+        }
+
+
+_cache: Optional[ResultCache] = None
+_cache_lock = Lock()
+
+
+def get_result_cache() -> ResultCache:
+    """
+    Process-wide cache configured from RESULT_CACHE_SIZE / RESULT_CACHE_TTL_S /
+    RESULT_CACHE_URL.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                shared = None
+                if settings.RESULT_CACHE_URL:
+                    try:
+                        shared = RedisBackend(settings.RESULT_CACHE_URL)
+                    except Exception as e:
+                        print(f"[result_cache] shared backend disabled: {e}")
+                _cache = ResultCache(
+                    max_entries=settings.RESULT_CACHE_SIZE,
+                    ttl_s=settings.RESULT_CACHE_TTL_S,
+                    shared=shared,
+                )
+    return _cache
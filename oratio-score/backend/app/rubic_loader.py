@@ -1,5 +1,4 @@
 # backend/app/rubric_loader.py
-import pandas as pd
 from typing import List, Dict, Optional
 import os
 import re
@@ -59,6 +58,10 @@ def load_rubric(path: Optional[str] = None) -> List[Dict]:
     if not os.path.exists(p):
         return _default_rubric()
 
+    # imported lazily: pandas/openpyxl are only needed when there is no fresh
+    # compiled artifact (see app.rubric_artifact)
+    import pandas as pd
+
     # First try reading with header=0
     try:
         df = pd.read_excel(p, header=0)
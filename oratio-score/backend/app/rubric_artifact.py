@@ -0,0 +1,183 @@
+"""
+Compiled rubric artifacts.
+
+Parsing rubric.xlsx needs pandas/openpyxl (up to three read_excel calls) and
+the description embeddings need a model.encode pass. Both are done once and
+stored as `<name>-<dir hash>.compiled.npz` in RUBRIC_ARTIFACT_DIR (default: a
+directory under the system temp dir, so serving never writes next to the
+rubric, which may be read-only or shared between deployments):
+  - meta: JSON with the parsed rows, normalized keywords, model name and the
+    source file's mtime/size/sha256
+  - embeddings: the description embedding matrix
+
+An artifact is used only when it matches the source file (same mtime and
+size, or same content hash, after which the new mtime is recorded) and the
+configured embedding model; otherwise the caller falls back to Excel parsing
+and rewrites it.
+
+Precompile during a build/deploy step with:
+
+  python -m app.rubric_artifact [rubric.xlsx ...]
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+
+ARTIFACT_FORMAT = 1
+ARTIFACT_SUFFIX = ".compiled.npz"
+
+
+def file_hash(path: str) -> Optional[str]:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def file_signature(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def artifact_dir() -> str:
+    return settings.RUBRIC_ARTIFACT_DIR or os.path.join(
+        tempfile.gettempdir(), "oratio-rubrics"
+    )
+
+
+def artifact_path(source_path: str) -> str:
+    source_dir, name = os.path.split(os.path.abspath(source_path))
+    # rubrics with the same file name in different directories don't collide
+    dir_hash = hashlib.sha256(source_dir.encode("utf-8")).hexdigest()[:8]
+    stem = os.path.splitext(name)[0]
+    return os.path.join(artifact_dir(), f"{stem}-{dir_hash}{ARTIFACT_SUFFIX}")
+
+
+def write_artifact(
+    source_path: str,
+    rows: List[Dict],
+    embeddings: np.ndarray,
+    model_name: str,
+    signature: Optional[Tuple[int, int]],
+    content_hash: Optional[str],
+) -> Optional[str]:
+    """
+    Write the artifact atomically. Returns its path, or None if it could not
+    be written (e.g. read-only filesystem); callers treat that as a cache miss.
+    """
+    meta = {
+        "format": ARTIFACT_FORMAT,
+        "model": model_name,
+        "source_mtime_ns": signature[0] if signature else None,
+        "source_size": signature[1] if signature else None,
+        "source_hash": content_hash,
+        "rows": rows,
+        "keywords_normalized": [
+            [str(k).lower() for k in (r.get("keywords") or []) if k] for r in rows
+        ],
+    }
+    path = artifact_path(source_path)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.savez(
+                f,
+                meta=np.array(json.dumps(meta, default=str)),
+                embeddings=np.asarray(embeddings),
+            )
+        os.replace(tmp, path)
+        return path
+    except OSError as e:
+        print(f"[rubric_artifact] Could not write {path}: {e}")
+        return None
+
+
+def load_artifact(
+    source_path: str, model_name: str
+) -> Optional[Tuple[List[Dict], np.ndarray, Optional[str]]]:
+    """
+    Return (rows, embeddings, source_hash) from a fresh artifact, or None if
+    there is none or it is stale.
+    """
+    path = artifact_path(source_path)
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            embeddings = np.array(data["embeddings"])
+    except Exception:
+        return None
+
+    if meta.get("format") != ARTIFACT_FORMAT or meta.get("model") != model_name:
+        return None
+    sig = file_signature(source_path)
+    if sig is None:
+        return None
+    if (meta.get("source_mtime_ns"), meta.get("source_size")) != tuple(sig):
+        # touched but possibly unchanged (e.g. git checkout): compare content
+        content_hash = file_hash(source_path)
+        if meta.get("source_hash") != content_hash:
+            return None
+        # record the new mtime so later cold starts skip the hash
+        write_artifact(
+            source_path, meta["rows"], embeddings, model_name, sig, content_hash
+        )
+    return meta["rows"], embeddings, meta.get("source_hash")
+
+
+def ensure_artifact(source_path: str, model_name: str) -> bool:
+    """
+    Make sure a fresh artifact for `model_name` exists, compiling a missing or
+    stale one in a throwaway subprocess: the caller (a parent about to fork)
+    never runs the model. Returns False if there is still none (artifacts
+    disabled, no source file, unwritable RUBRIC_ARTIFACT_DIR, other model).
+    """
+    if not settings.RUBRIC_ARTIFACTS or file_signature(source_path) is None:
+        return False
+    if load_artifact(source_path, model_name) is not None:
+        return True
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, RUBRIC_ARTIFACT_DIR=artifact_dir())
+    env["PYTHONPATH"] = os.pathsep.join(
+        p for p in (backend_dir, env.get("PYTHONPATH")) if p
+    )
+    cmd = [sys.executable, "-m", "app.rubric_artifact", source_path]
+    if subprocess.run(cmd, env=env).returncode != 0:
+        print(f"[rubric_artifact] Compiling {source_path} in a subprocess failed")
+    return load_artifact(source_path, model_name) is not None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from app.rubric_registry import compile_rubric
+    from app.rubic_loader import RUBRIC_PATH
+
+    paths = (argv if argv is not None else sys.argv[1:]) or [RUBRIC_PATH]
+    for p in paths:
+        if not os.path.exists(p):
+            print(f"[rubric_artifact] {p}: not found")
+            return 1
+        compiled = compile_rubric(os.path.abspath(p), os.path.abspath(p), force=True)
+        print(
+            f"[rubric_artifact] {p}: {len(compiled.rows)} criteria, "
+            f"model {compiled.model_name} -> {artifact_path(p)}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,331 @@
+"""
+Registry of compiled rubrics, keyed by rubric id.
+
+Each entry holds the rubric rows plus everything scoring precomputes from them
+(description embeddings, keyword index, RubricArrays). Entries are:
+  - selected per request: "default" is data/rubric.xlsx, any other id maps to
+    RUBRIC_DIR/<id>.xlsx
+  - validated against the file's mtime/size on every lookup; when the file
+    changed, the current entry keeps serving while a background thread
+    compiles the new version and swaps it in atomically
+  - evicted least-recently-used beyond RUBRIC_CACHE_SIZE entries
+  - compiled from a `.compiled.npz` artifact when a fresh one exists
+    (see app.rubric_artifact), skipping Excel parsing and encoding
+"""
+
+import os
+import re
+import time
+from collections import OrderedDict
+from threading import Lock, Thread
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.nlp_utils import (
+    KeywordIndex,
+    configured_model_name,
+    current_model_name,
+    load_embedding_model,
+)
+from app.rubic_loader import RUBRIC_PATH, load_rubric
+from app.rubric_artifact import (
+    file_hash,
+    file_signature,
+    load_artifact,
+    write_artifact,
+)
+
+DEFAULT_RUBRIC_ID = "default"
+
+_RUBRIC_ID_RE = re.compile(r"[A-Za-z0-9][A-Za-z0-9_.-]*")
+
+
+class UnknownRubricError(LookupError):
+    """Raised when a rubric id does not map to a rubric file."""
+
+
+class RubricArrays:
+    """
+    Column-wise view of a rubric for vectorized scoring.
+
+    Built once per compiled rubric:
+      - unit_embs: (n, dim) description embeddings, L2-normalized (zero rows stay zero)
+      - weights / weight_share: criterion weight and weight / total weight
+      - min_words / max_words: 0 where the rubric sets no limit
+      - vocab + keyword_matrix: unique lower-cased keywords and an (n, len(vocab))
+        count matrix, so matched keywords per criterion are one matrix product
+      - n_keywords: keyword list length per criterion (the keyword score denominator)
+    """
+
+    def __init__(self, rows: List[Dict], embeddings: np.ndarray):
+        n = len(rows)
+        self.size = n
+        self.names = [r["name"] for r in rows]
+        self.weights = np.array([float(r["weight"]) for r in rows], dtype=float)
+        total_weight = sum(r["weight"] for r in rows) or 100.0
+        self.weight_share = np.array(
+            [r["weight"] / total_weight for r in rows], dtype=float
+        )
+        self.min_words = np.array([r.get("min_words") or 0 for r in rows], dtype=float)
+        self.max_words = np.array([r.get("max_words") or 0 for r in rows], dtype=float)
+
+        embs = np.asarray(embeddings, dtype=float)
+        if embs.ndim == 2 and len(embs) == n:
+            norms = np.linalg.norm(embs, axis=1, keepdims=True)
+            self.unit_embs = embs / np.where(norms == 0, 1.0, norms)
+        else:
+            self.unit_embs = np.zeros((n, 0), dtype=float)
+
+        self.keywords = [list(r.get("keywords") or []) for r in rows]
+        self.n_keywords = np.array([len(k) for k in self.keywords], dtype=float)
+        vocab_ids: Dict[str, int] = {}
+        # per criterion: vocab id of each keyword, -1 for empty keywords
+        self.keyword_ids: List[List[int]] = []
+        for kws in self.keywords:
+            ids = []
+            for kw in kws:
+                k = kw.lower() if kw else ""
+                ids.append(vocab_ids.setdefault(k, len(vocab_ids)) if k else -1)
+            self.keyword_ids.append(ids)
+        self.vocab = list(vocab_ids)
+        self.keyword_matrix = np.zeros((n, len(self.vocab)), dtype=float)
+        for i, ids in enumerate(self.keyword_ids):
+            for vid in ids:
+                if vid >= 0:
+                    self.keyword_matrix[i, vid] += 1.0
+
+
+class CompiledRubric:
+    """
+    A rubric plus its precomputed scoring artifacts.
+    """
+
+    def __init__(
+        self,
+        rubric_id: str,
+        path: str,
+        rows: List[Dict],
+        embeddings: np.ndarray,
+        model_name: str,
+        signature: Optional[Tuple[int, int]],
+        content_hash: Optional[str],
+    ):
+        self.rubric_id = rubric_id
+        self.path = path
+        self.rows = rows
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.signature = signature
+        self.content_hash = content_hash
+        self.keyword_index = KeywordIndex(
+            kw for r in rows for kw in (r.get("keywords") or [])
+        )
+        self.arrays = RubricArrays(rows, embeddings)
+        self.loaded_at = time.time()
+
+    @property
+    def version(self) -> str:
+        """
+        Identifies this exact rubric content (falls back to the built-in
+        default rubric when the file is missing).
+        """
+        return self.content_hash or "builtin-default"
+
+    def info(self) -> Dict:
+        return {
+            "id": self.rubric_id,
+            "path": self.path,
+            "version": self.version,
+            "model": self.model_name,
+            "criteria": len(self.rows),
+            "loaded_at": self.loaded_at,
+        }
+
+
+def compile_rubric(rubric_id: str, path: str, force: bool = False) -> CompiledRubric:
+    """
+    Load the rubric and its description embeddings, from a fresh compiled
+    artifact when possible, otherwise from the Excel file (then the artifact
+    is rewritten). `force` skips the artifact lookup.
+    """
+    # the configured name is enough to validate an artifact: serving one
+    # never loads the model
+    model_name = configured_model_name()
+    signature = file_signature(path)
+    use_artifacts = settings.RUBRIC_ARTIFACTS and signature is not None
+
+    if use_artifacts and not force:
+        cached = load_artifact(path, model_name)
+        if cached is None and current_model_name() != model_name:
+            # the configured model may have loaded as a fallback (e.g. the dummy)
+            model_name = current_model_name()
+            cached = load_artifact(path, model_name)
+        if cached is not None:
+            rows, embs, content_hash = cached
+            return CompiledRubric(
+                rubric_id, path, rows, embs, model_name, signature, content_hash
+            )
+
+    model_name = current_model_name()
+    content_hash = file_hash(path)
+    rows = load_rubric(path)
+    model = load_embedding_model()
+    desc_texts = [r.get("description", "") or "" for r in rows]
+    embs = np.array(
+        model.encode(desc_texts, convert_to_numpy=True, show_progress_bar=False)
+    )
+    if use_artifacts:
+        write_artifact(path, rows, embs, model_name, signature, content_hash)
+    return CompiledRubric(
+        rubric_id, path, rows, embs, model_name, signature, content_hash
+    )
+
+
+class RubricRegistry:
+    """
+    Thread-safe LRU of CompiledRubric entries with background reloads.
+    """
+
+    def __init__(
+        self,
+        rubric_dir: Optional[str] = None,
+        max_entries: int = 16,
+        default_path: Optional[str] = None,
+    ):
+        self.default_path = os.path.abspath(default_path or RUBRIC_PATH)
+        self.rubric_dir = os.path.abspath(
+            rubric_dir or os.path.dirname(self.default_path)
+        )
+        self.max_entries = max(1, int(max_entries))
+        self._entries: "OrderedDict[str, CompiledRubric]" = OrderedDict()
+        self._lock = Lock()
+        self._reloading: Set[str] = set()
+        self.reloads = 0
+
+    def resolve(self, rubric_id: Optional[str] = None) -> Tuple[str, str]:
+        """
+        Map a rubric id to (id, path). Raises UnknownRubricError for ids that
+        are malformed or have no file in the rubric directory.
+        """
+        if not rubric_id or rubric_id == DEFAULT_RUBRIC_ID:
+            return DEFAULT_RUBRIC_ID, self.default_path
+        if not _RUBRIC_ID_RE.fullmatch(rubric_id) or ".." in rubric_id:
+            raise UnknownRubricError(rubric_id)
+        name = rubric_id if rubric_id.endswith(".xlsx") else rubric_id + ".xlsx"
+        path = os.path.join(self.rubric_dir, name)
+        if not os.path.isfile(path):
+            raise UnknownRubricError(rubric_id)
+        return rubric_id, path
+
+    def _is_stale(self, entry: CompiledRubric) -> bool:
+        return (
+            entry.signature != file_signature(entry.path)
+            or entry.model_name != configured_model_name()
+        )
+
+    def _store(self, entry: CompiledRubric) -> None:
+        # caller holds the lock
+        self._entries[entry.rubric_id] = entry
+        self._entries.move_to_end(entry.rubric_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _reload_in_background(self, rubric_id: str, path: str) -> None:
+        with self._lock:
+            if rubric_id in self._reloading:
+                return
+            self._reloading.add(rubric_id)
+
+        def _run():
+            try:
+                entry = compile_rubric(rubric_id, path)
+                with self._lock:
+                    self._store(entry)
+                    self.reloads += 1
+            except Exception as e:
+                print(f"[rubric_registry] Reload of {rubric_id!r} failed: {e}")
+            finally:
+                with self._lock:
+                    self._reloading.discard(rubric_id)
+
+        Thread(target=_run, name=f"rubric-reload-{rubric_id}", daemon=True).start()
+
+    def get(
+        self, rubric_id: Optional[str] = None, path: Optional[str] = None
+    ) -> CompiledRubric:
+        """
+        Return the compiled rubric for `rubric_id`, or for an explicit file
+        `path` (registered under its absolute path). The first lookup compiles
+        synchronously; later changes to the file are picked up in the background.
+        """
+        if path:
+            key, p = os.path.abspath(path), os.path.abspath(path)
+        else:
+            key, p = self.resolve(rubric_id)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        if entry is None:
+            entry = compile_rubric(key, p)
+            with self._lock:
+                self._store(entry)
+            return entry
+
+        if self._is_stale(entry):
+            self._reload_in_background(key, p)
+        return entry
+
+    def current_version(self, rubric_id: Optional[str] = None) -> Tuple[str, bool]:
+        """
+        (version of the rubric file as it is now, whether the compiled entry
+        serves that version). Never compiles, so it doesn't need the model.
+        """
+        key, p = self.resolve(rubric_id)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and not self._is_stale(entry):
+            return entry.version, True
+        return file_hash(p) or "builtin-default", False
+
+    def reload(self, rubric_id: Optional[str] = None) -> CompiledRubric:
+        """
+        Recompile a rubric synchronously and swap it in.
+        """
+        key, p = self.resolve(rubric_id)
+        entry = compile_rubric(key, p)
+        with self._lock:
+            self._store(entry)
+            self.reloads += 1
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def describe(self) -> List[Dict]:
+        with self._lock:
+            return [e.info() for e in self._entries.values()]
+
+
+_registry: Optional[RubricRegistry] = None
+_registry_lock = Lock()
+
+
+def get_rubric_registry() -> RubricRegistry:
+    """
+    Process-wide registry configured from RUBRIC_DIR / RUBRIC_CACHE_SIZE.
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = RubricRegistry(
+                    rubric_dir=settings.RUBRIC_DIR,
+                    max_entries=settings.RUBRIC_CACHE_SIZE,
+                )
+    return _registry
@@ -1,48 +1,59 @@
 # backend/app/scoring.py
-from typing import List, Dict, Tuple, Optional
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 from app.nlp_utils import (
-    count_words,
+    KeywordIndex,
+    KeywordScan,
     find_keywords_exact,
     find_keywords_fuzzy,
     get_embedding,
+    embed_batch,
+    embed_in_batches,
+    chunk_words,
+    pool_embeddings,
     cosine_sim,
-    load_embedding_model,
 )
 
-from app.rubic_loader import load_rubric
+from app.rubric_registry import CompiledRubric, RubricArrays, get_rubric_registry
 import numpy as np
 from app.config import settings
+from app.metrics import span
+from app.incremental import segmented_inputs
 
-_rubric_cache: Optional[List[Dict]] = None
-_rubric_embeddings_cache: Optional[np.ndarray] = None
 
-
-def _prepare_rubric_cache(rubric_path: Optional[str] = None):
-    global _rubric_cache, _rubric_embeddings_cache
-    if _rubric_cache is not None:
-        return
-    rubric = load_rubric(rubric_path)
-    model = load_embedding_model()
-    desc_texts = [r.get("description", "") or "" for r in rubric]
-    # compute embeddings for each description
-    embs = model.encode(desc_texts, convert_to_numpy=True, show_progress_bar=False)
-    _rubric_cache = rubric
-    _rubric_embeddings_cache = np.array(embs)
+def _prepare_rubric_cache(
+    rubric_path: Optional[str] = None, rubric: Optional[str] = None
+) -> CompiledRubric:
+    """
+    Compiled rubric (rows, description embeddings, keyword index) from the
+    registry: an explicit file `rubric_path` wins over a rubric id.
+    """
+    registry = get_rubric_registry()
+    if rubric_path:
+        return registry.get(path=rubric_path)
+    return registry.get(rubric)
 
 
 def keyword_score(
-    text: str, keywords: List[str], use_fuzzy: bool = True
+    text: str,
+    keywords: List[str],
+    use_fuzzy: bool = True,
+    scan: Optional[KeywordScan] = None,
 ) -> Tuple[float, List[str]]:
     """
     Returns (score in 0..100, matched_keywords)
+    Pass a precomputed `scan` (KeywordIndex.scan of `text`) to avoid
+    re-tokenizing the transcript for every criterion.
     """
     if not keywords:
         return 0.0, []
     # exact match
-    found = find_keywords_exact(text, keywords)
+    if scan is not None:
+        found = scan.find(keywords)
+    else:
+        found = find_keywords_exact(text, keywords)
     # if nothing found and fuzzy available, try fuzzy
     if use_fuzzy and len(found) == 0:
-        found = find_keywords_fuzzy(text, keywords)
+        found = find_keywords_fuzzy(text, keywords, scan=scan)
     score = (len(found) / len(keywords)) * 100.0
     return score, found
 
@@ -67,8 +78,313 @@ def length_penalty(
     return 0.0
 
 
+def _unit_rows(x: np.ndarray) -> np.ndarray:
+    # L2-normalize rows; zero vectors keep a norm of 1 and stay all-zero
+    x = np.asarray(x, dtype=float)
+    norms = np.linalg.norm(x, axis=-1, keepdims=True)
+    return x / np.where(norms == 0, 1.0, norms)
+
+
+def _semantic_matrix(transcript_embs: np.ndarray, unit_embs: np.ndarray) -> np.ndarray:
+    """
+    Scores (0..100, clamped) of each transcript row against pre-normalized
+    criterion embeddings; shape (n_transcripts, n_criteria).
+    """
+    t = np.asarray(transcript_embs, dtype=float)
+    if t.ndim != 2 or unit_embs.ndim != 2 or t.shape[1] != unit_embs.shape[1]:
+        return np.zeros((t.shape[0] if t.ndim else 0, len(unit_embs)), dtype=float)
+    return np.clip((_unit_rows(t) @ unit_embs.T) * 100.0, 0.0, 100.0)
+
+
+# fuzzy lookup: keywords -> those matching exactly or fuzzily
+FuzzyLookup = Callable[[List[str]], List[str]]
+
+
+def _keyword_scores(
+    text: str,
+    arrays: RubricArrays,
+    scan: KeywordScan,
+    use_fuzzy: bool = True,
+    fuzzy: Optional[FuzzyLookup] = None,
+) -> Tuple[np.ndarray, List[List[str]]]:
+    """
+    Keyword score (0..100) and matched keywords for every criterion at once.
+
+    Each unique keyword is looked up once; per-criterion match counts are a
+    product with the rubric's keyword count matrix. Criteria with no exact
+    match fall back to fuzzy matching, done in one pass over their keywords
+    (with `find_keywords_fuzzy` on `scan` unless another `fuzzy` is given).
+    """
+    n = arrays.size
+    if not arrays.vocab:
+        return np.zeros(n, dtype=float), [[] for _ in range(n)]
+    vocab = arrays.vocab
+    exact = set(scan.find(vocab))
+    hits = np.fromiter((k in exact for k in vocab), dtype=float, count=len(vocab))
+    counts = arrays.keyword_matrix @ hits
+    fuzzy_rows = np.zeros(n, dtype=bool)
+    fuzzy_hits = hits
+    if use_fuzzy:
+        fuzzy_rows = (counts == 0) & (arrays.n_keywords > 0)
+        if fuzzy_rows.any():
+            pending = arrays.keyword_matrix[fuzzy_rows].any(axis=0)
+            pending_kws = [vocab[v] for v in np.flatnonzero(pending)]
+            if fuzzy is None:
+                found = find_keywords_fuzzy(text, pending_kws, scan=scan)
+            else:
+                found = fuzzy(pending_kws)
+            found = set(found)
+            fuzzy_hits = np.fromiter(
+                (k in found for k in vocab), dtype=float, count=len(vocab)
+            )
+            counts = np.where(fuzzy_rows, arrays.keyword_matrix @ fuzzy_hits, counts)
+
+    scores = np.zeros(n, dtype=float)
+    np.divide(counts, arrays.n_keywords, out=scores, where=arrays.n_keywords > 0)
+    scores *= 100.0
+
+    # matched keyword lists (original strings, original order)
+    exact_l, fuzzy_l = hits.tolist(), fuzzy_hits.tolist()
+    matched = []
+    for kws, ids, fz in zip(arrays.keywords, arrays.keyword_ids, fuzzy_rows.tolist()):
+        hit = fuzzy_l if fz else exact_l
+        matched.append([kw for kw, v in zip(kws, ids) if v >= 0 and hit[v]])
+    return scores, matched
+
+
+def _length_penalties(word_count: int, arrays: RubricArrays) -> np.ndarray:
+    # vectorized `length_penalty`: 0 limits mean "no limit"
+    under = (arrays.min_words > 0) & (word_count < arrays.min_words)
+    over = ~under & (arrays.max_words > 0) & (word_count > arrays.max_words)
+    return np.where(
+        under,
+        float(settings.LENGTH_PENALTY_UNDER_MIN),
+        np.where(over, float(settings.LENGTH_PENALTY_OVER_MAX), 0.0),
+    )
+
+
+def _score_columns(
+    text: str,
+    transcript_emb: np.ndarray,
+    rubric: List[Dict],
+    rubric_embs: np.ndarray,
+    use_fuzzy: bool = True,
+    semantic_scores: Optional[np.ndarray] = None,
+    keyword_index: Optional[KeywordIndex] = None,
+    chunks: Optional[Dict] = None,
+    arrays: Optional[RubricArrays] = None,
+    scan: Optional[KeywordScan] = None,
+    fuzzy: Optional[FuzzyLookup] = None,
+) -> Dict:
+    """
+    All criterion scores at once, computed on the rubric's `RubricArrays`.
+    Returns plain columns (lists, one entry per criterion) plus word count and
+    overall score; `_criterion_entries` turns them into result dicts.
+    """
+    if arrays is None:
+        arrays = RubricArrays(rubric, rubric_embs)
+    if scan is None:
+        if keyword_index is None:
+            keyword_index = KeywordIndex(kw for kws in arrays.keywords for kw in kws)
+        scan = keyword_index.scan(text)
+
+    with span("keywords"):
+        kscores, matched = _keyword_scores(
+            text, arrays, scan, use_fuzzy=use_fuzzy, fuzzy=fuzzy
+        )
+    with span("semantic"):
+        if semantic_scores is not None:
+            sscores = np.asarray(semantic_scores, dtype=float)
+        else:
+            sscores = _semantic_matrix(
+                np.asarray(transcript_emb, dtype=float).reshape(1, -1),
+                arrays.unit_embs,
+            )[0]
+    penalties = _length_penalties(scan.word_count, arrays)
+
+    raw = (
+        float(settings.KEYWORD_WEIGHT) * kscores
+        + float(settings.SEMANTIC_WEIGHT) * sscores
+        + penalties
+    )
+    weighted = raw * arrays.weight_share
+    # clamp raw between 0-100 for readability (weighted may be <0 if a negative penalty is present; kept as-is)
+    raw_clamped = np.clip(raw, 0.0, 100.0)
+    weighted_l = weighted.tolist()
+    # sequential sum keeps the overall score identical to the per-row loop
+    overall_weighted = sum(weighted_l)
+
+    chunk_scores = None
+    if chunks is not None and rubric:
+        chunk_scores = _semantic_matrix(chunks["embs"], arrays.unit_embs).T.tolist()
+    return {
+        "word_count": scan.word_count,
+        "overall_score": float(max(0.0, min(100.0, overall_weighted))),
+        "keyword_score": kscores.tolist(),
+        "keywords_found": matched,
+        "semantic_score": sscores.tolist(),
+        "length_penalty": penalties.tolist(),
+        "raw_score": raw_clamped.tolist(),
+        "weighted_score": weighted_l,
+        "chunk_scores": chunk_scores,
+        "spans": chunks["spans"] if chunks is not None else None,
+    }
+
+
+def _criterion_entries(rubric: List[Dict], cols: Dict) -> Iterator[Tuple[Dict, Dict]]:
+    """
+    (criterion, evidence) result dicts, one criterion at a time.
+    """
+    for i, r in enumerate(rubric):
+        crit_name = r["name"]
+        common = {
+            "keyword_score": round(cols["keyword_score"][i], 3),
+            "keywords_found": cols["keywords_found"][i],
+            "semantic_score": round(cols["semantic_score"][i], 3),
+            "length_penalty": cols["length_penalty"][i],
+            "raw_score": round(cols["raw_score"][i], 3),
+        }
+        criterion = {
+            "name": crit_name,
+            "weight": r["weight"],
+            "keywords": r.get("keywords", []),
+            **common,
+            "weighted_score": round(cols["weighted_score"][i], 4),
+        }
+        evidence = {
+            "name": crit_name,
+            "description": r.get("description"),
+            "keywords": r.get("keywords", []),
+            "weight": r["weight"],
+            **common,
+        }
+        if cols["chunk_scores"] is not None:
+            evidence["chunk_scores"] = [
+                {
+                    "start_word": start,
+                    "end_word": end,
+                    "semantic_score": round(score, 3),
+                }
+                for (start, end), score in zip(cols["spans"], cols["chunk_scores"][i])
+            ]
+        yield criterion, evidence
+
+
+def _score_against_rubric(
+    text: str,
+    transcript_emb: np.ndarray,
+    rubric: List[Dict],
+    rubric_embs: np.ndarray,
+    use_fuzzy: bool = True,
+    semantic_scores: Optional[np.ndarray] = None,
+    keyword_index: Optional[KeywordIndex] = None,
+    chunks: Optional[Dict] = None,
+    arrays: Optional[RubricArrays] = None,
+    scan: Optional[KeywordScan] = None,
+    fuzzy: Optional[FuzzyLookup] = None,
+) -> Dict:
+    """
+    Scoring shared by single and batch scoring, computed for all criteria at
+    once on the rubric's `RubricArrays`; dicts are only built for the result.
+    If `semantic_scores` is given (one per criterion, already in 0..100) it is
+    used instead of computing cosine similarity against `transcript_emb`.
+    The transcript is tokenized and keyword-scanned once via `keyword_index`.
+    If `chunks` is given (see `_embed_transcripts`), per-chunk similarities are
+    added to each criterion's evidence under "chunk_scores". `scan` / `fuzzy`
+    replace the transcript scan and fuzzy lookup (see app.incremental).
+    """
+    cols = _score_columns(
+        text,
+        transcript_emb,
+        rubric,
+        rubric_embs,
+        use_fuzzy=use_fuzzy,
+        semantic_scores=semantic_scores,
+        keyword_index=keyword_index,
+        chunks=chunks,
+        arrays=arrays,
+        scan=scan,
+        fuzzy=fuzzy,
+    )
+    criteria_out = []
+    evidence = {}
+    with span("assemble"):
+        for criterion, ev in _criterion_entries(rubric, cols):
+            criteria_out.append(criterion)
+            evidence[criterion["name"]] = ev
+    return {
+        "overall_score": cols["overall_score"],
+        "word_count": cols["word_count"],
+        "criteria": criteria_out,
+        "evidence": evidence,
+    }
+
+
+def batch_semantic_scores(
+    transcript_embs: np.ndarray, rubric_embs: np.ndarray
+) -> np.ndarray:
+    """
+    Cosine similarity of every transcript against every criterion as a single
+    matrix product. Returns an array of shape (n_transcripts, n_criteria) with
+    scores converted to 0..100 and clamped. Zero vectors score 0.0.
+    """
+    c = np.asarray(rubric_embs, dtype=float)
+    if c.ndim != 2:
+        t = np.asarray(transcript_embs)
+        return np.zeros((t.shape[0] if t.ndim else 0, len(c)), dtype=float)
+    return _semantic_matrix(transcript_embs, _unit_rows(c))
+
+
+def _embed_transcripts(texts: List[str]) -> Tuple[np.ndarray, List[Optional[Dict]]]:
+    """
+    Embed transcripts, chunking long ones when EMBEDDING_CHUNKING is on.
+
+    Short transcripts go through one `embed_batch` call. Transcripts longer than
+    CHUNK_WORDS are split into overlapping windows; all windows are embedded in
+    CHUNK_BATCH_SIZE batches and pooled (CHUNK_POOLING) into one vector.
+    Returns (embeddings matrix, per-text chunk info or None), where chunk info is
+    {"spans": [(start_word, end_word), ...], "embs": (n_chunks, dim) array}.
+    """
+    chunk_info: List[Optional[Dict]] = [None] * len(texts)
+    split: Dict[int, List[Tuple[int, int, str]]] = {}
+    if settings.EMBEDDING_CHUNKING:
+        for j, text in enumerate(texts):
+            parts = chunk_words(text, settings.CHUNK_WORDS, settings.CHUNK_OVERLAP)
+            if len(parts) > 1:
+                split[j] = parts
+
+    whole = [j for j in range(len(texts)) if j not in split]
+    rows: Dict[int, np.ndarray] = {}
+    if whole:
+        for j, emb in zip(whole, embed_batch([texts[j] for j in whole])):
+            rows[j] = emb
+    if split:
+        all_chunks = [c[2] for j in split for c in split[j]]
+        chunk_embs = embed_in_batches(all_chunks, settings.CHUNK_BATCH_SIZE)
+        pos = 0
+        for j, parts in split.items():
+            embs = chunk_embs[pos : pos + len(parts)]
+            pos += len(parts)
+            rows[j] = pool_embeddings(embs, settings.CHUNK_POOLING)
+            chunk_info[j] = {"spans": [(a, b) for a, b, _ in parts], "embs": embs}
+    return np.array([rows[j] for j in range(len(texts))]), chunk_info
+
+
+def _embed_one(text: str) -> Tuple[np.ndarray, Optional[Dict]]:
+    # single transcript: the (cached, micro-batched) get_embedding path unless chunking
+    if settings.EMBEDDING_CHUNKING:
+        embs, info = _embed_transcripts([text])
+        return embs[0], info[0]
+    return get_embedding(text), None
+
+
 def score_transcript(
-    text: str, rubric_path: Optional[str] = None, use_fuzzy: bool = True
+    text: str,
+    rubric_path: Optional[str] = None,
+    use_fuzzy: bool = True,
+    rubric: Optional[str] = None,
+    incremental: bool = False,
+    compiled: Optional[CompiledRubric] = None,
 ) -> Dict:
     """
     Full deterministic scoring pipeline.
@@ -84,69 +400,118 @@ def score_transcript(
         ],
         "evidence": {...}  # same as criteria but keyed by name for LLM use
       }
+    `rubric` selects a rubric id from the registry (default rubric if None).
+    `incremental` reuses cached per-sentence work (see app.incremental).
+    `compiled` scores against an already looked-up rubric instead.
     """
-    _prepare_rubric_cache(rubric_path)
-    global _rubric_cache, _rubric_embeddings_cache
-    rubric = _rubric_cache or []
-    rubric_embs = _rubric_embeddings_cache
+    if compiled is None:
+        with span("rubric"):
+            compiled = _prepare_rubric_cache(rubric_path, rubric)
+    scan = fuzzy = chunks = None
+    if incremental:
+        transcript_emb, scan, fuzzy = segmented_inputs(text, compiled)
+    else:
+        with span("embed"):
+            transcript_emb, chunks = _embed_one(text)
+    return _score_against_rubric(
+        text,
+        transcript_emb,
+        compiled.rows,
+        compiled.embeddings,
+        use_fuzzy=use_fuzzy,
+        keyword_index=compiled.keyword_index,
+        chunks=chunks,
+        arrays=compiled.arrays,
+        scan=scan,
+        fuzzy=fuzzy,
+    )
 
-    word_count = count_words(text)
-    transcript_emb = get_embedding(text)
 
-    total_weight = sum(r["weight"] for r in rubric) or 100.0
+def iter_score_events(
+    text: str,
+    rubric_path: Optional[str] = None,
+    use_fuzzy: bool = True,
+    rubric: Optional[str] = None,
+    incremental: bool = False,
+) -> Iterator[Tuple[str, Dict]]:
+    """
+    `score_transcript` as a sequence of (event, data) steps for streaming:
+      ("start", {word_count, criteria, rubric, rubric_version})  before embedding
+      ("criterion", {index, criterion, evidence})                one per criterion
+      ("overall", {overall_score, word_count})
+    Collecting the criterion/evidence entries gives the `score_transcript` result.
+    """
+    with span("rubric"):
+        compiled = _prepare_rubric_cache(rubric_path, rubric)
+    fuzzy = chunks = None
+    if incremental:
+        transcript_emb, scan, fuzzy = segmented_inputs(text, compiled)
+    else:
+        scan = compiled.keyword_index.scan(text)
+    yield "start", {
+        "word_count": scan.word_count,
+        "criteria": len(compiled.rows),
+        "rubric": compiled.rubric_id,
+        "rubric_version": compiled.version,
+    }
+    if not incremental:
+        with span("embed"):
+            transcript_emb, chunks = _embed_one(text)
+    cols = _score_columns(
+        text,
+        transcript_emb,
+        compiled.rows,
+        compiled.embeddings,
+        use_fuzzy=use_fuzzy,
+        chunks=chunks,
+        arrays=compiled.arrays,
+        scan=scan,
+        fuzzy=fuzzy,
+    )
+    for i, (criterion, evidence) in enumerate(_criterion_entries(compiled.rows, cols)):
+        yield "criterion", {"index": i, "criterion": criterion, "evidence": evidence}
+    yield "overall", {
+        "overall_score": cols["overall_score"],
+        "word_count": cols["word_count"],
+    }
 
-    criteria_out = []
-    evidence = {}
-    overall_weighted = 0.0
 
-    for i, r in enumerate(rubric):
-        crit_name = r["name"]
-        # keyword
-        kscore, matched = keyword_score(
-            text, r.get("keywords", []), use_fuzzy=use_fuzzy
-        )
-        # semantic
-        crit_emb = rubric_embs[i]
-        sscore = semantic_score(transcript_emb, crit_emb)
-        # length penalty
-        penalty = length_penalty(word_count, r.get("min_words"), r.get("max_words"))
-        # combine weights (configurable weights)
-        kw_w = float(settings.KEYWORD_WEIGHT)
-        sem_w = float(settings.SEMANTIC_WEIGHT)
-        raw = (kw_w * kscore) + (sem_w * sscore) + penalty
-        weighted = raw * (r["weight"] / total_weight)
-        # clamp raw between 0-100 for readability (but weighted may be <0 if negative penalty present; we keep weighted as-is)
-        raw_clamped = max(0.0, min(100.0, raw))
-        criteria_out.append(
-            {
-                "name": crit_name,
-                "weight": r["weight"],
-                "keywords": r.get("keywords", []),
-                "keyword_score": float(round(kscore, 3)),
-                "keywords_found": matched,
-                "semantic_score": float(round(sscore, 3)),
-                "length_penalty": float(penalty),
-                "raw_score": float(round(raw_clamped, 3)),
-                "weighted_score": float(round(weighted, 4)),
-            }
-        )
-        evidence[crit_name] = {
-            "name": crit_name,
-            "description": r.get("description"),
-            "keywords": r.get("keywords", []),
-            "weight": r["weight"],
-            "keyword_score": float(round(kscore, 3)),
-            "keywords_found": matched,
-            "semantic_score": float(round(sscore, 3)),
-            "length_penalty": float(penalty),
-            "raw_score": float(round(raw_clamped, 3)),
-        }
-        overall_weighted += weighted
+def score_transcripts(
+    texts: List[str],
+    rubric_path: Optional[str] = None,
+    use_fuzzy: bool = True,
+    rubric: Optional[str] = None,
+) -> List[Dict]:
+    """
+    Batch version of `score_transcript`.
+    All transcripts are encoded with a single `embed_batch` call and the
+    transcript x criterion similarities are computed as one matrix product.
+    Returns one result per input text, in order, each with the same shape as
+    `score_transcript`.
+    """
+    if not texts:
+        return []
+    with span("rubric"):
+        compiled = _prepare_rubric_cache(rubric_path, rubric)
+    rows = compiled.rows
+    rubric_embs = compiled.embeddings
 
-    overall_score = float(max(0.0, min(100.0, overall_weighted)))
-    return {
-        "overall_score": overall_score,
-        "word_count": word_count,
-        "criteria": criteria_out,
-        "evidence": evidence,
-    }
+    with span("embed"):
+        transcript_embs, chunk_info = _embed_transcripts(list(texts))
+    with span("semantic"):
+        sem_matrix = _semantic_matrix(transcript_embs, compiled.arrays.unit_embs)
+
+    return [
+        _score_against_rubric(
+            text,
+            transcript_embs[j],
+            rows,
+            rubric_embs,
+            use_fuzzy=use_fuzzy,
+            semantic_scores=sem_matrix[j],
+            keyword_index=compiled.keyword_index,
+            chunks=chunk_info[j],
+            arrays=compiled.arrays,
+        )
+        for j, text in enumerate(texts)
+    ]
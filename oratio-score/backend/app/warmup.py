@@ -0,0 +1,128 @@
+"""
+Startup warm-up and readiness state.
+
+Model loading and rubric compilation are lazy, so without warm-up the first
+/score after a deploy pays for both. `run_warmup` loads the embedding model,
+compiles the default rubric and runs a dummy encode, recording how long each
+step took. The API runs it in the background at startup (WARMUP_ON_STARTUP)
+and reports progress on /ready, so a load balancer only routes traffic to
+warm replicas while /health keeps answering.
+"""
+
+import time
+from threading import Lock
+from typing import Dict, Optional
+
+from app.config import settings
+
+
+class WarmupState:
+    def __init__(self):
+        self._lock = Lock()
+        self.enabled = settings.WARMUP_ON_STARTUP
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.timings: Dict[str, float] = {}
+        self.error: Optional[str] = None
+
+    @property
+    def ready(self) -> bool:
+        if not self.enabled:
+            # nothing to wait for: components load lazily on first use
+            return True
+        return self.finished_at is not None and self.error is None
+
+    def _record(self, step: str, seconds: float) -> None:
+        with self._lock:
+            self.timings[step] = round(seconds, 4)
+
+    def report(self) -> Dict:
+        with self._lock:
+            status = "disabled"
+            if self.enabled:
+                if self.error is not None:
+                    status = "failed"
+                elif self.finished_at is not None:
+                    status = "done"
+                elif self.started_at is not None:
+                    status = "running"
+                else:
+                    status = "pending"
+            return {
+                "ready": self.ready,
+                "warmup": status,
+                "timings": dict(self.timings),
+                "error": self.error,
+            }
+
+
+state = WarmupState()
+
+
+def run_warmup(
+    rubric_id: Optional[str] = None, encode: bool = True, rubric: bool = True
+) -> WarmupState:
+    """
+    Load the model, compile the rubric and run a dummy encode (synchronous).
+    Errors are recorded on the state instead of raised.
+    `encode=False` skips the dummy encode and `rubric=False` the rubric compile
+    (which may encode descriptions, see `run_prefork_warmup`).
+    """
+    from app.nlp_utils import get_embedding, load_embedding_model
+    from app.rubric_registry import get_rubric_registry
+
+    state.started_at = time.time()
+    state.finished_at = None
+    state.error = None
+    t_total = time.perf_counter()
+    try:
+        t = time.perf_counter()
+        load_embedding_model()
+        state._record("model_load_s", time.perf_counter() - t)
+
+        if rubric:
+            t = time.perf_counter()
+            get_rubric_registry().get(rubric_id)
+            state._record("rubric_compile_s", time.perf_counter() - t)
+
+        if encode:
+            t = time.perf_counter()
+            get_embedding("warm-up")
+            state._record("dummy_encode_s", time.perf_counter() - t)
+    except Exception as e:
+        state.error = f"{type(e).__name__}: {e}"
+        print(f"[warmup] Warm-up failed: {state.error}")
+    finally:
+        state._record("total_s", time.perf_counter() - t_total)
+        state.finished_at = time.time()
+    return state
+
+
+def run_prefork_warmup(rubric_id: Optional[str] = None) -> WarmupState:
+    """
+    Warm-up for a parent about to fork workers (app.launcher, app.bulk): loads
+    the model, and the rubric only from its compiled artifact, built in a
+    throwaway subprocess if missing. The model is never called here, so
+    inference thread pools (which do not survive fork) start in the workers.
+    Without an artifact each worker compiles the rubric itself.
+    """
+    from app.nlp_utils import current_model_name
+    from app.rubric_artifact import ensure_artifact
+    from app.rubric_registry import get_rubric_registry
+
+    run_warmup(rubric_id, encode=False, rubric=False)
+    if state.error is not None:
+        return state
+    t = time.perf_counter()
+    try:
+        registry = get_rubric_registry()
+        _, path = registry.resolve(rubric_id)
+        if ensure_artifact(path, current_model_name()):
+            registry.get(rubric_id)
+        else:
+            print(f"[warmup] No compiled artifact for {path}; workers compile it")
+    except Exception as e:
+        state.error = f"{type(e).__name__}: {e}"
+        print(f"[warmup] Warm-up failed: {state.error}")
+    state._record("rubric_compile_s", time.perf_counter() - t)
+    return state
@@ -1,133 +1,389 @@
-from typing import Any, List
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    TextIO,
+    Tuple,
+    Union,
+)
+import codecs
 import re
 
+# strings that float() accepts although they do not start with a digit/sign/dot
+_NAN_INF_RE = re.compile(r"\s*[+-]?(nan|inf|infinity)\s*", re.IGNORECASE)
+_SPECIAL_CHARS = frozenset('"#[]{}')
 
-def _zon_safe_str(s: Any) -> str:
-    if s is None:
-        return "null"
-    s = str(s)
+
+def _is_number_str(s: str) -> bool:
+    """Same acceptance as int()/float() on `s`, without an exception per word."""
+    t = s.lstrip()
+    if not t:
+        return False
+    first = t[0]
+    if first.isdigit() or first in "+-.":
+        try:
+            float(s)
+            return True
+        except ValueError:
+            return False
+    return first in "nNiI" and _NAN_INF_RE.fullmatch(s) is not None
+
+
+def _zon_str(s: str) -> str:
     if s == "":
         return '""'
     lower = s.lower()
     if lower in ("true", "false", "null"):
         return lower
     # numbers
-    try:
-        int(s)
+    if _is_number_str(s):
         return s
-    except Exception:
-        try:
-            float(s)
-            return s
-        except Exception:
-            pass
     # if contains whitespace or special chars, quote
-    if any(c.isspace() for c in s) or any(c in s for c in '"#[]{}'):
+    if any(c.isspace() or c in _SPECIAL_CHARS for c in s):
         return '"' + s.replace('"', '\\"') + '"'
     return s
 
 
-def zon_serialize(obj: Any, indent: int = 0) -> str:
-    pad = "  " * indent
-    if isinstance(obj, dict):
-        lines: List[str] = []
-        for k, v in obj.items():
-            key = str(k)
-            if isinstance(v, (dict, list)):
-                lines.append(f"{pad}{key}")
-                lines.append(zon_serialize(v, indent + 1))
-            else:
-                lines.append(f"{pad}{key} { _zon_safe_str(v) }")
-        return "\n".join(lines)
-    if isinstance(obj, list):
-        items = []
-        complex_item = False
-        for v in obj:
-            if isinstance(v, (dict, list)):
-                complex_item = True
-                items.append("\n" + zon_serialize(v, indent + 1))
-            else:
-                items.append(_zon_safe_str(v))
-        if complex_item:
-            return "\n".join(items)
-        return f"[ {', '.join(items)} ]"
-    return pad + _zon_safe_str(obj)
-
-
-def _parse_literal(token: str):
-    t = token.strip()
-    if t == "null":
-        return None
-    if t == "true":
-        return True
-    if t == "false":
-        return False
-    # quoted string
-    if len(t) >= 2 and (
-        (t[0] == '"' and t[-1] == '"') or (t[0] == "'" and t[-1] == "'")
-    ):
-        return t[1:-1].replace('\\"', '"')
-    # list inline
-    if t.startswith("[") and t.endswith("]"):
-        inner = t[1:-1].strip()
-        if inner == "":
-            return []
-        parts = [p.strip() for p in inner.split(",")]
-        return [_parse_literal(p) for p in parts]
-    # numbers
-    try:
-        if "." in t:
-            return float(t)
-        return int(t)
-    except Exception:
-        return t
+def _zon_safe_str(s: Any) -> str:
+    # type dispatch first; only strings (and unknown types) need sniffing
+    if s is None:
+        return "null"
+    if s is True:
+        return "true"
+    if s is False:
+        return "false"
+    if isinstance(s, (int, float)):
+        return str(s)
+    return _zon_str(str(s))
 
 
-def zon_parse(text: str):
-    """A tolerant ZON parser: supports comments (#), inline lists, quoted strings,
-    and nested block objects via indentation.
-    Returns Python dict/list/primitives.
+def _is_container(v: Any) -> bool:
+    return isinstance(v, (dict, list))
+
+
+def iter_zon(obj: Any, indent: int = 0, chunk_size: int = 65536) -> Iterator[str]:
+    """Iterative ZON encoder yielding text chunks of roughly `chunk_size` chars.
+
+    Produces exactly the same text as `zon_serialize` but never builds
+    intermediate strings per nesting level, so it can feed a
+    `StreamingResponse` or a file without holding the whole document twice.
     """
-    # Preprocess: remove comments
-    lines = []
-    for raw in text.splitlines():
-        line = raw.split("#", 1)[0].rstrip()
-        if line.strip() == "":
+    buf: List[str] = []
+    size = 0
+    # work stack: either text to emit or (obj, indent) to expand, popped LIFO
+    stack: List[Any] = [(obj, indent)]
+    while stack:
+        item = stack.pop()
+        if item.__class__ is str:
+            buf.append(item)
+            size += len(item)
+            if size >= chunk_size:
+                yield "".join(buf)
+                buf = []
+                size = 0
             continue
-        lines.append(line)
 
-    if not lines:
-        return {}
+        value, level = item
+        pad = "  " * level
+        parts: List[Any] = []
+        if isinstance(value, dict):
+            for i, (k, v) in enumerate(value.items()):
+                if i:
+                    parts.append("\n")
+                if _is_container(v):
+                    parts.append(f"{pad}{k}\n")
+                    parts.append((v, level + 1))
+                else:
+                    parts.append(f"{pad}{k} {_zon_safe_str(v)}")
+        elif isinstance(value, list):
+            if not any(_is_container(v) for v in value):
+                parts.append(f"[ {', '.join(_zon_safe_str(v) for v in value)} ]")
+            else:
+                for i, v in enumerate(value):
+                    if i:
+                        parts.append("\n")
+                    if _is_container(v):
+                        parts.append("\n")
+                        parts.append((v, level + 1))
+                    else:
+                        parts.append(_zon_safe_str(v))
+        else:
+            parts.append(pad + _zon_safe_str(value))
+        stack.extend(reversed(parts))
+    if buf:
+        yield "".join(buf)
+
+
+def zon_dump(obj: Any, fp: TextIO, chunk_size: int = 65536) -> None:
+    """Write `obj` as ZON to a text file-like object, chunk by chunk."""
+    for chunk in iter_zon(obj, chunk_size=chunk_size):
+        fp.write(chunk)
+
+
+def zon_serialize(obj: Any, indent: int = 0) -> str:
+    return "".join(iter_zon(obj, indent))
+
 
-    root = {}
-    stack = [(-1, root)]  # (indent_level, container)
+class ZonParseError(ValueError):
+    """Malformed ZON input; `line` and `column` are 1-based."""
 
-    for raw in lines:
-        # count leading spaces as indent (2 spaces per indent level)
+    def __init__(self, message: str, line: int, column: int):
+        super().__init__(f"line {line}, column {column}: {message}")
+        self.line = line
+        self.column = column
+
+
+_KEY_RE = re.compile(r"[^\s#]+")
+# one line: indent, then `key`, `key "simple string"` or `key bare value`
+# (optionally followed by a comment), or a blank/comment line, or anything
+# else (captured raw for the slow path)
+_FAST_LINE_RE = re.compile(
+    r"^([ \t]*)(?:"
+    r"([^\s#]+)(?:[ \t]+(?:"
+    r"(\"[^\"\\\n]*+\")"  # simple quoted string
+    r"|([^\s#\"'\[][^\n#]*+)"  # bare value
+    r"|(\[[^\]\[\"'#\n]*+\])"  # inline list of bare items
+    r"))?"
+    r"[ \t\r]*+(?:#[^\n]*+)?"
+    r"|[ \t\r]*+(?:#[^\n]*+)?"
+    r"|([^\n]*+)"
+    r")$",
+    re.MULTILINE,
+)
+_BARE_ITEM_RE = re.compile(r"[^,\]#\"']*")
+_CONSTANTS = {"null": None, "true": True, "false": False}
+_NUMBER_START = frozenset("0123456789+-.")
+
+
+def _bare_literal(t: str) -> Any:
+    if t in _CONSTANTS:
+        return _CONSTANTS[t]
+    # numbers: only attempt a conversion when the token can start a number
+    if t and (t[0] in _NUMBER_START or t[0].isdigit()):
+        try:
+            if "." in t:
+                return float(t)
+            return int(t)
+        except ValueError:
+            return t
+    return t
+
+
+class ZonStreamParser:
+    """Incremental single-pass ZON parser.
+
+    Feed text or UTF-8 byte chunks with `feed()` (e.g. from `request.stream()`)
+    and call `close()` for the result. Complete lines are parsed as soon as
+    they arrive and containers are built in place, so the input is never held
+    as a list of lines. Supports comments (#, ignored inside quoted strings),
+    inline lists (commas inside quoted items are kept), quoted strings and
+    nested block objects via indentation (2 spaces per level).
+    Raises ZonParseError with line/column for unterminated strings or lists
+    and stray characters after a value.
+    """
+
+    def __init__(self):
+        self.root: Dict[str, Any] = {}
+        self._stack: List[Tuple[int, Dict[str, Any]]] = [(-1, self.root)]
+        self._pending: List[str] = []
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._lineno = 0
+        self._line = ""
+        self._line_no = 0
+
+    # -- input ---------------------------------------------------------------
+
+    def feed(self, data: Union[str, bytes, bytearray]) -> None:
+        if not isinstance(data, str):
+            data = self._decoder.decode(bytes(data))
+        if not data:
+            return
+        nl = data.rfind("\n")
+        if nl < 0:
+            self._pending.append(data)
+            return
+        if self._pending:
+            self._pending.append(data)
+            data = "".join(self._pending)
+            nl = data.rfind("\n")
+        self._pending = [data[nl + 1 :]]
+        self._feed_block(data[:nl])
+
+    def close(self) -> Dict[str, Any]:
+        tail = self._decoder.decode(b"", final=True)
+        if tail:
+            self._pending.append(tail)
+        rest = "".join(self._pending)
+        self._pending = []
+        if rest:
+            self._feed_block(rest)
+        return self.root
+
+    # -- parsing -------------------------------------------------------------
+
+    def _feed_block(self, block: str) -> None:
+        """Parse a run of complete lines.
+
+        Common lines (`key`, `key value`, `key "string"`, `key [a, b]`, blanks,
+        comments) are recognised by one multi-line regex; everything else goes
+        through the character scanner in `_feed_line`. The regex yields exactly
+        one match per line, so match indexes give line numbers.
+        """
+        stack = self._stack
+        top_level, parent = stack[-1]
+        base = self._lineno
+        constants = _CONSTANTS
+        rows = _FAST_LINE_RE.findall(block)
+        for i, (indent, key, quoted, bare, items, raw) in enumerate(rows):
+            if not key:
+                if raw:
+                    self._feed_line(indent + raw, base + i + 1)
+                    top_level, parent = stack[-1]
+                continue
+            level = len(indent) >> 1
+            # find parent container for this level
+            while top_level >= level:
+                stack.pop()
+                top_level, parent = stack[-1]
+            # findall yields "" for groups that did not match; the quoted and
+            # list groups include their delimiters so they are never empty
+            if quoted:
+                parent[key] = quoted[1:-1]
+            elif bare:
+                v = bare.rstrip()
+                if v in constants:
+                    parent[key] = constants[v]
+                elif v[0] in _NUMBER_START:
+                    parent[key] = _bare_literal(v)
+                else:
+                    parent[key] = v
+            elif items:
+                inner = items[1:-1]
+                if not inner or inner.isspace():
+                    parent[key] = []
+                else:
+                    parent[key] = [_bare_literal(t.strip()) for t in inner.split(",")]
+            else:
+                # start nested object
+                new: Dict[str, Any] = {}
+                parent[key] = new
+                stack.append((level, new))
+                top_level, parent = level, new
+        self._lineno = base + len(rows)
+
+    def _error(self, message: str, rest: str, idx: int) -> ZonParseError:
+        column = len(self._line) - len(rest) + idx + 1
+        return ZonParseError(message, self._line_no, column)
+
+    def _feed_line(self, raw: str, lineno: int) -> None:
+        if raw.endswith("\r"):
+            raw = raw[:-1]
         stripped = raw.lstrip()
-        indent = len(raw) - len(stripped)
-        level = indent // 2
+        if not stripped or stripped[0] == "#":
+            return
+        self._line = raw
+        self._line_no = lineno
+        level = (len(raw) - len(stripped)) // 2
 
-        # key [value] or key value or key
-        parts = stripped.split(None, 1)
-        key = parts[0]
-        val = None
-        if len(parts) > 1:
-            val = parts[1].strip()
+        m = _KEY_RE.match(stripped)
+        key = m.group()
+        rest = stripped[m.end() :].lstrip()
 
         # find parent container for this level
-        while stack and stack[-1][0] >= level:
+        stack = self._stack
+        while stack[-1][0] >= level:
             stack.pop()
         parent = stack[-1][1]
 
-        if val is None:
+        if not rest or rest[0] == "#":
             # start nested object
-            new = {}
+            new: Dict[str, Any] = {}
             parent[key] = new
             stack.append((level, new))
+            return
+
+        c = rest[0]
+        if c == '"' or c == "'":
+            value, end = self._quoted(rest, 0)
+        elif c == "[":
+            value, end = self._list(rest, 0)
         else:
-            # parse literal or inline list
-            parsed = _parse_literal(val)
-            parent[key] = parsed
+            h = rest.find("#")
+            parent[key] = _bare_literal((rest if h < 0 else rest[:h]).rstrip())
+            return
+        tail = rest[end:].lstrip()
+        if tail and tail[0] != "#":
+            raise self._error(
+                "unexpected characters after value", rest, len(rest) - len(tail)
+            )
+        parent[key] = value
+
+    def _quoted(self, s: str, i: int) -> Tuple[str, int]:
+        q = s[i]
+        j = i + 1
+        while True:
+            k = s.find(q, j)
+            if k < 0:
+                raise self._error("unterminated string", s, i)
+            if s[k - 1] != "\\":
+                return s[i + 1 : k].replace('\\"', '"'), k + 1
+            j = k + 1
+
+    def _list(self, s: str, i: int) -> Tuple[List[Any], int]:
+        items: List[Any] = []
+        n = len(s)
+        j = i + 1
+        while j < n and s[j] == " ":
+            j += 1
+        if j < n and s[j] == "]":
+            return items, j + 1
+        while True:
+            while j < n and s[j] == " ":
+                j += 1
+            c = s[j] if j < n else ""
+            if c == '"' or c == "'":
+                item, j = self._quoted(s, j)
+            elif c == "[":
+                item, j = self._list(s, j)
+            else:
+                m = _BARE_ITEM_RE.match(s, j)
+                item, j = _bare_literal(m.group().strip()), m.end()
+            items.append(item)
+            while j < n and s[j] == " ":
+                j += 1
+            c = s[j] if j < n else ""
+            if c == ",":
+                j += 1
+            elif c == "]":
+                return items, j + 1
+            else:
+                raise self._error("unterminated list", s, i)
+
+
+def zon_parse(text: str):
+    """A tolerant ZON parser: supports comments (#), inline lists, quoted strings,
+    and nested block objects via indentation.
+    Returns Python dict/list/primitives.
+    """
+    parser = ZonStreamParser()
+    parser.feed(text)
+    return parser.close()
+
+
+def zon_parse_iter(chunks: Iterable[Union[str, bytes]]) -> Dict[str, Any]:
+    """Parse ZON from an iterable of text or byte chunks."""
+    parser = ZonStreamParser()
+    for chunk in chunks:
+        parser.feed(chunk)
+    return parser.close()
+
 
-    return root
+async def zon_parse_stream(chunks: AsyncIterator[bytes]) -> Dict[str, Any]:
+    """Parse ZON from an async byte stream (e.g. Starlette `request.stream()`)."""
+    parser = ZonStreamParser()
+    async for chunk in chunks:
+        parser.feed(chunk)
+    return parser.close()
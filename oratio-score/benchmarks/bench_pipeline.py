@@ -0,0 +1,389 @@
+"""Benchmark suite for the scoring pipeline, with JSON baselines.
+
+Run from the repo root (`oratio-score/`):
+
+  PYTHONPATH=backend python benchmarks/bench_pipeline.py
+  PYTHONPATH=backend python benchmarks/bench_pipeline.py --save .bench/quick-dummy.json
+  PYTHONPATH=backend python benchmarks/bench_pipeline.py --compare .bench/quick-dummy.json
+  PYTHONPATH=backend python benchmarks/bench_pipeline.py --profile full \\
+      --model sentence-transformers/all-MiniLM-L6-v2 --save real-full.json
+
+Times each path on its own, on synthetic transcripts (50 to 20,000 words) and
+rubrics (2 to 500 criteria):
+  - score_transcript          (rubric compiled beforehand, as in the server)
+  - find_keywords_exact / find_keywords_fuzzy over all rubric keywords
+  - zon_serialize of a score result (ZON responses)
+  - zon_parse of a ZON `/score` request body (ZON requests)
+  - load_rubric               (reading the .xlsx)
+  - POST /score end to end    (TestClient, JSON in and out)
+
+The default model is the deterministic dummy (`dummy-zero-384`), so the suite
+runs offline and measures everything except the embedding itself. Pass
+`--model <name or path>` for a real-model profile. The embedding cache and the
+micro-batcher are disabled so every run pays for its own encode.
+
+`--compare BASELINE` flags cases whose best time grew by more than
+`--threshold` (default 25%) and by more than `--min-delta-ms`, and exits with
+status 1 if any did. Baselines are machine-specific: record them on the
+machine that runs the comparison, outside version control (`.bench/`).
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+DUMMY_MODEL = "dummy-zero-384"
+
+PROFILES = {
+    "quick": {
+        "words": [50, 1000, 5000],
+        "criteria": [2, 50],
+        "api_words": [50, 1000],
+    },
+    "full": {
+        "words": [50, 1000, 20000],
+        "criteria": [2, 50, 500],
+        "api_words": [50, 1000, 20000],
+    },
+}
+
+_SYLLABLES = "ka lo mi ren ta vo shi dan pe ru zel no".split()
+_FILLER = (
+    "i the a and to of in that it is was for on with as my we they this have "
+    "be at but not by from or so what all were when there can more also"
+).split()
+
+
+# ---------------------------
+# Synthetic inputs
+# ---------------------------
+
+
+def make_vocab(n: int, seed: int = 0) -> List[str]:
+    """`n` distinct made-up words (stable for a given seed)."""
+    rnd = random.Random(seed)
+    words: List[str] = []
+    seen = set()
+    while len(words) < n:
+        w = "".join(rnd.choice(_SYLLABLES) for _ in range(rnd.randint(2, 4)))
+        if w not in seen:
+            seen.add(w)
+            words.append(w)
+    return words
+
+
+def make_rubric_rows(criteria: int, seed: int = 0) -> List[Dict[str, Any]]:
+    rnd = random.Random(seed)
+    vocab = make_vocab(max(60, criteria * 4), seed)
+    rows = []
+    for i in range(criteria):
+        kws = rnd.sample(vocab, 3)
+        if rnd.random() < 0.3:
+            kws.append(f"{rnd.choice(vocab)} {rnd.choice(vocab)}")  # multi-word
+        rows.append(
+            {
+                "Criterion Name": f"Criterion {i}",
+                "Description": " ".join(rnd.sample(vocab, 8) + rnd.sample(_FILLER, 6)),
+                "Keywords": ", ".join(kws),
+                "Weight": round(100.0 / criteria, 4),
+                "Min Words": 20,
+                "Max Words": 5000,
+            }
+        )
+    return rows
+
+
+def write_rubric(path: str, criteria: int, seed: int = 0) -> List[str]:
+    """Write a synthetic rubric .xlsx; returns all of its keywords."""
+    import pandas as pd
+
+    rows = make_rubric_rows(criteria, seed)
+    pd.DataFrame(rows).to_excel(path, index=False)
+    return [k.strip() for r in rows for k in r["Keywords"].split(",")]
+
+
+def make_transcript(words: int, keywords: List[str], seed: int = 0) -> str:
+    """~10% rubric keywords, a few near-misses for fuzzy matching, the rest filler."""
+    rnd = random.Random(seed)
+    out: List[str] = []
+    while len(out) < words:
+        r = rnd.random()
+        if r < 0.08:
+            out.extend(rnd.choice(keywords).split())
+        elif r < 0.10:
+            kw = rnd.choice(keywords).split()[0]
+            out.append(kw[:-1] if len(kw) > 4 else kw)  # typo
+        else:
+            out.append(rnd.choice(_FILLER))
+        if len(out) % 12 == 0:
+            out[-1] += "."
+    return " ".join(out[:words])
+
+
+# ---------------------------
+# Timing and comparison
+# ---------------------------
+
+
+def measure(
+    fn: Callable[[], Any], budget_s: float = 1.0, min_runs: int = 3, max_runs: int = 200
+) -> Dict[str, Any]:
+    """Best/median wall time of `fn` after one warm-up call."""
+    fn()
+    times: List[float] = []
+    start = time.perf_counter()
+    while len(times) < max_runs and (
+        len(times) < min_runs or time.perf_counter() - start < budget_s
+    ):
+        t = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t)
+    return {
+        "best_ms": round(min(times) * 1000, 4),
+        "median_ms": round(statistics.median(times) * 1000, 4),
+        "runs": len(times),
+    }
+
+
+def compare(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float = 0.25,
+    min_delta_ms: float = 0.05,
+    metric: str = "best_ms",
+) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    Per-case rows {case, baseline, current, ratio, status} and the names of
+    regressed cases (slower by more than `threshold` and `min_delta_ms`).
+    Cases missing from either side get status "new" / "missing".
+    """
+    cur, base = current.get("cases", {}), baseline.get("cases", {})
+    rows, regressions = [], []
+    for name in sorted(set(cur) | set(base)):
+        if name not in base:
+            rows.append({"case": name, "current": cur[name][metric], "status": "new"})
+            continue
+        if name not in cur:
+            rows.append(
+                {"case": name, "baseline": base[name][metric], "status": "missing"}
+            )
+            continue
+        b, c = base[name][metric], cur[name][metric]
+        ratio = c / b if b > 0 else float("inf")
+        status = "ok"
+        if ratio > 1 + threshold and c - b > min_delta_ms:
+            status = "REGRESSION"
+            regressions.append(name)
+        elif ratio < 1 / (1 + threshold) and b - c > min_delta_ms:
+            status = "faster"
+        rows.append(
+            {
+                "case": name,
+                "baseline": b,
+                "current": c,
+                "ratio": round(ratio, 3),
+                "status": status,
+            }
+        )
+    return rows, regressions
+
+
+def print_comparison(rows: List[Dict[str, Any]]) -> None:
+    width = max([len(r["case"]) for r in rows] + [4])
+    print(f"{'case':<{width}}  {'baseline':>10}  {'current':>10}  {'ratio':>6}")
+    for r in rows:
+        b = f"{r['baseline']:.3f}" if "baseline" in r else "-"
+        c = f"{r['current']:.3f}" if "current" in r else "-"
+        ratio = f"{r['ratio']:.2f}x" if "ratio" in r else ""
+        flag = "" if r["status"] == "ok" else f"  {r['status']}"
+        print(f"{r['case']:<{width}}  {b:>10}  {c:>10}  {ratio:>6}{flag}")
+
+
+# ---------------------------
+# Suite
+# ---------------------------
+
+
+def _configure_env(model: str, rubric_dir: str) -> None:
+    # must run before any `app` import reads its settings
+    os.environ["EMBEDDING_MODEL"] = model
+    os.environ["EMBEDDING_ALLOW_FALLBACK"] = "1" if model == DUMMY_MODEL else "0"
+    os.environ["EMBEDDING_CACHE_SIZE"] = "0"
+    os.environ["EMBEDDING_MICROBATCH"] = "0"
+    # api_score posts the same body every run: measure scoring, not cache hits
+    os.environ["RESULT_CACHE_SIZE"] = "0"
+    os.environ["RUBRIC_DIR"] = rubric_dir
+    os.environ["RUBRIC_ARTIFACT_DIR"] = rubric_dir
+
+
+def run_suite(
+    profile: str = "quick",
+    model: str = DUMMY_MODEL,
+    budget_s: float = 1.0,
+    only: Optional[str] = None,
+) -> Dict[str, Any]:
+    spec = PROFILES[profile]
+    tmp = tempfile.mkdtemp(prefix="oratio-bench-")
+    _configure_env(model, tmp)
+
+    import numpy as np
+
+    from app.nlp_utils import current_model_name, find_keywords_exact
+    from app.nlp_utils import find_keywords_fuzzy
+    from app.rubic_loader import load_rubric
+    from app.scoring import score_transcript
+    from app.zon import zon_parse, zon_serialize
+
+    loaded = current_model_name()
+    if loaded != model:
+        raise RuntimeError(f"requested model {model!r} but loaded {loaded!r}")
+
+    cases: Dict[str, Dict[str, Any]] = {}
+
+    def case(name: str, fn: Callable[[], Any]) -> None:
+        if only and only not in name:
+            return
+        cases[name] = measure(fn, budget_s)
+        r = cases[name]
+        print(f"{name:<48} best {r['best_ms']:>10.3f} ms  ({r['runs']} runs)")
+
+    keywords: Dict[int, List[str]] = {}
+    for c in spec["criteria"]:
+        path = os.path.join(tmp, f"bench-{c}.xlsx")
+        keywords[c] = write_rubric(path, c, seed=c)
+        case(f"load_rubric[criteria={c}]", lambda p=path: load_rubric(p))
+
+    for c in spec["criteria"]:
+        rid = f"bench-{c}"
+        for w in spec["words"]:
+            text = make_transcript(w, keywords[c], seed=w)
+            tag = f"words={w},criteria={c}"
+            case(
+                f"score_transcript[{tag}]",
+                lambda t=text, r=rid: score_transcript(t, rubric=r),
+            )
+            case(
+                f"find_keywords_exact[{tag}]",
+                lambda t=text, k=keywords[c]: find_keywords_exact(t, k),
+            )
+            case(
+                f"find_keywords_fuzzy[{tag}]",
+                lambda t=text, k=keywords[c]: find_keywords_fuzzy(t, k),
+            )
+        result = score_transcript(make_transcript(1000, keywords[c]), rubric=rid)
+        case(f"zon_serialize[criteria={c}]", lambda r=result: zon_serialize(r))
+
+    c = spec["criteria"][-1]
+    for w in spec["words"]:
+        body = zon_serialize({"text": make_transcript(w, keywords[c], seed=w)})
+        case(f"zon_parse[words={w}]", lambda z=body: zon_parse(z))
+
+    api_cases = [
+        f"{kind}[words={w},criteria={c}]"
+        for kind in ("api_score", "api_score_cached")
+        for w in spec["api_words"]
+    ]
+    if any(not only or only in name for name in api_cases):
+        from fastapi.testclient import TestClient
+
+        from app import result_cache
+        from app.main import app
+
+        with TestClient(app) as client:
+            for kind in ("api_score", "api_score_cached"):
+                if kind == "api_score_cached":
+                    # hit latency: a cache of its own, primed by the first run
+                    result_cache._cache = result_cache.ResultCache(max_entries=16)
+                for w in spec["api_words"]:
+                    body = {"text": make_transcript(w, keywords[c], seed=w)}
+                    url = f"/score?rubric=bench-{c}"
+
+                    def post(b=body, u=url):
+                        resp = client.post(u, json=b)
+                        resp.raise_for_status()
+
+                    case(f"{kind}[words={w},criteria={c}]", post)
+
+    return {
+        "meta": {
+            "profile": profile,
+            "model": loaded,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "budget_s": budget_s,
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        },
+        "cases": cases,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--profile", choices=sorted(PROFILES), default="quick")
+    ap.add_argument("--model", default=DUMMY_MODEL, help="embedding model name/path")
+    ap.add_argument("--budget", type=float, default=1.0, help="seconds per case")
+    ap.add_argument("--only", default=None, help="run cases whose name contains this")
+    ap.add_argument("--save", default=None, help="write results as a JSON baseline")
+    ap.add_argument("--compare", default=None, help="baseline JSON to compare against")
+    ap.add_argument(
+        "--results",
+        default=None,
+        help="compare these saved results instead of running the suite",
+    )
+    ap.add_argument("--threshold", type=float, default=0.25)
+    ap.add_argument("--min-delta-ms", type=float, default=0.05)
+    args = ap.parse_args(argv)
+
+    if args.results:
+        with open(args.results, "r", encoding="utf-8") as f:
+            results = json.load(f)
+    else:
+        results = run_suite(args.profile, args.model, args.budget, args.only)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"saved {len(results['cases'])} cases to {args.save}")
+
+    if not args.compare:
+        return 0
+    with open(args.compare, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    for key in ("profile", "model"):
+        if baseline["meta"].get(key) != results["meta"].get(key):
+            print(
+                f"warning: baseline {key} {baseline['meta'].get(key)!r} "
+                f"!= current {results['meta'].get(key)!r}"
+            )
+    if args.only:
+        baseline = dict(
+            baseline,
+            cases={k: v for k, v in baseline["cases"].items() if args.only in k},
+        )
+    rows, regressions = compare(
+        results, baseline, threshold=args.threshold, min_delta_ms=args.min_delta_ms
+    )
+    print()
+    print_comparison(rows)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}")
+        return 1
+    print("\nno regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
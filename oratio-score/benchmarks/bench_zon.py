@@ -0,0 +1,133 @@
+"""Benchmark: streaming ZON encoder vs. the original recursive serializer.
+
+Run from the repo root (`oratio-score/`):
+
+  PYTHONPATH=backend python benchmarks/bench_zon.py [--items 2000] [--repeat 5]
+
+Builds a batch-scoring-like payload (many results with nested criteria and
+evidence), checks both encoders produce identical text, and prints the best
+wall time of each.
+"""
+
+import argparse
+import random
+import time
+from typing import Any, List
+
+from app.zon import iter_zon
+
+
+def _legacy_safe_str(s: Any) -> str:
+    if s is None:
+        return "null"
+    s = str(s)
+    if s == "":
+        return '""'
+    lower = s.lower()
+    if lower in ("true", "false", "null"):
+        return lower
+    try:
+        int(s)
+        return s
+    except Exception:
+        try:
+            float(s)
+            return s
+        except Exception:
+            pass
+    if any(c.isspace() for c in s) or any(c in s for c in '"#[]{}'):
+        return '"' + s.replace('"', '\\"') + '"'
+    return s
+
+
+def legacy_zon_serialize(obj: Any, indent: int = 0) -> str:
+    """The original recursive implementation, kept here as the baseline."""
+    pad = "  " * indent
+    if isinstance(obj, dict):
+        lines: List[str] = []
+        for k, v in obj.items():
+            key = str(k)
+            if isinstance(v, (dict, list)):
+                lines.append(f"{pad}{key}")
+                lines.append(legacy_zon_serialize(v, indent + 1))
+            else:
+                lines.append(f"{pad}{key} { _legacy_safe_str(v) }")
+        return "\n".join(lines)
+    if isinstance(obj, list):
+        items = []
+        complex_item = False
+        for v in obj:
+            if isinstance(v, (dict, list)):
+                complex_item = True
+                items.append("\n" + legacy_zon_serialize(v, indent + 1))
+            else:
+                items.append(_legacy_safe_str(v))
+        if complex_item:
+            return "\n".join(items)
+        return f"[ {', '.join(items)} ]"
+    return pad + _legacy_safe_str(obj)
+
+
+def make_payload(items: int, criteria: int = 8, seed: int = 0) -> dict:
+    rnd = random.Random(seed)
+    words = ["coding", "music", "sports", "clear", "confident", "projects"]
+    results = []
+    for _ in range(items):
+        crits = []
+        evidence = {}
+        for c in range(criteria):
+            entry = {
+                "name": f"Criterion {c}",
+                "weight": 10.0,
+                "keywords": rnd.sample(words, 3),
+                "keyword_score": round(rnd.random() * 100, 3),
+                "keywords_found": rnd.sample(words, rnd.randint(0, 3)),
+                "semantic_score": round(rnd.random() * 100, 3),
+                "length_penalty": 0.0,
+                "raw_score": round(rnd.random() * 100, 3),
+            }
+            crits.append(dict(entry, weighted_score=round(rnd.random() * 10, 4)))
+            evidence[entry["name"]] = dict(
+                entry, description="Relevance and substance."
+            )
+        results.append(
+            {
+                "overall_score": round(rnd.random() * 100, 3),
+                "word_count": rnd.randint(50, 2000),
+                "criteria": crits,
+                "evidence": evidence,
+            }
+        )
+    return {"count": items, "results": results}
+
+
+def _best(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--items", type=int, default=2000)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    payload = make_payload(args.items)
+    new_text = "".join(iter_zon(payload))
+    old_text = legacy_zon_serialize(payload)
+    assert new_text == old_text, "encoders disagree"
+
+    t_old = _best(lambda: legacy_zon_serialize(payload), args.repeat)
+    t_new = _best(lambda: "".join(iter_zon(payload)), args.repeat)
+    size_mb = len(new_text) / 1e6
+    print(f"payload: {args.items} results, {size_mb:.1f} MB of ZON")
+    print(f"legacy recursive : {t_old * 1000:8.1f} ms")
+    print(f"streaming iter   : {t_new * 1000:8.1f} ms  ({t_old / t_new:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Benchmark: single-pass ZON parser vs. the original line-splitting parser.
+
+Run from the repo root (`oratio-score/`):
+
+  PYTHONPATH=backend python benchmarks/bench_zon_parse.py [--items 2000] [--repeat 5]
+
+Parses three request-like documents (a batch-scoring payload, many short
+quoted strings and a few long quoted transcripts), checks both parsers agree
+and prints the best wall time of each, plus the chunked streaming path.
+"""
+
+import argparse
+import time
+from typing import Any
+
+from bench_zon import _best, make_payload
+
+from app.zon import zon_parse, zon_parse_iter, zon_serialize
+
+
+def _legacy_parse_literal(token: str) -> Any:
+    t = token.strip()
+    if t == "null":
+        return None
+    if t == "true":
+        return True
+    if t == "false":
+        return False
+    if len(t) >= 2 and (
+        (t[0] == '"' and t[-1] == '"') or (t[0] == "'" and t[-1] == "'")
+    ):
+        return t[1:-1].replace('\\"', '"')
+    if t.startswith("[") and t.endswith("]"):
+        inner = t[1:-1].strip()
+        if inner == "":
+            return []
+        return [_legacy_parse_literal(p.strip()) for p in inner.split(",")]
+    try:
+        if "." in t:
+            return float(t)
+        return int(t)
+    except Exception:
+        return t
+
+
+def legacy_zon_parse(text: str) -> dict:
+    """The original implementation, kept here as the baseline."""
+    lines = []
+    for raw in text.splitlines():
+        line = raw.split("#", 1)[0].rstrip()
+        if line.strip() == "":
+            continue
+        lines.append(line)
+    root: dict = {}
+    stack = [(-1, root)]
+    for raw in lines:
+        stripped = raw.lstrip()
+        level = (len(raw) - len(stripped)) // 2
+        parts = stripped.split(None, 1)
+        key = parts[0]
+        while stack and stack[-1][0] >= level:
+            stack.pop()
+        parent = stack[-1][1]
+        if len(parts) == 1:
+            new: dict = {}
+            parent[key] = new
+            stack.append((level, new))
+        else:
+            parent[key] = _legacy_parse_literal(parts[1].strip())
+    return root
+
+
+def make_documents(items: int) -> dict:
+    # lists of objects are not round-trippable in ZON, so key results by index
+    payload = make_payload(items)
+    batch = {f"r{i}": r["evidence"] for i, r in enumerate(payload["results"])}
+    strings = {
+        f"s{i}": {"text": f"Answer number {i} about coding and music", "n": i}
+        for i in range(items * 20)
+    }
+    sentence = "I enjoy coding projects and playing music with friends. "
+    transcripts = {f"t{i}": sentence * 2000 for i in range(max(items // 20, 1))}
+    return {
+        "batch": zon_serialize(batch),
+        "strings": zon_serialize(strings),
+        "transcripts": zon_serialize(transcripts),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--items", type=int, default=2000)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    for name, text in make_documents(args.items).items():
+        assert zon_parse(text) == legacy_zon_parse(text), f"{name}: parsers disagree"
+        data = text.encode("utf-8")
+        chunks = [data[i : i + 65536] for i in range(0, len(data), 65536)]
+
+        t_old = _best(lambda: legacy_zon_parse(text), args.repeat)
+        t_new = _best(lambda: zon_parse(text), args.repeat)
+        t_stream = _best(lambda: zon_parse_iter(chunks), args.repeat)
+        print(f"{name}: {len(data) / 1e6:.1f} MB of ZON")
+        print(f"  legacy splitting : {t_old * 1000:8.1f} ms")
+        print(f"  single pass      : {t_new * 1000:8.1f} ms  ({t_old / t_new:.2f}x)")
+        print(
+            f"  64 KiB chunks    : {t_stream * 1000:8.1f} ms  ({t_old / t_stream:.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
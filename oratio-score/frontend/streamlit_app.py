@@ -35,13 +35,19 @@ except Exception:
 if not BACKEND_URL:
     BACKEND_URL = "http://localhost:8000"
 
+# re-scoring an edited transcript only recomputes the changed sentences
+INCREMENTAL = os.environ.get("ORATIO_INCREMENTAL", "1") != "0"
+SCORE_PARAMS = {"incremental": "1"} if INCREMENTAL else {}
+
 
 def call_score_api(text: str, retries: int = 3, backoff: float = 0.5) -> Dict[str, Any]:
+    # feedback is generated in the background; see fetch_feedback
     url = f"{BACKEND_URL.rstrip('/')}/score"
+    params = {"feedback": "async", **SCORE_PARAMS}
     attempt = 0
     while True:
         try:
-            resp = requests.post(url, json={"text": text}, timeout=30)
+            resp = requests.post(url, params=params, json={"text": text}, timeout=30)
             resp.raise_for_status()
             return resp.json()
         except requests.exceptions.RequestException as e:
@@ -51,6 +57,68 @@ def call_score_api(text: str, retries: int = 3, backoff: float = 0.5) -> Dict[st
             time.sleep(backoff * (2 ** (attempt - 1)))
 
 
+def fetch_feedback(job: Dict[str, Any], wait: float = 25.0) -> Dict[str, Any]:
+    """Long-poll the feedback job returned by /score?feedback=async."""
+    url = f"{BACKEND_URL.rstrip('/')}{job['url']}"
+    resp = requests.get(url, params={"wait": wait}, timeout=wait + 10)
+    resp.raise_for_status()
+    return resp.json()
+
+
+def stream_score_api(text: str):
+    """Yield (event, data) from /score/stream as the backend produces them."""
+    url = f"{BACKEND_URL.rstrip('/')}/score/stream"
+    params = {"format": "ndjson", "feedback": "1", **SCORE_PARAMS}
+    with requests.post(
+        url, params=params, json={"text": text}, stream=True, timeout=60
+    ) as resp:
+        resp.raise_for_status()
+        for line in resp.iter_lines():
+            if line:
+                msg = json.loads(line)
+                yield msg["event"], msg["data"]
+
+
+def score_progressively(text: str) -> Dict[str, Any]:
+    """Render scores as they stream in; returns the assembled /score-style result."""
+    live = st.empty()
+    data: Dict[str, Any] = {"criteria": [], "evidence": {}}
+    # a stream that fails midway must not leave its partial progress on screen
+    try:
+        with live.container():
+            status = st.empty()
+            progress = st.progress(0.0)
+            rows = st.container()
+            status.info("Scoring...")
+            total = 0
+            for event, payload in stream_score_api(text):
+                if event == "start":
+                    total = payload.get("criteria") or 0
+                    data["word_count"] = payload.get("word_count")
+                    status.info(
+                        f"Scoring {data['word_count']} words against {total} criteria..."
+                    )
+                elif event == "criterion":
+                    c = payload["criterion"]
+                    data["criteria"].append(c)
+                    data["evidence"][c["name"]] = payload["evidence"]
+                    rows.markdown(f"**{c['name']}**: {(c.get('raw_score') or 0):.1f}")
+                    if total:
+                        progress.progress(min(1.0, len(data["criteria"]) / total))
+                elif event == "overall":
+                    data.update(payload)
+                    progress.progress(1.0)
+                    status.success(f"Overall score: {payload['overall_score']:.2f}")
+                    st.caption("Generating feedback...")
+                elif event == "feedback":
+                    data["feedback"] = payload.get("feedback")
+                elif event == "error":
+                    data.update(payload)
+    finally:
+        live.empty()
+    return data
+
+
 def format_keywords(kws: List[str]) -> str:
     return ", ".join(kws) if kws else "—"
 
@@ -97,14 +165,18 @@ with col1:
     st.write("Word count:", len(text.split()) if text else 0)
     allow_score = bool(text and text.strip())
     if st.button("Score") and allow_score:
-        with st.spinner("Contacting backend..."):
-            try:
-                data = call_score_api(text)
-                st.session_state["last_result"] = data
-            except requests.exceptions.RequestException as e:
-                st.error(f"Request failed: {e}")
-            except json.JSONDecodeError:
-                st.error("Backend returned invalid JSON.")
+        try:
+            st.session_state["last_result"] = score_progressively(text)
+        except (requests.exceptions.RequestException, ValueError, KeyError):
+            # stream unavailable (older backend, proxy buffering): one-shot request
+            with st.spinner("Contacting backend..."):
+                try:
+                    data = call_score_api(text)
+                    st.session_state["last_result"] = data
+                except requests.exceptions.RequestException as e:
+                    st.error(f"Request failed: {e}")
+                except json.JSONDecodeError:
+                    st.error("Backend returned invalid JSON.")
 
 with col2:
     st.subheader("Settings")
@@ -235,3 +307,22 @@ if result:
                 file_name="oratio_response.json",
                 mime="application/json",
             )
+
+# Scores are on screen; now wait for the background feedback job, if any
+if (
+    isinstance(result, dict)
+    and result.get("feedback_job")
+    and not result.get("feedback")
+):
+    job = result["feedback_job"]
+    with st.spinner("Generating feedback..."):
+        try:
+            got = fetch_feedback(job)
+        except requests.exceptions.RequestException as e:
+            got = {"status": "failed", "error": str(e)}
+    if got.get("status") == "done":
+        result["feedback"] = got.get("feedback")
+        st.rerun()
+    elif got.get("status") == "failed":
+        result["feedback_job"] = None
+        st.warning(f"Feedback unavailable: {got.get('error')}")
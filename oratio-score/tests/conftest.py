@@ -2,6 +2,8 @@
 import sys
 from pathlib import Path
 
+import pytest
+
 # repo_root/tests/conftest.py -> repo_root
 REPO_ROOT = Path(__file__).resolve().parents[1]
 
@@ -10,3 +12,12 @@ BACKEND_PATH = REPO_ROOT / "backend"
 
 # Prepend backend to sys.path so tests can import `app.*`
 sys.path.insert(0, str(BACKEND_PATH))
+
+
+@pytest.fixture(autouse=True)
+def _rubric_artifact_dir(tmp_path_factory, monkeypatch):
+    # compiled rubric artifacts never land in data/ or the shared temp dir
+    from app.config import settings
+
+    path = tmp_path_factory.mktemp("rubric-artifacts")
+    monkeypatch.setattr(settings, "RUBRIC_ARTIFACT_DIR", str(path))
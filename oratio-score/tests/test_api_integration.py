@@ -24,3 +24,51 @@ def test_score_endpoint_basic():
     assert "word_count" in data
     assert "criteria" in data
     assert isinstance(data.get("criteria"), list)
+
+
+def test_score_batch_endpoint():
+    texts = ["I like coding and music.", "", "Clear and confident delivery."]
+    resp = client.post("/score/batch", json={"texts": texts})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["count"] == 3
+    assert len(data["results"]) == 3
+    assert data["results"][1]["error"] == "No transcript provided"
+    for res in (data["results"][0], data["results"][2]):
+        assert "overall_score" in res and isinstance(res["criteria"], list)
+
+
+def test_score_batch_rejects_non_list():
+    resp = client.post("/score/batch", json={"texts": "not a list"})
+    assert resp.status_code == 400
+
+
+def test_score_batch_zon_response_streams():
+    resp = client.post(
+        "/score/batch",
+        json={"texts": ["I like coding.", "Clear delivery."]},
+        headers={"Accept": "application/zon"},
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/zon")
+    assert resp.text.startswith("count 2\nresults\n")
+
+
+def test_score_accepts_zon_body():
+    resp = client.post(
+        "/score",
+        content=b'text "I like coding # and music"\n',
+        headers={"Content-Type": "application/zon"},
+    )
+    assert resp.status_code == 200
+    assert resp.json()["word_count"] == 5
+
+
+def test_score_reports_zon_error_position():
+    resp = client.post(
+        "/score",
+        content=b'text "unterminated\n',
+        headers={"Content-Type": "application/zon"},
+    )
+    assert resp.status_code == 400
+    assert "line 1, column 6" in resp.text
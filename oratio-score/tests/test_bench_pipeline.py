@@ -0,0 +1,35 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "benchmarks"))
+
+import bench_pipeline as bench  # noqa: E402
+
+
+def _results(**cases):
+    return {"meta": {}, "cases": {k: {"best_ms": v} for k, v in cases.items()}}
+
+
+def test_compare_flags_only_real_regressions():
+    base = _results(slow=10.0, fast=10.0, tiny=0.01, same=5.0, gone=1.0)
+    cur = _results(slow=13.0, fast=7.0, tiny=0.05, same=5.5, added=2.0)
+    rows, regressions = bench.compare(cur, base, threshold=0.25, min_delta_ms=0.05)
+    status = {r["case"]: r["status"] for r in rows}
+    assert regressions == ["slow"]
+    # 5x slower but below the noise floor
+    assert status["tiny"] == "ok" and status["same"] == "ok"
+    assert status["fast"] == "faster"
+    assert status["added"] == "new" and status["gone"] == "missing"
+
+
+def test_synthetic_inputs_are_deterministic():
+    kws = [
+        k for r in bench.make_rubric_rows(5, seed=1) for k in r["Keywords"].split(", ")
+    ]
+    text = bench.make_transcript(300, kws, seed=2)
+    assert len(text.split()) == 300
+    assert text == bench.make_transcript(300, kws, seed=2)
+    assert any(k in text for k in kws)
+
+    timing = bench.measure(lambda: sum(range(100)), budget_s=0.01, min_runs=3)
+    assert timing["runs"] >= 3 and timing["best_ms"] <= timing["median_ms"]
@@ -0,0 +1,135 @@
+import json
+import os
+
+import pytest
+
+from app import bulk
+
+
+def _write_jsonl(path, n):
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(n):
+            f.write(json.dumps({"id": f"t{i}", "text": "I like coding " * (i % 4)}))
+            f.write("\n")
+        f.write("not json\n")
+
+
+def _read_jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_inputs_stream_ids_and_text(tmp_path):
+    csv_path = tmp_path / "in.csv"
+    csv_path.write_text('uid,body\na,"hello\nthere"\n,\n', encoding="utf-8")
+    assert list(bulk.iter_input(str(csv_path), "body", "uid")) == [
+        ("a", "hello\nthere"),
+        ("1", ""),
+    ]
+    assert bulk.count_input(str(csv_path)) == 2
+
+    (tmp_path / "d" / "sub").mkdir(parents=True)
+    (tmp_path / "d" / "b.txt").write_text("two", encoding="utf-8")
+    (tmp_path / "d" / "sub" / "a.txt").write_text("one", encoding="utf-8")
+    (tmp_path / "d" / "skip.md").write_text("no", encoding="utf-8")
+    assert list(bulk.iter_input(str(tmp_path / "d"))) == [
+        ("b.txt", "two"),
+        ("sub/a.txt", "one"),
+    ]
+
+
+def test_bulk_jsonl_matches_score_transcripts(tmp_path):
+    from app.scoring import score_transcripts
+
+    src, out = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    _write_jsonl(src, 10)
+    summary = bulk.run(str(src), str(out), batch_size=3)
+    rows = _read_jsonl(out)
+    assert summary["done"] == 11 and len(rows) == 11
+    assert [r["id"] for r in rows[:10]] == [f"t{i}" for i in range(10)]
+    assert rows[-1]["error"] == "Invalid input record"
+    assert rows[0]["error"] == "No transcript provided"
+    expected = score_transcripts(["I like coding "])[0]
+    assert {k: v for k, v in rows[1].items() if k != "id"} == expected
+    assert not os.path.exists(bulk.checkpoint_path(str(out)))
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+def test_parent_never_encodes_before_forking(tmp_path, monkeypatch):
+    import app.rubric_registry as rr
+    from app.nlp_utils import load_embedding_model
+
+    monkeypatch.setattr(rr, "_registry", rr.RubricRegistry())
+    model = load_embedding_model()
+    calls = []
+    encode = model.encode
+    monkeypatch.setattr(
+        model, "encode", lambda texts, **kw: calls.append(texts) or encode(texts, **kw)
+    )
+    src, out = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    _write_jsonl(src, 6)
+    assert bulk.run(str(src), str(out), workers=2, batch_size=2)["done"] == 7
+    # rubric loaded from its artifact; transcripts encoded in the workers
+    assert calls == [] and [e["id"] for e in rr.get_rubric_registry().describe()]
+    assert len(_read_jsonl(out)) == 7
+
+
+def test_text_writer_needs_an_encoder(tmp_path):
+    with pytest.raises(TypeError):
+        bulk._TextWriter(str(tmp_path / "out"))
+
+
+def test_interrupted_run_resumes_from_checkpoint(tmp_path, monkeypatch):
+    src, out, clean = (
+        tmp_path / "in.jsonl",
+        tmp_path / "out.jsonl",
+        tmp_path / "c.jsonl",
+    )
+    _write_jsonl(src, 20)
+    bulk.run(str(src), str(clean), batch_size=4)
+
+    real, calls = bulk.score_batch, []
+
+    def flaky(records, rubric=None):
+        calls.append(len(records))
+        if len(calls) == 4:
+            raise KeyboardInterrupt
+        return real(records, rubric)
+
+    monkeypatch.setattr(bulk, "score_batch", flaky)
+    with pytest.raises(KeyboardInterrupt):
+        bulk.run(str(src), str(out), batch_size=4, checkpoint_every=4)
+    with open(bulk.checkpoint_path(str(out)), encoding="utf-8") as f:
+        assert json.load(f)["done"] == 12
+    # a partly written record after the checkpoint is dropped on resume
+    with open(out, "ab") as f:
+        f.write(b'{"id": "garbage"')
+
+    monkeypatch.setattr(bulk, "score_batch", real)
+    summary = bulk.run(str(src), str(out), batch_size=4)
+    assert summary["done"] == 21
+    assert _read_jsonl(out) == _read_jsonl(clean)
+
+
+def test_changed_input_discards_checkpoint(tmp_path):
+    src, out = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    _write_jsonl(src, 4)
+    job = {"input": str(src), "input_signature": bulk.input_signature(str(src))}
+    bulk.save_checkpoint(str(out), job, done=3, offset=10)
+    assert bulk.load_checkpoint(str(out), job) == (3, 10)
+
+    _write_jsonl(src, 6)
+    os.utime(src, ns=(0, os.stat(src).st_mtime_ns + 1))
+    changed = {"input": str(src), "input_signature": bulk.input_signature(str(src))}
+    assert bulk.load_checkpoint(str(out), changed) == (0, 0)
+
+
+def test_parquet_output(tmp_path):
+    pytest.importorskip("pyarrow")
+    pd = pytest.importorskip("pandas")
+    src, out = tmp_path / "in.jsonl", tmp_path / "out.parquet"
+    _write_jsonl(src, 5)
+    bulk.run(str(src), str(out), batch_size=2, checkpoint_every=2)
+    df = pd.read_parquet(out)
+    assert len(df) == 6 and list(df["id"][:2]) == ["t0", "t1"]
+    assert json.loads(df["result"][1])["word_count"] == 3
@@ -0,0 +1,49 @@
+import numpy as np
+
+import app.nlp_utils as nlp
+import app.scoring as scoring
+from app.config import settings
+from app.nlp_utils import chunk_words, pool_embeddings
+
+
+def test_chunk_words_overlap_and_coverage():
+    text = " ".join(f"w{i}" for i in range(10))
+    chunks = chunk_words(text, window=4, overlap=1)
+    assert [(a, b) for a, b, _ in chunks] == [(0, 4), (3, 7), (6, 10)]
+    assert chunks[1][2] == "w3 w4 w5 w6"
+    assert chunk_words("short text", window=4) == [(0, 2, "short text")]
+    assert chunk_words("   ") == []
+
+
+def test_pool_embeddings_methods():
+    embs = np.array([[1.0, 0.0], [0.0, 1.0], [1.0, 0.2]])
+    assert np.allclose(pool_embeddings(embs, "mean"), embs.mean(axis=0))
+    assert np.allclose(pool_embeddings(embs, "max"), [1.0, 1.0])
+    att = pool_embeddings(embs, "attention")
+    assert att.shape == (2,)
+    # the off-topic chunk ([0, 1]) is down-weighted compared to the plain mean
+    assert att[0] > embs.mean(axis=0)[0]
+
+
+def test_score_transcript_chunked_evidence(monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_CHUNKING", True)
+    monkeypatch.setattr(settings, "CHUNK_WORDS", 8)
+    monkeypatch.setattr(settings, "CHUNK_OVERLAP", 2)
+    monkeypatch.setattr(settings, "CHUNK_BATCH_SIZE", 2)
+    calls = []
+    dim = scoring._prepare_rubric_cache().embeddings.shape[1]
+
+    def fake_embed_batch(texts):
+        calls.append(len(texts))
+        return [np.ones(dim) for _ in texts]
+
+    monkeypatch.setattr(scoring, "embed_batch", fake_embed_batch)
+    monkeypatch.setattr(nlp, "embed_batch", fake_embed_batch)
+    text = " ".join(["I like coding and music a lot"] * 4)  # 28 words
+    res = scoring.score_transcript(text)
+    assert res["word_count"] == 28
+    for ev in res["evidence"].values():
+        spans = [(c["start_word"], c["end_word"]) for c in ev["chunk_scores"]]
+        assert spans[0] == (0, 8) and spans[-1][1] == 28
+    # chunks were embedded in bounded batches
+    assert max(calls) <= 2
@@ -0,0 +1,52 @@
+import json
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app import codec
+from app.main import app
+
+client = TestClient(app)
+
+PAYLOAD = {
+    "overall_score": 71.25,
+    "word_count": np.int64(12),
+    "criteria": [{"name": "Clarity", "semantic_score": np.float32(0.5)}],
+    "evidence": {"Clarity": {"keywords_found": ["clear", "ünïcode"]}},
+}
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_dumps_json_matches_stdlib_shape(monkeypatch, use_orjson):
+    if use_orjson:
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(codec, "orjson", None)
+    out = codec.dumps_json(PAYLOAD)
+    assert isinstance(out, bytes)
+    assert json.loads(out) == {
+        "overall_score": 71.25,
+        "word_count": 12,
+        "criteria": [{"name": "Clarity", "semantic_score": 0.5}],
+        "evidence": {"Clarity": {"keywords_found": ["clear", "ünïcode"]}},
+    }
+    # compact, non-ASCII kept as UTF-8 like Starlette's JSONResponse
+    assert b", " not in out and "ünïcode".encode() in out
+    assert codec.loads_json(b'{"text": "hi"}') == {"text": "hi"}
+    with pytest.raises(ValueError):
+        codec.loads_json(b"{not json")
+
+
+def test_score_response_is_pre_encoded_json():
+    resp = client.post("/score", json={"text": "I like coding and music"})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/json"
+    assert resp.json()["word_count"] == 5
+
+
+def test_score_rejects_non_object_json():
+    resp = client.post("/score", content=b'["text"]')
+    assert resp.status_code == 400
+    resp = client.post("/score", content=b"")
+    assert resp.status_code == 400
@@ -0,0 +1,83 @@
+import os
+
+import numpy as np
+import pytest
+
+import app.nlp_utils as nlp
+from app import embedding_backends as eb
+
+
+def teardown_function():
+    nlp.load_embedding_model.cache_clear()
+
+
+def test_backend_name_aliases():
+    assert eb.backend_name("torch") == eb.SENTENCE_TRANSFORMERS
+    assert eb.backend_name(" ONNX ") == eb.ONNX
+    assert eb.backend_name("int8") == eb.ONNX_INT8
+    with pytest.raises(ValueError):
+        eb.backend_name("tensorflow")
+
+
+def test_mean_pool_ignores_padding():
+    tokens = np.array([[[1.0, 2.0], [3.0, 4.0], [100.0, 100.0]]])
+    mask = np.array([[1, 1, 0]])
+    assert np.allclose(eb.mean_pool(tokens, mask), [[2.0, 3.0]])
+
+
+def test_missing_onnx_model_falls_back(monkeypatch, tmp_path):
+    monkeypatch.setenv("EMBEDDING_BACKEND", "onnx-int8")
+    monkeypatch.setenv("EMBEDDING_MODEL_DIR", str(tmp_path))
+    monkeypatch.setenv("EMBEDDING_ALLOW_FALLBACK", "1")
+    monkeypatch.setattr(nlp, "SentenceTransformer", None)
+    nlp.load_embedding_model.cache_clear()
+    nlp.load_embedding_model()
+    assert nlp.current_model_name() == nlp.DUMMY_MODEL_NAME
+
+
+def test_missing_onnx_model_raises_without_fallback(monkeypatch, tmp_path):
+    monkeypatch.setenv("EMBEDDING_BACKEND", "onnx")
+    monkeypatch.setenv("EMBEDDING_MODEL_DIR", str(tmp_path))
+    monkeypatch.setenv("EMBEDDING_ALLOW_FALLBACK", "0")
+    nlp.load_embedding_model.cache_clear()
+    with pytest.raises(RuntimeError):
+        nlp.load_embedding_model()
+
+
+# Parity against PyTorch needs a local model directory built with
+# `python -m app.embedding_backends export ... && ... quantize ...`.
+PARITY_DIR = os.getenv("EMBEDDING_PARITY_MODEL_DIR")
+TRANSCRIPTS = [
+    "Hello everyone, my name is Priya and I study computer science.",
+    "I like coding, music and sports, and I have worked on several projects.",
+    "um so yeah I dunno, I guess I talk a lot about stuff",
+]
+CRITERIA = [
+    "Greets the audience and introduces themselves clearly.",
+    "Mentions hobbies, interests and personal projects.",
+    "Speaks confidently with a clear structure and few filler words.",
+]
+
+
+@pytest.mark.skipif(not PARITY_DIR, reason="EMBEDDING_PARITY_MODEL_DIR not set")
+@pytest.mark.parametrize(
+    "quantized, tolerance", [(False, 0.5), (True, 3.0)], ids=["onnx", "onnx-int8"]
+)
+def test_semantic_scores_match_pytorch(quantized, tolerance):
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("tokenizers")
+    st = pytest.importorskip("sentence_transformers")
+    from app.scoring import batch_semantic_scores
+
+    torch_model = st.SentenceTransformer(PARITY_DIR, device="cpu")
+    onnx_model = eb.OnnxEmbeddingModel(PARITY_DIR, quantized=quantized)
+
+    def scores(model):
+        t = model.encode(TRANSCRIPTS, convert_to_numpy=True)
+        c = model.encode(CRITERIA, convert_to_numpy=True)
+        return batch_semantic_scores(t, c)
+
+    single = onnx_model.encode(TRANSCRIPTS[0])
+    assert single.shape == torch_model.encode(TRANSCRIPTS[0]).shape
+    diff = np.abs(scores(torch_model) - scores(onnx_model))
+    assert diff.max() <= tolerance
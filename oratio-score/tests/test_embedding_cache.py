@@ -0,0 +1,75 @@
+import numpy as np
+
+import app.nlp_utils as nlp
+from app.embedding_cache import EmbeddingCache
+
+
+def test_lru_eviction_and_counters():
+    cache = EmbeddingCache(max_entries=2)
+    cache.put("m", "a", np.ones(3))
+    cache.put("m", "b", np.ones(3) * 2)
+    assert cache.get("m", "a") is not None  # a becomes most recent
+    cache.put("m", "c", np.ones(3) * 3)  # evicts b
+    assert cache.get("m", "b") is None
+    assert np.all(cache.get("m", "c") == 3)
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["hits"] == 2 and stats["misses"] == 1
+
+
+def test_model_change_keeps_other_models_on_disk(tmp_path):
+    path = str(tmp_path / "emb.sqlite")
+    cache = EmbeddingCache(max_entries=4, disk_path=path)
+    cache.put("model-a", "hello", np.arange(3, dtype=np.float32))
+    assert cache.get("model-b", "hello") is None
+    assert cache.stats()["entries"] == 0
+    # a process on another model sharing the file doesn't wipe model-a rows
+    cache.put("model-b", "hello", np.zeros(3, dtype=np.float32))
+    fresh = EmbeddingCache(max_entries=4, disk_path=path)
+    assert list(fresh.get("model-a", "hello")) == [0.0, 1.0, 2.0]
+    assert list(fresh.get("model-b", "hello")) == [0.0, 0.0, 0.0]
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path):
+    path = str(tmp_path / "emb.sqlite")
+    cache = EmbeddingCache(max_entries=1, disk_path=path, max_disk_entries=4)
+    for text in "abc":
+        cache.put("m", text, np.zeros(2))
+    assert cache.get("m", "a") is not None  # disk hit: "a" is recent again
+    assert cache.stats()["disk_hits"] == 1
+    for text in "de":
+        cache.put("m", text, np.zeros(2))
+
+    fresh = EmbeddingCache(max_entries=4, disk_path=path, max_disk_entries=4)
+    assert fresh.get("m", "b") is None
+    assert all(fresh.get("m", text) is not None for text in "acde")
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "emb.sqlite")
+    EmbeddingCache(max_entries=4, disk_path=path).put(
+        "m", "hello", np.arange(4, dtype=np.float32)
+    )
+    fresh = EmbeddingCache(max_entries=4, disk_path=path)
+    emb = fresh.get("m", "hello")
+    assert emb is not None and emb.dtype == np.float32
+    assert list(emb) == [0.0, 1.0, 2.0, 3.0]
+    assert fresh.stats()["disk_hits"] == 1
+
+
+def test_embed_batch_only_encodes_misses(monkeypatch):
+    cache = EmbeddingCache(max_entries=16)
+    monkeypatch.setattr(nlp, "get_embedding_cache", lambda: cache)
+    encoded = []
+
+    def fake_encode(texts):
+        encoded.extend(texts)
+        return [np.full(3, float(len(t))) for t in texts]
+
+    monkeypatch.setattr(nlp, "_encode_uncached", fake_encode)
+    first = nlp.embed_batch(["one", "two  words", "one"])
+    assert encoded == ["one", "two  words"]
+    # whitespace-normalized text hits the cache
+    second = nlp.embed_batch(["two words", "three"])
+    assert encoded == ["one", "two  words", "three"]
+    assert np.all(second[0] == first[1])
@@ -0,0 +1,163 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.executor import QueueFullError, ScoringExecutor
+
+
+def test_executor_runs_off_event_loop_thread():
+    ex = ScoringExecutor(max_workers=1, max_queue=0)
+
+    async def main():
+        return await ex.run(threading.get_ident)
+
+    try:
+        worker_ident = asyncio.run(main())
+    finally:
+        ex.shutdown()
+    assert worker_ident != threading.get_ident()
+
+
+def test_executor_rejects_when_queue_full():
+    ex = ScoringExecutor(max_workers=1, max_queue=1, retry_after=7)
+    gate = threading.Event()
+
+    async def main():
+        first = asyncio.ensure_future(ex.run(gate.wait))
+        second = asyncio.ensure_future(ex.run(gate.wait))
+        await asyncio.sleep(0)
+        assert ex.in_flight == 1 and ex.queued == 1
+        with pytest.raises(QueueFullError) as info:
+            await ex.run(gate.wait)
+        assert info.value.retry_after == 7
+        gate.set()
+        await asyncio.gather(first, second)
+        assert ex.pending == 0
+
+    try:
+        asyncio.run(main())
+    finally:
+        gate.set()
+        ex.shutdown()
+
+
+def test_cancelled_request_keeps_its_slot_until_work_finishes():
+    ex = ScoringExecutor(max_workers=1, max_queue=0)
+    started, gate = threading.Event(), threading.Event()
+
+    def work():
+        started.set()
+        gate.wait(5)
+
+    def steps():
+        yield 1
+        work()
+        yield 2
+
+    async def cancel_while_running(coro):
+        task = asyncio.ensure_future(coro)
+        while not started.is_set():
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # the thread is still busy: the bound still holds
+        assert ex.pending == 1
+        with pytest.raises(QueueFullError):
+            await ex.run(int)
+        gate.set()
+        while ex.pending:
+            await asyncio.sleep(0.01)
+        started.clear()
+        gate.clear()
+
+    async def consume():
+        async for _ in ex.run_iter(steps()):
+            pass
+
+    async def main():
+        await cancel_while_running(ex.run(work))
+        await cancel_while_running(consume())
+        assert await ex.run(int) == 0
+
+    try:
+        asyncio.run(main())
+    finally:
+        gate.set()
+        ex.shutdown()
+
+
+def test_run_iter_streams_generator_as_one_job():
+    ex = ScoringExecutor(kind="thread", max_workers=1, max_queue=0)
+    threads = set()
+
+    def gen():
+        for i in range(3):
+            threads.add(threading.current_thread().name)
+            yield i
+
+    async def main():
+        out = []
+        async for item in ex.run_iter(gen()):
+            assert ex.pending == 1
+            with pytest.raises(QueueFullError):
+                await ex.run(int)
+            out.append(item)
+        return out
+
+    try:
+        assert asyncio.run(main()) == [0, 1, 2]
+        assert ex.pending == 0
+        assert all(name.startswith("oratio-score") for name in threads)
+    finally:
+        ex.shutdown()
+
+
+def test_score_returns_503_when_busy(monkeypatch):
+    TestClient = pytest.importorskip("fastapi.testclient").TestClient
+    import app.main as main
+
+    async def busy(*args):
+        raise QueueFullError(retry_after=3)
+
+    monkeypatch.setattr(main, "run_scoring", busy)
+    resp = TestClient(main.app).post("/score", json={"text": "hello there"})
+    assert resp.status_code == 503
+    assert resp.headers["retry-after"] == "3"
+
+
+def test_process_executor_serves_while_warmup_holds_locks(tmp_path, monkeypatch):
+    TestClient = pytest.importorskip("fastapi.testclient").TestClient
+    import app.executor as executor
+    import app.feedback_service as fs
+    import app.main as main
+    import app.result_cache as rc
+    import app.rubric_registry as rr
+    from app import warmup
+
+    monkeypatch.setenv("RUBRIC_ARTIFACT_DIR", str(tmp_path))
+    monkeypatch.setattr(rc, "_cache", rc.ResultCache(max_entries=0))
+    monkeypatch.setattr(fs, "_service", fs.FeedbackService(base_url=None))
+    ex = executor.ScoringExecutor(kind="process", max_workers=1)
+    monkeypatch.setattr(executor, "_executor", ex)
+    # warm-up holds a lock scoring needs when the pool starts: a forked
+    # worker would inherit it held and wait on it forever
+    registry = rr.RubricRegistry()
+    monkeypatch.setattr(rr, "_registry", registry)
+    release = threading.Event()
+
+    def slow_warmup(*args, **kwargs):
+        with registry._lock:
+            release.wait(30)
+
+    monkeypatch.setattr(warmup.state, "enabled", True)
+    monkeypatch.setattr(warmup, "run_warmup", slow_warmup)
+    try:
+        with TestClient(main.app) as client:
+            resp = client.post("/score", json={"text": "I like coding and music"})
+            release.set()
+        assert resp.status_code == 200 and "error" not in resp.json()
+    finally:
+        release.set()
+        ex.shutdown()
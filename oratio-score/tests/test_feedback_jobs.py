@@ -0,0 +1,78 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.feedback_jobs as jobs
+import app.feedback_service as fs
+from app.main import app
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # deterministic feedback: no LLM configured
+    monkeypatch.setattr(fs, "_service", fs.FeedbackService(base_url=None))
+    monkeypatch.setattr(jobs, "_store", None)
+    with TestClient(app) as c:
+        yield c
+
+
+def test_score_returns_job_and_feedback_is_fetched(client):
+    resp = client.post("/score?feedback=async", json={"text": "I like coding"})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert "criteria" in body and body["feedback_job"]["status"] == "pending"
+
+    got = client.get(body["feedback_job"]["url"] + "?wait=5").json()
+    assert got["status"] == "done"
+    names = {c["name"] for c in body["criteria"]}
+    assert set(got["feedback"]) == names
+    assert all("suggestion" in v for v in got["feedback"].values())
+
+
+def test_feedback_as_server_sent_events(client):
+    job = client.post("/score?feedback=async", json={"text": "Hi"}).json()
+    url = job["feedback_job"]["url"]
+    with client.stream("GET", url, headers={"Accept": "text/event-stream"}) as r:
+        assert r.headers["content-type"].startswith("text/event-stream")
+        text = "".join(r.iter_text())
+    assert "event: status" in text and "event: feedback" in text
+    assert '"status":"done"' in text
+
+
+def test_unknown_job_and_no_job_without_flag(client):
+    assert client.get("/feedback/nope").status_code == 404
+    body = client.post("/score", json={"text": "I like coding"}).json()
+    assert "feedback_job" not in body
+
+
+def test_store_is_bounded_and_expires(monkeypatch):
+    release = None
+
+    async def slow_feedback(evidence):
+        await release.wait()
+        return {"A": {"evaluation": "ok"}}
+
+    monkeypatch.setattr(jobs, "agenerate_feedback", slow_feedback)
+
+    async def go():
+        nonlocal release
+        release = asyncio.Event()
+        store = jobs.FeedbackJobStore(max_jobs=2, ttl_s=0.05)
+        first = store.submit({})
+        store.submit({})
+        with pytest.raises(jobs.JobStoreFullError):
+            store.submit({})
+        release.set()
+        assert await store.wait(first, 1.0)
+        assert first.info()["feedback"] == {"A": {"evaluation": "ok"}}
+        # finished jobs make room, then expire after the TTL
+        store.submit({})
+        assert len(store) == 2
+        await asyncio.sleep(0.1)
+        time.sleep(0.06)
+        assert store.get(first.id) is None
+        assert len(store) == 0
+
+    asyncio.run(go())
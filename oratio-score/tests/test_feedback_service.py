@@ -0,0 +1,163 @@
+import asyncio
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import app.feedback_llm as fb
+from app.feedback_service import FeedbackService
+
+EVIDENCE = {
+    "Content": {
+        "name": "Content",
+        "keywords_found": ["coding"],
+        "semantic_score": 75.0,
+        "raw_score": 80.0,
+        "chunk_scores": [{"start_word": 0, "end_word": 10, "semantic_score": 70.0}],
+    },
+    "Delivery": {
+        "name": "Delivery",
+        "keywords_found": [],
+        "semantic_score": 40.0,
+        "raw_score": 30.0,
+    },
+}
+
+
+class StubLLM:
+    """OpenAI-compatible /chat/completions server answering per criterion."""
+
+    def __init__(self, delay=0.0, reply=None):
+        self.delay = delay
+        self.reply = reply
+        self.requests = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with stub._lock:
+                    stub.requests.append(body)
+                    stub.active += 1
+                    stub.max_active = max(stub.max_active, stub.active)
+                time.sleep(stub.delay)
+                with stub._lock:
+                    stub.active -= 1
+                prompt = body["messages"][0]["content"]
+                names = re.findall(r'"name": "([^"]+)"', prompt)
+                content = stub.reply or json.dumps(
+                    [
+                        {
+                            "criterion": n,
+                            "evaluation": f"LLM eval of {n}.",
+                            "suggestion": "Keep going.",
+                            "justification": "Stub.",
+                        }
+                        for n in names
+                    ]
+                )
+                out = json.dumps({"choices": [{"message": {"content": content}}]})
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.end_headers()
+                self.wfile.write(out.encode())
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    s = StubLLM()
+    yield s
+    s.close()
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_cached_regrade_makes_no_llm_call(stub):
+    svc = FeedbackService(base_url=stub.url, model="stub", temperature=0.0)
+
+    async def go():
+        first = await svc.generate(EVIDENCE)
+        second = await svc.generate(EVIDENCE)
+        await svc.aclose()
+        return first, second
+
+    first, second = _run(go())
+    assert first["Content"]["evaluation"] == "LLM eval of Content."
+    assert first == second
+    assert len(stub.requests) == 1
+    assert "chunk_scores" not in stub.requests[0]["messages"][0]["content"]
+    assert svc.stats()["hits"] == 1
+
+
+def test_per_criterion_fan_out_respects_concurrency_cap():
+    stub = StubLLM(delay=0.2)
+    evidence = [{"name": f"C{i}", "semantic_score": float(i)} for i in range(6)]
+    svc = FeedbackService(base_url=stub.url, max_concurrency=2, per_criterion=True)
+    try:
+        out = _run(svc.generate(evidence))
+    finally:
+        stub.close()
+    assert set(out) == {f"C{i}" for i in range(6)}
+    assert len(stub.requests) == 6
+    assert stub.max_active == 2
+
+
+def test_timeout_falls_back_to_simple_feedback():
+    stub = StubLLM(delay=1.0)
+    svc = FeedbackService(base_url=stub.url, timeout_s=0.2)
+    try:
+        out = _run(svc.generate(EVIDENCE))
+    finally:
+        stub.close()
+    assert out == fb.generate_feedback_simple(list(EVIDENCE.values()))
+    assert svc.stats()["timeouts"] == 1
+
+
+def test_invalid_output_falls_back_and_is_not_cached():
+    stub = StubLLM(reply="not json")
+    svc = FeedbackService(base_url=stub.url)
+    try:
+        _run(svc.generate(EVIDENCE))
+        out = _run(svc.generate(EVIDENCE))
+    finally:
+        stub.close()
+    assert out["Delivery"]["evaluation"] == "Low relevance to this criterion."
+    assert len(stub.requests) == 2 and svc.stats()["cache_entries"] == 0
+
+
+def test_unconfigured_service_is_deterministic():
+    out = _run(FeedbackService(base_url=None).generate(EVIDENCE))
+    assert out == fb.generate_feedback_simple(list(EVIDENCE.values()))
+
+
+def test_new_event_loop_closes_the_previous_client(stub):
+    svc = FeedbackService(base_url=stub.url)
+    first_loop = asyncio.new_event_loop()
+    try:
+        first_loop.run_until_complete(svc.generate(EVIDENCE))
+        old = svc._client
+        _run(svc.generate(EVIDENCE))
+        # closed on the loop that owns its pooled connections
+        assert old.is_closed and svc._client is not old
+    finally:
+        first_loop.close()
+    _run(svc.aclose())
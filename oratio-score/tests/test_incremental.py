@@ -0,0 +1,91 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import app.feedback_service as fs
+import app.incremental as incremental
+import app.result_cache as rc
+from app.main import app
+from app.nlp_utils import split_segments, tokenize_words
+from app.scoring import score_transcript
+
+TEXT = (
+    "Hello, I am a student who loves coding and music.\n\n"
+    "My goal is to build apps!  I speak in a clear voice. "
+    "Sometimes I play sprts with friends? Yes."
+)
+
+
+@pytest.fixture
+def counting(monkeypatch):
+    monkeypatch.setattr(incremental, "_cache", incremental.SegmentCache())
+    calls = {"embedded": [], "fuzzy": 0}
+    embed, fuzzy = incremental.embed_batch, incremental.find_keywords_fuzzy
+
+    def counting_embed(texts):
+        calls["embedded"].extend(texts)
+        return embed(texts)
+
+    def counting_fuzzy(*args, **kwargs):
+        calls["fuzzy"] += 1
+        return fuzzy(*args, **kwargs)
+
+    monkeypatch.setattr(incremental, "embed_batch", counting_embed)
+    monkeypatch.setattr(incremental, "find_keywords_fuzzy", counting_fuzzy)
+    return calls
+
+
+def test_segments_keep_every_token():
+    segments = split_segments(TEXT)
+    assert segments[:3] == [
+        "Hello, I am a student who loves coding and music.",
+        "My goal is to build apps!",
+        "I speak in a clear voice.",
+    ]
+    assert [t for s in segments for t in tokenize_words(s)] == tokenize_words(TEXT)
+
+
+def test_incremental_keyword_scores_match_full_scoring(counting):
+    full = score_transcript(TEXT)
+    inc = score_transcript(TEXT, incremental=True)
+    assert inc["word_count"] == full["word_count"]
+    for a, b in zip(full["criteria"], inc["criteria"]):
+        assert a["keyword_score"] == b["keyword_score"]
+        assert a["keywords_found"] == b["keywords_found"]
+
+
+def test_edit_only_recomputes_changed_segments(counting):
+    score_transcript(TEXT, incremental=True)
+    assert len(counting["embedded"]) == len(split_segments(TEXT))
+
+    counting["embedded"].clear()
+    edited = TEXT.replace("clear voice", "confident voice")
+    res = score_transcript(edited, incremental=True)
+    assert counting["embedded"] == ["I speak in a confident voice."]
+    assert "confident" in res["evidence"]["Delivery"]["keywords_found"]
+    assert res == score_transcript(edited, incremental=True)
+    assert incremental.get_segment_cache().stats()["hits"] > 0
+
+
+def test_fuzzy_results_are_cached_per_segment(counting):
+    text = "I like sprts. I am cleer."  # no exact keyword: fuzzy fallback
+    first = score_transcript(text, incremental=True)
+    assert first["evidence"]["Content"]["keywords_found"] == ["sports"]
+    calls = counting["fuzzy"]
+    assert calls > 0
+    score_transcript(text + " More words.", incremental=True)
+    # only the new sentence goes through fuzzy matching
+    assert counting["fuzzy"] == calls + 1
+
+
+def test_score_endpoint_incremental_param(counting, monkeypatch):
+    monkeypatch.setattr(rc, "_cache", rc.ResultCache(max_entries=16))
+    monkeypatch.setattr(fs, "_service", fs.FeedbackService(base_url=None))
+    with TestClient(app) as client:
+        full = client.post("/score", json={"text": TEXT})
+        inc = client.post("/score?incremental=1", json={"text": TEXT})
+        assert inc.status_code == 200
+        # a different mode is a different result
+        assert inc.headers["x-result-cache"] == "miss"
+        assert inc.headers["etag"] != full.headers["etag"]
+        assert inc.json()["word_count"] == full.json()["word_count"]
+        assert len(counting["embedded"]) == len(split_segments(TEXT))
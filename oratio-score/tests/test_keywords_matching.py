@@ -0,0 +1,76 @@
+import re
+
+import pytest
+
+from app.nlp_utils import (
+    KeywordIndex,
+    clean_text,
+    find_keywords_exact,
+    find_keywords_fuzzy,
+)
+
+
+def _naive_exact(text, keywords):
+    text_lower = clean_text(text).lower()
+    return [
+        kw
+        for kw in keywords
+        if kw and re.search(rf"\b{re.escape(kw.lower())}\b", text_lower)
+    ]
+
+
+TEXT = (
+    "I love Machine Learning, C++ and e-mail.  My hobbies: coding music, "
+    "sports!\nProjects matter."
+)
+KEYWORDS = [
+    "machine learning",
+    "learning",
+    "Machine",
+    "c++",
+    "e-mail",
+    "coding music",
+    "music, sports",
+    "hobbies",
+    "projects matter",
+    "sport",
+    "",
+    "python",
+]
+
+
+def test_find_keywords_exact_matches_naive_regex():
+    assert find_keywords_exact(TEXT, KEYWORDS) == _naive_exact(TEXT, KEYWORDS)
+
+
+def test_phrases_do_not_span_punctuation():
+    assert find_keywords_exact("coding, music", ["coding music"]) == []
+    assert find_keywords_exact("coding   music", ["coding music"]) == ["coding music"]
+
+
+def test_index_scan_is_shared_across_criteria():
+    criteria = [["coding", "music"], ["projects matter", "confident"], ["c++"]]
+    index = KeywordIndex(kw for kws in criteria for kw in kws)
+    scan = index.scan(TEXT)
+    assert scan.word_count == len(re.findall(r"\b\w+\b", clean_text(TEXT).lower()))
+    for kws in criteria:
+        assert scan.find(kws) == _naive_exact(TEXT, kws)
+    # keywords outside the index still work
+    assert scan.find(["hobbies", "absent"]) == ["hobbies"]
+
+
+def test_fuzzy_matches_misspelling_in_long_transcript():
+    pytest.importorskip("rapidfuzz")
+    filler = " ".join(["lorem ipsum dolor sit amet"] * 400)
+    text = f"{filler} I really enjoy progamming and machine lerning. {filler}"
+    found = find_keywords_fuzzy(text, ["programming", "machine learning", "astronomy"])
+    assert found == ["programming", "machine learning"]
+
+
+def test_fuzzy_keeps_exact_matches_and_order():
+    pytest.importorskip("rapidfuzz")
+    text = "clear and confidnt delivery"
+    assert find_keywords_fuzzy(text, ["confident", "clear", "engaging"]) == [
+        "confident",
+        "clear",
+    ]
@@ -0,0 +1,107 @@
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+import pytest
+
+pytest.importorskip("uvicorn")
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+
+BACKEND = os.path.join(os.path.dirname(__file__), "..", "backend")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _children(pid: int):
+    path = f"/proc/{pid}/task/{pid}/children"
+    if not os.path.exists(path):
+        pytest.skip("needs /proc child listing")
+    with open(path) as f:
+        return [int(p) for p in f.read().split()]
+
+
+def _wait_ready(url: str, timeout: float = 20.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise AssertionError(f"{url} not ready")
+
+
+@pytest.fixture
+def preload(monkeypatch):
+    import gc
+
+    import app.rubric_registry as rr
+    from app import launcher
+    from app.nlp_utils import load_embedding_model
+
+    monkeypatch.setattr(rr, "_registry", rr.RubricRegistry())
+    calls = []
+    model = load_embedding_model()
+    encode = model.encode
+
+    def counting(texts, *args, **kwargs):
+        calls.append(texts)
+        return encode(texts, *args, **kwargs)
+
+    monkeypatch.setattr(model, "encode", counting)
+    yield lambda: (launcher.preload(), rr.get_rubric_registry().describe(), calls)
+    gc.unfreeze()
+
+
+def test_preload_loads_rubric_artifact_without_encoding(preload):
+    timings, loaded, calls = preload()
+    # compiled in a subprocess, loaded here from the artifact
+    assert [r["id"] for r in loaded] == ["default"] and calls == []
+    assert "model_load_s" in timings and "rubric_compile_s" in timings
+
+
+def test_preload_without_artifacts_leaves_rubric_to_workers(preload, monkeypatch):
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "RUBRIC_ARTIFACTS", False)
+    _, loaded, calls = preload()
+    assert loaded == [] and calls == []
+
+
+def test_launcher_forks_workers_and_restarts_them(tmp_path):
+    port = _free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "app.launcher", "--workers", "2"]
+        + ["--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND,
+        env={**os.environ, "RUBRIC_ARTIFACT_DIR": str(tmp_path)},
+    )
+    try:
+        base = f"http://127.0.0.1:{port}"
+        _wait_ready(base + "/ready")
+        workers = _children(proc.pid)
+        assert len(workers) == 2
+
+        # a dead worker is replaced and the pool keeps serving
+        os.kill(workers[0], signal.SIGKILL)
+        deadline = time.time() + 10
+        while time.time() < deadline:
+            now = _children(proc.pid)
+            if len(now) == 2 and workers[0] not in now:
+                break
+            time.sleep(0.1)
+        assert len(now) == 2 and workers[0] not in now
+        resp = httpx.post(base + "/score", json={"text": "I like coding"})
+        assert resp.status_code == 200
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        assert proc.wait(timeout=15) == 0
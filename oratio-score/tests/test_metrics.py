@@ -0,0 +1,62 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import app.feedback_service as fs
+import app.result_cache as rc
+from app import metrics
+from app.main import app
+
+TEXT = "Hello, I am a student who loves coding and music. My goal is to build apps."
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # every request has to reach the scoring pipeline
+    monkeypatch.setattr(rc, "_cache", rc.ResultCache(max_entries=0))
+    monkeypatch.setattr(fs, "_service", fs.FeedbackService(base_url=None))
+    metrics.reset()
+    with TestClient(app) as c:
+        yield c
+    metrics.set_enabled(True)
+
+
+def test_timings_param_reports_stages(client):
+    resp = client.post("/score?timings=1", json={"text": TEXT})
+    assert resp.status_code == 200
+    timings = resp.json()["timings"]
+    for stage in ("parse", "queue", "rubric", "embed", "keywords", "semantic"):
+        assert stage in timings
+    assert timings["total"] >= timings["embed"] >= 0
+
+    assert "timings" not in client.post("/score", json={"text": TEXT}).json()
+    batch = client.post("/score/batch?timings=1", json={"texts": [TEXT, TEXT]})
+    assert "embed" in batch.json()["timings"]
+
+
+def test_metrics_endpoint_exposes_prometheus_text(client):
+    client.post("/score", json={"text": TEXT})
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    body = resp.text
+    assert "# TYPE oratio_stage_seconds histogram" in body
+    assert 'oratio_stage_seconds_bucket{stage="embed",le="+Inf"} 1' in body
+    assert 'oratio_request_seconds_count{endpoint="/score"} 1' in body
+    assert 'oratio_executor_max_workers{kind="' in body
+    assert "# TYPE oratio_embedding_cache_misses_total counter" in body
+
+
+def test_disabled_metrics_still_serve_requested_timings(client):
+    metrics.set_enabled(False)
+    assert isinstance(metrics.span("embed"), metrics._NullSpan)
+    resp = client.post("/score?timings=1", json={"text": TEXT})
+    assert "embed" in resp.json()["timings"]
+    assert "oratio_stage_seconds" not in client.get("/metrics").text
+
+
+def test_render_escapes_label_values():
+    metrics.reset()
+    metrics.set_gauge("g", 2.5, path='a"b\\c')
+    out = metrics.render_prometheus([("c_total", "counter", {}, 3)])
+    assert 'g{path="a\\"b\\\\c"} 2.5' in out
+    assert "# TYPE c_total counter\nc_total 3" in out
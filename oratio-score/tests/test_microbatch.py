@@ -0,0 +1,82 @@
+import threading
+
+import numpy as np
+import pytest
+
+from app.nlp_utils import EmbeddingMicroBatcher
+
+
+def _fake_encode(calls):
+    def encode(texts):
+        calls.append(list(texts))
+        return [np.full(3, float(len(t))) for t in texts]
+
+    return encode
+
+
+def test_microbatcher_coalesces_concurrent_calls():
+    calls = []
+    batcher = EmbeddingMicroBatcher(
+        _fake_encode(calls), max_batch_size=8, max_wait_ms=200
+    )
+    texts = ["a", "bb", "ccc", "dddd"]
+    results = {}
+    start = threading.Barrier(len(texts))
+
+    def worker(t):
+        start.wait()
+        results[t] = batcher.submit([t]).result(timeout=5)[0]
+
+    threads = [threading.Thread(target=worker, args=(t,)) for t in texts]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+
+    # every caller gets its own embedding back
+    for t in texts:
+        assert np.all(results[t] == len(t))
+    # fewer encode calls than callers
+    assert len(calls) < len(texts)
+    stats = batcher.stats()
+    assert stats["items"] == len(texts)
+    assert sum(stats["histogram"].values()) == stats["batches"]
+
+
+def test_microbatcher_keeps_groups_and_propagates_errors():
+    calls = []
+    batcher = EmbeddingMicroBatcher(
+        _fake_encode(calls), max_batch_size=2, max_wait_ms=0
+    )
+    out = batcher.submit(["x", "yy", "zzz"]).result(timeout=5)
+    assert [float(e[0]) for e in out] == [1.0, 2.0, 3.0]
+
+    def boom(texts):
+        raise RuntimeError("encode failed")
+
+    failing = EmbeddingMicroBatcher(boom, max_wait_ms=0)
+    with pytest.raises(RuntimeError, match="encode failed"):
+        failing.submit(["x"]).result(timeout=5)
+
+
+def test_microbatcher_flushes_once_every_caller_is_queued():
+    import time
+
+    calls = []
+    alone = EmbeddingMicroBatcher(
+        _fake_encode(calls), max_wait_ms=2000, in_flight_fn=lambda: 1
+    )
+    t0 = time.monotonic()
+    alone.submit(["x"]).result(timeout=5)
+    # a lone request does not wait for company
+    assert time.monotonic() - t0 < 1.0
+
+    calls.clear()
+    pair = EmbeddingMicroBatcher(
+        _fake_encode(calls), max_wait_ms=2000, in_flight_fn=lambda: 2
+    )
+    t0 = time.monotonic()
+    first = pair.submit(["a"])
+    second = pair.submit(["bb"])
+    assert len(first.result(timeout=5)) == len(second.result(timeout=5)) == 1
+    assert calls == [["a", "bb"]] and time.monotonic() - t0 < 1.0
@@ -35,3 +35,14 @@ def test_fallback_disabled_raises(monkeypatch):
 
     with pytest.raises(ImportError):
         nlp.load_embedding_model()
+
+
+def test_dummy_model_requested_explicitly(monkeypatch):
+    # even with fallback disabled and sentence-transformers "installed"
+    monkeypatch.setenv("EMBEDDING_MODEL", nlp.DUMMY_MODEL_NAME)
+    monkeypatch.setenv("EMBEDDING_ALLOW_FALLBACK", "0")
+    monkeypatch.setattr(nlp, "SentenceTransformer", object())
+    nlp.load_embedding_model.cache_clear()
+
+    nlp.load_embedding_model()
+    assert nlp.current_model_name() == nlp.DUMMY_MODEL_NAME
@@ -0,0 +1,91 @@
+import pstats
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.feedback_service as fs
+import app.result_cache as rc
+import app.profiling as profiling
+from app.main import app
+
+TEXT = "Hello, I am a student who loves coding and music. My goal is to build apps."
+
+
+@pytest.fixture
+def profiler(tmp_path, monkeypatch):
+    p = profiling.Profiler(str(tmp_path / "profiles"), token="s3cret", max_files=3)
+    monkeypatch.setattr(profiling, "_profiler", p)
+    # every request has to reach the scoring pipeline
+    monkeypatch.setattr(rc, "_cache", rc.ResultCache(max_entries=0))
+    monkeypatch.setattr(fs, "_service", fs.FeedbackService(base_url=None))
+    return p
+
+
+def test_token_header_profiles_request(profiler, tmp_path):
+    with TestClient(app) as client:
+        plain = client.post("/score", json={"text": TEXT})
+        assert "x-profile-id" not in plain.headers
+        resp = client.post(
+            "/score", json={"text": TEXT}, headers={"X-Profile-Token": "nope"}
+        )
+        assert "x-profile-id" not in resp.headers
+        resp = client.post(
+            "/score", json={"text": TEXT}, headers={"X-Profile-Token": "s3cret"}
+        )
+        assert resp.status_code == 200
+        pid = resp.headers["x-profile-id"]
+
+        assert client.get("/admin/profiles").status_code == 404
+        auth = {"X-Profile-Token": "s3cret"}
+        listing = client.get("/admin/profiles", headers=auth).json()
+        [entry] = listing["profiles"]
+        assert entry["id"] == pid and entry["format"] == "pstats"
+
+        download = client.get(f"/admin/profiles/{entry['name']}", headers=auth)
+        assert download.status_code == 200
+        assert client.get("/admin/profiles/../etc", headers=auth).status_code == 404
+
+    path = tmp_path / "dl.prof"
+    path.write_bytes(download.content)
+    funcs = {name for _, _, name in pstats.Stats(str(path)).stats}
+    assert "score_transcript" in funcs
+
+
+def test_slow_requests_get_sampled_stacks(tmp_path, caplog):
+    caplog.set_level("DEBUG", logger="app.profiling")
+    p = profiling.Profiler(str(tmp_path), slow_ms=20, interval_ms=2)
+
+    def busy(seconds):
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end:
+            pass
+        return "done"
+
+    assert p.begin(None, "/score").reason == "slow"
+    assert profiling.call(busy, 0.005) == "done"
+    assert p.store.list() == []  # under the threshold
+
+    p.begin(None, "/score")
+    profiling.call(busy, 0.1)
+    [entry] = p.store.list()
+    # saves are logged at debug level only
+    assert [r.levelname for r in caplog.records] == ["DEBUG"]
+    assert entry["reason"] == "slow" and entry["format"] == "collapsed"
+    folded = open(p.store.path(entry["name"]), encoding="utf-8").read()
+    assert "busy (test_profiling.py:" in folded
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in folded.splitlines())
+
+
+def test_store_keeps_newest_files_and_rate_limits(tmp_path):
+    p = profiling.Profiler(str(tmp_path), sample_rate=1.0, max_files=2, max_per_min=3)
+    names = []
+    for _ in range(3):
+        prof = profiling.RequestProfile(p, "sampled", "cprofile", "/score")
+        names.append(p.store.save(prof, 0.01, "prof", b"x"))
+        time.sleep(0.002)
+    assert [e["name"] for e in p.store.list()] == names[:0:-1]
+
+    picked = [p.begin(None, "/score") for _ in range(5)]
+    assert sum(prof is not None for prof in picked) == 3
+    assert profiling.Profiler(str(tmp_path)).begin("s3cret", "/score") is None
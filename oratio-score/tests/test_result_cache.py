@@ -0,0 +1,178 @@
+import os
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.feedback_service as fs
+import app.main as main
+import app.result_cache as rc
+import app.rubric_registry as rr
+from app import metrics
+from app.config import settings
+
+TEXT = "Hello, I am a student who loves coding and music. My goal is to build apps."
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(rc, "_cache", rc.ResultCache(max_entries=16))
+    monkeypatch.setattr(fs, "_service", fs.FeedbackService(base_url=None))
+    calls = []
+    real = main.scoring_pipeline
+
+    def counting(*args, **kwargs):
+        calls.append(args)
+        return real(*args, **kwargs)
+
+    monkeypatch.setattr(main, "scoring_pipeline", counting)
+    with TestClient(app=main.app) as c:
+        c.calls = calls
+        yield c
+
+
+def test_repeated_request_is_served_from_cache(client, monkeypatch):
+    first = client.post("/score", json={"text": TEXT})
+    second = client.post("/score", json={"text": TEXT})
+    assert first.headers["x-result-cache"] == "miss"
+    assert second.headers["x-result-cache"] == "hit"
+    assert second.json() == first.json()
+    assert len(client.calls) == 1
+
+    # any scoring setting is part of the key
+    monkeypatch.setattr(settings, "KEYWORD_WEIGHT", 0.5)
+    changed = client.post("/score", json={"text": TEXT})
+    assert changed.headers["x-result-cache"] == "miss"
+    assert changed.headers["etag"] != first.headers["etag"]
+    assert len(client.calls) == 2
+
+
+def test_if_none_match_returns_304(client):
+    tag = client.post("/score", json={"text": TEXT}).headers["etag"]
+    resp = client.post("/score", json={"text": TEXT}, headers={"If-None-Match": tag})
+    assert resp.status_code == 304 and resp.content == b""
+    assert resp.headers["etag"] == tag
+
+    zon = client.post(
+        "/score",
+        json={"text": TEXT},
+        headers={"If-None-Match": tag, "Accept": "application/zon"},
+    )
+    assert zon.status_code == 200 and zon.headers["etag"] != tag
+    # responses that differ per request carry no ETag and are never 304
+    timed = client.post(
+        "/score?timings=1", json={"text": TEXT}, headers={"If-None-Match": tag}
+    )
+    assert timed.status_code == 200 and "etag" not in timed.headers
+    assert timed.headers["x-result-cache"] == "hit"
+    assert len(client.calls) == 1
+
+
+def test_if_none_match_star_is_not_a_match(client):
+    client.post("/score", json={"text": TEXT})
+    resp = client.post("/score", json={"text": TEXT}, headers={"If-None-Match": "*"})
+    assert resp.status_code == 200 and resp.headers["x-result-cache"] == "hit"
+    assert not rc.etag_matches("*", resp.headers["etag"])
+    assert rc.etag_matches(f'"x", W/{resp.headers["etag"]}', resp.headers["etag"])
+
+
+def test_not_modified_responses_are_counted(client):
+    tag = client.post("/score", json={"text": TEXT}).headers["etag"]
+    metrics.reset()
+    resp = client.post("/score", json={"text": TEXT}, headers={"If-None-Match": tag})
+    assert resp.status_code == 304
+    body = client.get("/metrics").text
+    assert 'oratio_request_seconds_count{endpoint="/score"} 1' in body
+
+
+def test_reload_in_flight_keys_results_by_the_rubric_used(
+    client, tmp_path, monkeypatch
+):
+    pd = pytest.importorskip("pandas")
+    pytest.importorskip("openpyxl")
+    path = tmp_path / "course.xlsx"
+
+    def write_rubric(name):
+        pd.DataFrame(
+            {
+                "Criterion Name": [name],
+                "Description": [f"About {name}"],
+                "Keywords": ["coding, music"],
+                "Weight": [10],
+            }
+        ).to_excel(path, index=False)
+
+    def names(resp):
+        return [c["name"] for c in resp.json()["criteria"]]
+
+    write_rubric("Old")
+    monkeypatch.setattr(rr, "_registry", rr.RubricRegistry(rubric_dir=str(tmp_path)))
+    old = client.post("/score?rubric=course", json={"text": TEXT})
+    assert names(old) == ["Old"]
+
+    # hold the background reload so the old entry keeps serving
+    release = threading.Event()
+    compile_rubric = rr.compile_rubric
+
+    def held(*args, **kwargs):
+        release.wait(10)
+        return compile_rubric(*args, **kwargs)
+
+    monkeypatch.setattr(rr, "compile_rubric", held)
+    write_rubric("New")
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    during = client.post("/score?rubric=course", json={"text": TEXT})
+    assert names(during) == ["Old"]
+    assert during.headers["etag"] == old.headers["etag"]
+    assert rc.get_result_cache().get(rc.request_key(TEXT, "course")) is None
+
+    release.set()
+    deadline = time.time() + 10
+    while rr.get_rubric_registry().reloads == 0 and time.time() < deadline:
+        time.sleep(0.02)
+    after = client.post(
+        "/score?rubric=course",
+        json={"text": TEXT},
+        headers={"If-None-Match": during.headers["etag"]},
+    )
+    assert after.status_code == 200 and names(after) == ["New"]
+    assert after.headers["etag"] != old.headers["etag"]
+
+
+def test_local_backend_evicts_by_lru_and_ttl():
+    b = rc.LocalBackend(max_entries=2)
+    b.set("a", b"1", 60)
+    b.set("b", b"2", 60)
+    b.get("a")
+    b.set("c", b"3", 60)
+    assert b.get("b") is None and b.get("a") == b"1"
+    b.set("d", b"4", 0.01)
+    time.sleep(0.02)
+    assert b.get("d") is None and len(b) == 1  # only "a": "c" was evicted by "d"
+
+
+class _Broken:
+    def get(self, key):
+        raise ConnectionError("down")
+
+    def set(self, key, value, ttl_s):
+        raise ConnectionError("down")
+
+
+def test_replicas_share_results_through_backend():
+    shared = rc.LocalBackend()
+    a = rc.ResultCache(shared=shared)
+    b = rc.ResultCache(shared=shared)
+    key = rc.fingerprint(TEXT, "v1", "model")
+    assert key != rc.fingerprint(TEXT, "v2", "model")
+    a.put(key, {"overall_score": 42.0})
+    assert b.get(key) == {"overall_score": 42.0}
+    assert b.stats()["shared_hits"] == 1
+
+    broken = rc.ResultCache(shared=_Broken())
+    broken.put(key, {"overall_score": 1.0})
+    assert broken.get(key) == {"overall_score": 1.0}  # local tier still works
+    assert broken.get("other") is None and broken.errors == 2
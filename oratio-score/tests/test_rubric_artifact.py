@@ -0,0 +1,115 @@
+import os
+
+import numpy as np
+import pytest
+
+import app.rubric_artifact as rubric_artifact
+import app.rubric_registry as registry
+from app.rubric_artifact import artifact_path, load_artifact, write_artifact
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("openpyxl")
+
+
+def _write_rubric(path, names):
+    pd.DataFrame(
+        {
+            "Criterion Name": names,
+            "Description": [f"About {n}" for n in names],
+            "Keywords": ["Alpha, beta"] * len(names),
+            "Weight": [10] * len(names),
+        }
+    ).to_excel(path, index=False)
+
+
+def test_compile_writes_and_reuses_artifact(tmp_path, monkeypatch):
+    src = str(tmp_path / "course.xlsx")
+    _write_rubric(src, ["Dates", "Sources"])
+    first = registry.compile_rubric("course", src)
+    assert os.path.exists(artifact_path(src))
+
+    # a fresh artifact means no Excel parsing at all
+    def no_excel(path):
+        raise AssertionError("load_rubric should not be called")
+
+    monkeypatch.setattr(registry, "load_rubric", no_excel)
+    second = registry.compile_rubric("course", src)
+    assert second.rows == first.rows
+    assert np.allclose(second.embeddings, first.embeddings)
+    assert second.version == first.version
+
+
+def test_stale_artifact_is_ignored(tmp_path):
+    src = str(tmp_path / "course.xlsx")
+    _write_rubric(src, ["Old"])
+    compiled = registry.compile_rubric("course", src)
+    assert load_artifact(src, compiled.model_name) is not None
+    assert load_artifact(src, "some-other-model") is None
+
+    _write_rubric(src, ["New"])
+    st = os.stat(src)
+    os.utime(src, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert load_artifact(src, compiled.model_name) is None
+    assert [r["name"] for r in registry.compile_rubric("course", src).rows] == ["New"]
+
+
+def test_touched_but_unchanged_source_keeps_artifact(tmp_path, monkeypatch):
+    src = str(tmp_path / "course.xlsx")
+    _write_rubric(src, ["Same"])
+    compiled = registry.compile_rubric("course", src)
+    st = os.stat(src)
+    os.utime(src, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    cached = load_artifact(src, compiled.model_name)
+    assert cached is not None and cached[2] == compiled.version
+
+    # the new mtime was recorded: the next load doesn't hash the file again
+    def no_hash(path):
+        raise AssertionError("file_hash should not be called")
+
+    monkeypatch.setattr(rubric_artifact, "file_hash", no_hash)
+    assert load_artifact(src, compiled.model_name) is not None
+
+
+def test_fresh_artifact_does_not_load_the_model(tmp_path, monkeypatch):
+    import app.nlp_utils as nlp
+
+    monkeypatch.setenv("EMBEDDING_MODEL", nlp.DUMMY_MODEL_NAME)
+    nlp.load_embedding_model.cache_clear()
+    src = str(tmp_path / "course.xlsx")
+    _write_rubric(src, ["Dates"])
+    first = registry.compile_rubric("course", src)
+
+    nlp.load_embedding_model.cache_clear()
+
+    def no_model(*args, **kwargs):
+        raise AssertionError("the embedding model should not be loaded")
+
+    monkeypatch.setattr(nlp, "load_embedding_model", no_model)
+    second = registry.compile_rubric("course", src)
+    assert second.version == first.version
+    assert second.model_name == nlp.DUMMY_MODEL_NAME
+    assert nlp.loaded_model_name() is None
+
+
+def test_unwritable_artifact_dir_is_not_fatal(tmp_path, monkeypatch):
+    from app.config import settings
+
+    blocker = tmp_path / "file"
+    blocker.write_text("not a directory")
+    monkeypatch.setattr(settings, "RUBRIC_ARTIFACT_DIR", str(blocker / "sub"))
+    assert (
+        write_artifact(str(tmp_path / "x.xlsx"), [], np.zeros((0, 3)), "m", None, None)
+        is None
+    )
+
+
+def test_default_artifact_dir_is_not_next_to_the_rubric(tmp_path, monkeypatch):
+    import tempfile
+
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "RUBRIC_ARTIFACT_DIR", None)
+    a = artifact_path(str(tmp_path / "a" / "rubric.xlsx"))
+    b = artifact_path(str(tmp_path / "b" / "rubric.xlsx"))
+    assert a.startswith(tempfile.gettempdir())
+    assert not a.startswith(str(tmp_path)) and a != b
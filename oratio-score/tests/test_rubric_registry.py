@@ -0,0 +1,68 @@
+import os
+import time
+
+import pytest
+
+from app.rubric_registry import RubricRegistry, UnknownRubricError
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("openpyxl")
+
+
+def _write_rubric(path, names):
+    pd.DataFrame(
+        {
+            "Criterion Name": names,
+            "Description": [f"About {n}" for n in names],
+            "Keywords": ["alpha, beta"] * len(names),
+            "Weight": [10] * len(names),
+        }
+    ).to_excel(path, index=False)
+
+
+def test_rubrics_selected_by_id(tmp_path):
+    _write_rubric(tmp_path / "history.xlsx", ["Dates", "Sources"])
+    _write_rubric(tmp_path / "physics.xlsx", ["Units"])
+    reg = RubricRegistry(rubric_dir=str(tmp_path), max_entries=4)
+    assert [r["name"] for r in reg.get("history").rows] == ["Dates", "Sources"]
+    physics = reg.get("physics")
+    assert [r["name"] for r in physics.rows] == ["Units"]
+    assert physics.embeddings.shape[0] == 1
+    assert physics.keyword_index.scan("alpha").find(["alpha", "beta"]) == ["alpha"]
+    for bad in ("missing", "../history"):
+        with pytest.raises(UnknownRubricError):
+            reg.get(bad)
+
+
+def test_lru_eviction(tmp_path):
+    for name in ("a", "b"):
+        _write_rubric(tmp_path / f"{name}.xlsx", [name.upper()])
+    reg = RubricRegistry(rubric_dir=str(tmp_path), max_entries=1)
+    reg.get("a")
+    reg.get("b")
+    assert [e["id"] for e in reg.describe()] == ["b"]
+
+
+def test_changed_file_reloads_in_background(tmp_path):
+    path = tmp_path / "course.xlsx"
+    _write_rubric(path, ["Old"])
+    reg = RubricRegistry(rubric_dir=str(tmp_path))
+    first = reg.get("course")
+    _write_rubric(path, ["New"])
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    # the stale entry keeps serving while the new one compiles
+    assert reg.get("course") is first
+    deadline = time.time() + 10
+    while reg.get("course") is first and time.time() < deadline:
+        time.sleep(0.05)
+    assert [r["name"] for r in reg.get("course").rows] == ["New"]
+    assert reg.reloads == 1
+
+
+def test_score_unknown_rubric_returns_404():
+    TestClient = pytest.importorskip("fastapi.testclient").TestClient
+    from app.main import app
+
+    resp = TestClient(app).post("/score?rubric=nope", json={"text": "hello"})
+    assert resp.status_code == 404
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.executor as executor
+import app.feedback_service as fs
+from app.main import app
+from app.scoring import score_transcript
+
+TEXT = "Hello, I am a student who loves coding and music. My goal is to build apps."
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(fs, "_service", fs.FeedbackService(base_url=None))
+    with TestClient(app) as c:
+        yield c
+
+
+def _ndjson(resp):
+    return [json.loads(line) for line in resp.text.splitlines() if line]
+
+
+def test_stream_events_match_score_transcript(client):
+    resp = client.post("/score/stream?format=ndjson", json={"text": TEXT})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    events = _ndjson(resp)
+    kinds = [e["event"] for e in events]
+    assert kinds[0] == "start" and kinds[-1] == "overall"
+    assert set(kinds[1:-1]) == {"criterion"}
+
+    expected = score_transcript(TEXT)
+    criteria = [e["data"]["criterion"] for e in events if e["event"] == "criterion"]
+    assert criteria == expected["criteria"]
+    assert events[0]["data"]["word_count"] == expected["word_count"]
+    assert events[0]["data"]["criteria"] == len(expected["criteria"])
+    assert events[-1]["data"]["overall_score"] == expected["overall_score"]
+
+
+def test_stream_sse_with_feedback(client):
+    resp = client.post("/score/stream?feedback=1", json={"text": TEXT})
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    names = [line[7:] for line in resp.text.splitlines() if line.startswith("event: ")]
+    assert names[0] == "start" and names[-2:] == ["overall", "feedback"]
+    last = resp.text.strip().split("\n\n")[-1]
+    feedback = json.loads(last.split("data: ", 1)[1])["feedback"]
+    assert len(feedback) == names.count("criterion")
+
+
+def test_stream_empty_text_and_busy(client, monkeypatch):
+    events = _ndjson(client.post("/score/stream?format=ndjson", json={"text": " "}))
+    assert [e["event"] for e in events] == ["overall"]
+    assert events[0]["data"]["overall_score"] == 0.0
+
+    full = executor.ScoringExecutor(max_workers=1, max_queue=0)
+    full._pending = 1
+    monkeypatch.setattr(executor, "_executor", full)
+    resp = client.post("/score/stream", json={"text": TEXT})
+    assert resp.status_code == 503
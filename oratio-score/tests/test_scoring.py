@@ -1,5 +1,5 @@
 # tests/test_scoring.py
-from app.scoring import score_transcript
+from app.scoring import score_transcript, score_transcripts
 import math
 
 
@@ -18,3 +18,71 @@ def test_score_transcript_basic():
         assert "semantic_score" in c
         assert "raw_score" in c
         assert "weighted_score" in c
+
+
+def test_score_transcripts_matches_single():
+    texts = [
+        "Hello, I am Tanishq. I like coding, music and sports. I have worked on projects.",
+        "I speak in a clear and confident way.",
+    ]
+    batch = score_transcripts(texts)
+    assert len(batch) == len(texts)
+    for text, res in zip(texts, batch):
+        single = score_transcript(text)
+        assert res["word_count"] == single["word_count"]
+        assert math.isclose(res["overall_score"], single["overall_score"], abs_tol=1e-6)
+        assert [c["name"] for c in res["criteria"]] == [
+            c["name"] for c in single["criteria"]
+        ]
+        assert set(res["evidence"]) == set(single["evidence"])
+
+
+def test_vectorized_scores_match_per_criterion_helpers():
+    import numpy as np
+
+    from app.config import settings
+    from app.rubric_registry import RubricArrays
+    from app.scoring import (
+        _score_against_rubric,
+        keyword_score,
+        length_penalty,
+        semantic_score,
+    )
+
+    rows = [
+        {
+            "name": "A",
+            "keywords": ["coding", "Music"],
+            "weight": 10.0,
+            "min_words": 50,
+            "max_words": None,
+        },
+        {
+            "name": "B",
+            "keywords": ["codng"],
+            "weight": 5.0,
+            "min_words": None,
+            "max_words": 3,
+        },
+        {"name": "C", "keywords": [], "weight": 0.0, "min_words": 0, "max_words": None},
+    ]
+    rng = np.random.RandomState(0)
+    embs, emb = rng.randn(3, 8), rng.randn(8)
+    embs[2] = 0.0
+    text = "I like coding and music"
+    res = _score_against_rubric(text, emb, rows, embs, arrays=RubricArrays(rows, embs))
+
+    overall = 0.0
+    for r, crit_emb, c in zip(rows, embs, res["criteria"]):
+        kscore, found = keyword_score(text, r["keywords"])
+        sscore = semantic_score(emb, crit_emb)
+        penalty = length_penalty(5, r["min_words"], r["max_words"])
+        raw = settings.KEYWORD_WEIGHT * kscore + settings.SEMANTIC_WEIGHT * sscore
+        raw += penalty
+        overall += raw * r["weight"] / 15.0
+        assert c["keywords_found"] == found
+        assert c["keyword_score"] == round(kscore, 3)
+        assert math.isclose(c["semantic_score"], round(sscore, 3), abs_tol=1e-3)
+        assert c["length_penalty"] == penalty
+    assert res["criteria"][1]["keywords_found"] == ["codng"]  # fuzzy fallback
+    assert math.isclose(res["overall_score"], max(0.0, min(100.0, overall)))
@@ -0,0 +1,52 @@
+import time
+
+import pytest
+
+from app import warmup
+
+TestClient = pytest.importorskip("fastapi.testclient").TestClient
+
+
+def test_ready_after_startup_warmup(monkeypatch):
+    from app.main import app
+
+    monkeypatch.setattr(warmup, "state", warmup.WarmupState())
+    monkeypatch.setattr(warmup.state, "enabled", True)
+    with TestClient(app) as client:
+        assert client.get("/health").status_code == 200
+        # lifespan warm-up runs in the background
+        deadline = time.time() + 30
+        resp = client.get("/ready")
+        while resp.status_code != 200 and time.time() < deadline:
+            time.sleep(0.05)
+            resp = client.get("/ready")
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["ready"] is True and body["warmup"] == "done"
+    for step in ("model_load_s", "rubric_compile_s", "dummy_encode_s", "total_s"):
+        assert step in body["timings"]
+
+
+def test_not_ready_until_warm(monkeypatch):
+    from app.main import app
+
+    monkeypatch.setattr(warmup, "state", warmup.WarmupState())
+    monkeypatch.setattr(warmup.state, "enabled", True)
+    resp = TestClient(app).get("/ready")
+    assert resp.status_code == 503
+    assert resp.json()["warmup"] == "pending"
+
+
+def test_failed_warmup_reports_error(monkeypatch):
+    import app.nlp_utils as nlp
+
+    monkeypatch.setattr(warmup, "state", warmup.WarmupState())
+    monkeypatch.setattr(warmup.state, "enabled", True)
+
+    def boom():
+        raise RuntimeError("no model")
+
+    monkeypatch.setattr(nlp, "load_embedding_model", boom)
+    report = warmup.run_warmup().report()
+    assert report["ready"] is False and report["warmup"] == "failed"
+    assert "no model" in report["error"]
@@ -0,0 +1,77 @@
+import io
+
+import pytest
+
+from app.zon import (
+    ZonParseError,
+    iter_zon,
+    zon_dump,
+    zon_parse,
+    zon_parse_iter,
+    zon_serialize,
+)
+
+PAYLOAD = {
+    "a": 1,
+    "b": "hello world",
+    "c": None,
+    "d": True,
+    "e": [1, 2, "x y"],
+    "f": {"g": [{"h": 1.5}, {"i": ""}], "j": {}},
+    "k": [],
+    "l": "TRUE",
+    "m": " 12",
+    "n": "nan",
+    "o": 'q"uote#',
+}
+
+# output of the original recursive serializer, kept as a compatibility contract
+EXPECTED = (
+    'a 1\nb "hello world"\nc null\nd true\ne\n[ 1, 2, "x y" ]\nf\n  g\n\n'
+    '      h 1.5\n\n      i ""\n  j\n\nk\n[  ]\nl true\nm  12\nn nan\n'
+    'o "q\\"uote#"'
+)
+
+
+def test_serialize_matches_previous_format():
+    assert zon_serialize(PAYLOAD) == EXPECTED
+    assert zon_serialize([1, {"a": 2}, "s", [3, 4]]) == "1\n\n  a 2\ns\n\n[ 3, 4 ]"
+    assert zon_serialize("plain") == "plain"
+    assert zon_serialize(None) == "null"
+
+
+def test_iter_zon_chunks_concatenate_to_full_text():
+    payload = {"results": [dict(PAYLOAD, idx=i) for i in range(200)]}
+    chunks = list(iter_zon(payload, chunk_size=256))
+    assert len(chunks) > 1
+    assert "".join(chunks) == zon_serialize(payload)
+    buf = io.StringIO()
+    zon_dump(payload, buf)
+    assert buf.getvalue() == zon_serialize(payload)
+
+
+def test_score_payload_round_trip():
+    payload = {"overall_score": 42.5, "word_count": 12, "error": "No transcript"}
+    assert zon_parse(zon_serialize(payload)) == payload
+
+
+def test_parse_quoted_hash_and_list_commas():
+    parsed = zon_parse('text "I scored #1 today"  # comment\ntags ["a, b", c, 2]\n')
+    assert parsed == {"text": "I scored #1 today", "tags": ["a, b", "c", 2]}
+
+
+def test_parse_from_byte_chunks_matches_whole_text():
+    doc = 'meta\n  course "Intro to Ünicode"\n  size 3\ntexts [ one, two ]\n'
+    data = doc.encode("utf-8")
+    # split inside lines and inside a multi-byte character
+    chunks = [data[i : i + 5] for i in range(0, len(data), 5)]
+    assert zon_parse_iter(chunks) == zon_parse(doc)
+
+
+def test_parse_errors_report_line_and_column():
+    with pytest.raises(ZonParseError) as info:
+        zon_parse('a 1\nb "unterminated\n')
+    assert (info.value.line, info.value.column) == (2, 3)
+    with pytest.raises(ZonParseError) as info:
+        zon_parse("a\n  b [1, 2\n")
+    assert (info.value.line, info.value.column) == (2, 5)